@@ -0,0 +1,104 @@
+"""Microbenchmark: Pydantic PropertyListing + per-stage copies vs slotted PropertyRecord.
+
+Simulates what happens to one detail page after parsing: the item is built,
+then passes through the pipeline stages. The old path validates with Pydantic,
+dumps to a dict, and every stage copies it with ItemAdapter(item).asdict().
+The fast path builds a PropertyRecord, every stage reads it through
+ItemAdapter, and only the export stage makes one normalized copy.
+
+Usage:
+    python benchmarks/bench_listing_record.py [--items 20000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from itemadapter import ItemAdapter  # noqa: E402
+
+from propertypal_scraper.exporters import normalize_record  # noqa: E402
+from propertypal_scraper.items import PropertyListing, PropertyRecord  # noqa: E402
+
+# Stages that read the whole item (changeset, rating, export, history)
+STAGES = 4
+
+RAW = {
+    'property_id': '1059201',
+    'url': 'https://www.propertypal.com/6-midland-terrace-belfast/1059201',
+    'price': 'Offers around £125,000',
+    'location': '6 Midland Terrace Belfast, BT15 1FB',
+    'property_type': '3 Bed Semi-detached House',
+    'bedrooms': '3',
+    'bathrooms': '1',
+    'receptions': '1',
+    'size': '60 sq m (645.8 sq ft)',
+    'tenure': 'Freehold',
+    'energy_rating': 'C73/C79',
+    'heating': 'Gas',
+    'typical_mortgage': '£460.69 per month',
+    'rates': '£479.65 pa',
+    'description': 'Semi detached home close to the city centre. ' * 20,
+    'additional_info': '• Gas fired central heating\n• Double glazing',
+    'room_details': ['Lounge: 4.04m x 2.84m', 'Kitchen: 2.92m x 2.24m'],
+    'directions': None,
+    'features': ['Gas fired central heating', 'Double glazing', 'Forecourt parking'],
+}
+
+
+def pydantic_path():
+    item = PropertyListing(**RAW).model_dump()
+    for _ in range(STAGES):
+        record = ItemAdapter(item).asdict()
+        record.get('price')
+    ItemAdapter(item)['distance_to_destination'] = 1.2
+
+
+def record_path():
+    item = PropertyRecord.from_raw(RAW)
+    for _ in range(STAGES - 1):
+        ItemAdapter(item).get('price')
+    normalize_record(ItemAdapter(item))
+    ItemAdapter(item)['distance_to_destination'] = 1.2
+
+
+def bench(fn, items):
+    fn()
+    start = time.perf_counter()
+    for _ in range(items):
+        fn()
+    return (time.perf_counter() - start) / items * 1e6
+
+
+def peak_bytes(build, items):
+    tracemalloc.start()
+    kept = [build() for _ in range(items)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size / items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=20000)
+    args = parser.parse_args()
+
+    old = bench(pydantic_path, args.items)
+    new = bench(record_path, args.items)
+    print(f"Per item, build + {STAGES} stages ({args.items} items):")
+    print(f"  Pydantic + asdict per stage: {old:7.1f} µs")
+    print(f"  PropertyRecord (no copies):  {new:7.1f} µs   ({old / new:.1f}x faster)")
+
+    old_mem = peak_bytes(lambda: PropertyListing(**RAW).model_dump(), args.items // 4)
+    new_mem = peak_bytes(lambda: PropertyRecord.from_raw(RAW), args.items // 4)
+    print("Memory per held item (excluding shared strings):")
+    print(f"  dict from model_dump():      {old_mem:7.0f} B")
+    print(f"  PropertyRecord:              {new_mem:7.0f} B")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""Build compact, pre-joined data bundles for the webapp.
+
+A bundle is one dataset (one or more scrape exports) with coordinates already
+joined from the geocoding cache, the monthly payment precomputed and numeric
+fields typed, so the webapp never has to read the geocoding cache or the raw
+exports. Three files are written to the output directory:
+
+- ``<dataset>.v<N>.jsonl``: a header line followed by one JSON array per
+  property, in ``columns`` order
+- ``<dataset>.v<N>.index.json``: columns, counts and the byte range of every
+  page of rows, so a page can be read without parsing the rest of the file
+- ``manifest.json``: every dataset in the directory and the default one
+
+Usage:
+    python -m propertypal_scraper.bundle --dataset belfast
+    python -m propertypal_scraper.bundle --input data/raw/properties_20260220_083859.jsonl
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from propertypal_scraper.exporters import iter_records
+from propertypal_scraper.geocoding import normalize_address
+from propertypal_scraper.perplexity_rating import calculate_monthly_payment
+from propertypal_scraper.scoring import PropertyScorer
+from propertypal_scraper.utils import parse_annual_amount, parse_epc, parse_size_sqm, slugify, to_float, to_int
+
+BUNDLE_VERSION = 1
+
+# (bundle column, type); types: str, int, float, list
+BUNDLE_COLUMNS = [
+    ('property_id', 'str'),
+    ('url', 'str'),
+    ('location', 'str'),
+    ('price', 'int'),
+    ('calculated_monthly_payment', 'float'),
+    ('perplexity_rating', 'float'),
+    ('perplexity_analysis', 'str'),
+    ('scraped_at', 'str'),
+    ('description', 'str'),
+    ('tenure', 'str'),
+    ('heating', 'str'),
+    ('property_type', 'str'),
+    ('energy_rating', 'str'),
+    ('bedrooms', 'int'),
+    ('bathrooms', 'int'),
+    ('receptions', 'int'),
+    ('size', 'float'),
+    ('price_per_sqm', 'float'),
+    ('rates', 'str'),
+    ('rates_annual', 'float'),
+    ('epc_score', 'int'),
+    ('epc_potential_score', 'int'),
+    ('features', 'list'),
+    ('listing_status', 'str'),
+    ('distance_to_destination', 'float'),
+    ('lat', 'float'),
+    ('lng', 'float'),
+    ('priority_score', 'float'),
+    ('location_score', 'int'),
+]
+
+# Decimal places kept for float columns
+FLOAT_PRECISION = {
+    'calculated_monthly_payment': 2,
+    'distance_to_destination': 2,
+    'size': 1,
+    'price_per_sqm': 2,
+    'rates_annual': 2,
+    'lat': 6,
+    'lng': 6,
+}
+
+_TIMESTAMP_RE = re.compile(r'(\d{8}_\d{6})')
+
+
+def load_coordinates(cache_file: str) -> Dict[str, Tuple[float, float]]:
+    """Address -> (lat, lng) from the geocoding cache, skipping failed lookups."""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return {
+        address: tuple(entry['coords'])
+        for address, entry in cache.items()
+        if isinstance(entry, dict) and entry.get('coords')
+    }
+
+
+def bundle_row(record: Dict[str, Any], coordinates: Dict[str, Tuple[float, float]]) -> List[Any]:
+    """Typed bundle row for one scraped record."""
+    values = dict(record)
+    values['price'] = to_int(record.get('price'))
+    values['size'] = record.get('size_sqm') or parse_size_sqm(record.get('size'))
+    if values.get('price_per_sqm') is None and values['price'] and values['size']:
+        values['price_per_sqm'] = values['price'] / values['size']
+    if values.get('rates_annual') is None:
+        values['rates_annual'] = parse_annual_amount(record.get('rates'))
+    if values.get('epc_score') is None:
+        _, values['epc_score'], _, values['epc_potential_score'] = parse_epc(record.get('energy_rating'))
+
+    if values.get('calculated_monthly_payment') is None and values['price']:
+        values['calculated_monthly_payment'] = calculate_monthly_payment(values['price'])
+
+    lat, lng = record.get('latitude'), record.get('longitude')
+    if lat is None or lng is None:
+        lat, lng = coordinates.get(normalize_address(record.get('location') or ''), (None, None))
+    values['lat'], values['lng'] = lat, lng
+
+    row = []
+    for name, type_name in BUNDLE_COLUMNS:
+        value = values.get(name)
+        if value is not None:
+            if type_name == 'int':
+                value = to_int(value)
+            elif type_name == 'float':
+                value = to_float(value)
+                if value is not None and name in FLOAT_PRECISION:
+                    value = round(value, FLOAT_PRECISION[name])
+            elif type_name == 'list':
+                value = list(value) if isinstance(value, (list, tuple)) else [str(value)]
+            elif not isinstance(value, str):
+                value = value.isoformat() if isinstance(value, datetime) else str(value)
+        row.append(value)
+    return row
+
+
+def build_bundle(
+    records: Iterable[Dict[str, Any]],
+    dataset: str,
+    output_dir: str,
+    cache_file: Optional[str] = None,
+    page_size: int = 50,
+    data_timestamp: Optional[str] = None,
+    sources: Iterable[str] = ()
+) -> Dict[str, Any]:
+    """Write the bundle and index for ``dataset`` and register it in the manifest.
+
+    Records are de-duplicated by property_id (the last one wins, so pass
+    exports oldest first). Priority scores use the default weights. Returns
+    the index.
+    """
+    coordinates = load_coordinates(cache_file) if cache_file else {}
+
+    latest: Dict[str, Dict[str, Any]] = {}
+    latest_scrape = ''
+    for record in records:
+        property_id = record.get('property_id')
+        if property_id:
+            latest[str(property_id)] = record
+            latest_scrape = max(latest_scrape, str(record.get('scraped_at') or ''))
+
+    scorer = PropertyScorer(latest.values())
+    priority = scorer.scores()
+    location = scorer.location_scores
+    rows: Dict[str, List[Any]] = {}
+    for i, (property_id, record) in enumerate(latest.items()):
+        record = dict(record, priority_score=float(priority[i]), location_score=round(float(location[i])))
+        rows[property_id] = bundle_row(record, coordinates)
+
+    generated_at = datetime.now()
+    if not data_timestamp:
+        try:
+            data_timestamp = datetime.fromisoformat(latest_scrape).strftime('%Y%m%d_%H%M%S')
+        except ValueError:
+            data_timestamp = generated_at.strftime('%Y%m%d_%H%M%S')
+    columns = [name for name, _ in BUNDLE_COLUMNS]
+    base = f'{dataset}.v{BUNDLE_VERSION}'
+    bundle_path = os.path.join(output_dir, f'{base}.jsonl')
+    index_path = os.path.join(output_dir, f'{base}.index.json')
+
+    header = {
+        'version': BUNDLE_VERSION,
+        'dataset': dataset,
+        'generated_at': generated_at.isoformat(),
+        'data_timestamp': data_timestamp,
+        'count': len(rows),
+        'columns': columns,
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    pages = []
+    with open(bundle_path + '.tmp', 'wb') as f:
+        header_line = json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n'
+        f.write(header_line)
+        offset = len(header_line)
+
+        page_start, page_rows = offset, 0
+        for row in rows.values():
+            line = json.dumps(row, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+            f.write(line)
+            offset += len(line)
+            page_rows += 1
+            if page_rows == page_size:
+                pages.append([page_start, offset - page_start, page_rows])
+                page_start, page_rows = offset, 0
+        if page_rows:
+            pages.append([page_start, offset - page_start, page_rows])
+
+    index = dict(
+        header,
+        bundle=os.path.basename(bundle_path),
+        bytes=offset,
+        page_size=page_size,
+        header_bytes=len(header_line),
+        pages=pages,
+        sources=[os.path.basename(source) for source in sources],
+    )
+    _write_json(index_path, index)
+    os.replace(bundle_path + '.tmp', bundle_path)
+    _update_manifest(output_dir, dataset, index, os.path.basename(index_path))
+    return index
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(path + '.tmp', path)
+
+
+def _update_manifest(output_dir: str, dataset: str, index: Dict[str, Any], index_file: str) -> None:
+    manifest_path = os.path.join(output_dir, 'manifest.json')
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        manifest = {}
+
+    datasets = manifest.get('datasets', {})
+    datasets[dataset] = {
+        'version': BUNDLE_VERSION,
+        'index': index_file,
+        'bundle': index['bundle'],
+        'count': index['count'],
+        'data_timestamp': index['data_timestamp'],
+        'generated_at': index['generated_at'],
+    }
+    _write_json(manifest_path, {
+        'version': BUNDLE_VERSION,
+        'default': dataset,
+        'datasets': datasets,
+    })
+
+
+def latest_export(directory: str = 'data/raw') -> Optional[str]:
+    """Newest properties export in ``directory``, or None."""
+    paths = glob.glob(os.path.join(directory, 'properties_*.json*'))
+    paths = [p for p in paths if not p.endswith('.part')]
+    return max(paths, key=os.path.getmtime) if paths else None
+
+
+def main():
+    from propertypal_scraper import settings
+
+    parser = argparse.ArgumentParser(description="Build a webapp data bundle from scrape exports")
+    parser.add_argument('--input', nargs='+', help="Export files, oldest first (default: newest in data/raw)")
+    parser.add_argument('--dataset', help="Dataset name (default: derived from the input file)")
+    parser.add_argument('--output', default=settings.BUNDLE_OUTPUT_DIR, help="Bundle directory")
+    parser.add_argument('--page-size', type=int, default=settings.BUNDLE_PAGE_SIZE, help="Rows per index page")
+    parser.add_argument('--cache', default=settings.GEOCODING_CACHE_FILE, help="Geocoding cache file")
+    args = parser.parse_args()
+
+    inputs = args.input or [p for p in [latest_export()] if p]
+    if not inputs:
+        parser.error("no export found in data/raw; pass --input")
+
+    timestamps = [m.group(1) for m in (_TIMESTAMP_RE.search(os.path.basename(p)) for p in inputs) if m]
+    data_timestamp = max(timestamps) if timestamps else None
+    dataset = slugify(args.dataset or os.path.basename(inputs[-1]).split('.')[0])
+
+    def records():
+        for path in inputs:
+            yield from iter_records(path)
+
+    index = build_bundle(
+        records(), dataset, args.output,
+        cache_file=args.cache, page_size=args.page_size,
+        data_timestamp=data_timestamp, sources=inputs
+    )
+    print(f"Bundle '{dataset}': {index['count']} properties, {len(index['pages'])} pages, "
+          f"{index['bytes'] / 1024:.1f} KB -> {os.path.join(args.output, index['bundle'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Checkpoints for resumable crawls.
+
+A crawl started with a job id (``scrapy crawl property_spider -a job=<id>``
+or ``run_scraper.py --job <id>``) keeps its state in
+``JOBS_DIR/<id>/checkpoint.db``:
+
+- the request frontier: every request the spider yielded and whether its page
+  is finished (a detail page only once its item has left the pipelines)
+- the Perplexity ratings already paid for
+- the size of each export file at the last checkpoint
+
+Export files of a job are named after it and only ever appended to. Every
+CHECKPOINT_INTERVAL seconds ExportPipeline flushes them and commits their
+sizes together with the pages whose items they contain. Restarting a job that
+died truncates the exports back to the last checkpoint and requests only the
+pages that were still pending or in flight, so nothing is rated twice and only
+the pages since the last checkpoint are downloaded again.
+
+Scrapy's own JOBDIR is not used: it forgets requests that were being
+downloaded when the process died.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from propertypal_scraper.utils import slugify
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    fingerprint TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    callback TEXT,
+    done INTEGER NOT NULL DEFAULT 0,
+    property_id TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ratings (
+    property_id TEXT PRIMARY KEY,
+    rating REAL,
+    analysis TEXT,
+    monthly_payment REAL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+
+def job_path(job: str) -> str:
+    from propertypal_scraper import settings
+
+    return os.path.join(settings.JOBS_DIR, slugify(job), 'checkpoint.db')
+
+
+class JobCheckpoint:
+    """Frontier, finished pages, ratings and export offsets of one job, in SQLite.
+
+    Finished pages are held in memory until ``commit`` when ``autocommit`` is
+    off (ExportPipeline turns it off so pages are only committed together with
+    the export offsets that contain their items).
+    """
+
+    def __init__(self, path: str, job: Optional[str] = None):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.job = slugify(job or os.path.basename(os.path.dirname(path)))
+        self.autocommit = True
+        self.completed: List[Tuple[str, Optional[str]]] = []
+
+        self.conn = sqlite3.connect(path, isolation_level=None, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+        self.known = {fingerprint for (fingerprint,) in self.conn.execute('SELECT fingerprint FROM requests')}
+        self.resumed = bool(self.known)
+        self.started_at = self.get('started_at')
+        if self.started_at is None:
+            self.started_at = datetime.now().isoformat()
+            self.set('started_at', self.started_at)
+
+    @classmethod
+    def for_job(cls, job: str) -> 'JobCheckpoint':
+        return cls(job_path(job), job)
+
+    # Job metadata
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self.conn.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key: str, value: Any) -> None:
+        self.conn.execute(
+            'INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)', (key, json.dumps(value))
+        )
+
+    # Frontier
+
+    def is_known(self, fingerprint: str) -> bool:
+        """True if the request was yielded before in this job (finished or not)."""
+        return fingerprint in self.known
+
+    def add(self, fingerprint: str, url: str, callback: Optional[str]) -> None:
+        """Record a request before it is scheduled."""
+        self.conn.execute(
+            'INSERT OR IGNORE INTO requests (fingerprint, url, callback) VALUES (?, ?, ?)',
+            (fingerprint, url, callback)
+        )
+        self.known.add(fingerprint)
+
+    def pending(self) -> List[Tuple[str, str, Optional[str]]]:
+        """``(fingerprint, url, callback)`` of every request whose page isn't finished."""
+        return self.conn.execute(
+            'SELECT fingerprint, url, callback FROM requests WHERE done = 0'
+        ).fetchall()
+
+    def complete(self, fingerprint: str, property_id: Optional[str] = None) -> None:
+        """Mark a page finished (committed now, or with the next checkpoint)."""
+        self.completed.append((fingerprint, property_id))
+        if self.autocommit:
+            self.commit(self.take_completed())
+
+    def take_completed(self) -> List[Tuple[str, Optional[str]]]:
+        """Finished pages not committed yet; they're the caller's to commit."""
+        completed, self.completed = self.completed, []
+        return completed
+
+    def commit(self, completed: List[Tuple[str, Optional[str]]], exports: Optional[Dict[str, Any]] = None) -> None:
+        """Mark ``completed`` pages finished and store export offsets, in one transaction.
+
+        Offsets of sinks missing from ``exports`` keep their previous value.
+        """
+        self.conn.execute('BEGIN')
+        try:
+            self.conn.executemany(
+                'UPDATE requests SET done = 1, property_id = coalesce(?, property_id) WHERE fingerprint = ?',
+                [(property_id, fingerprint) for fingerprint, property_id in completed]
+            )
+            if exports:
+                self.set('exports', {**self.get('exports', {}), **exports})
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+    def property_ids(self) -> List[str]:
+        """Listings exported by this job so far (committed pages only)."""
+        return [row[0] for row in self.conn.execute(
+            'SELECT property_id FROM requests WHERE done = 1 AND property_id IS NOT NULL'
+        )]
+
+    def counts(self) -> Tuple[int, int]:
+        """(finished, pending) requests."""
+        done, total = self.conn.execute('SELECT coalesce(sum(done), 0), count(*) FROM requests').fetchone()
+        return done, total - done
+
+    # Ratings
+
+    def rating(self, property_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            'SELECT rating, analysis, monthly_payment FROM ratings WHERE property_id = ?', (property_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'rating_score': row[0], 'rating_text': row[1], 'monthly_payment': row[2]}
+
+    def save_rating(self, property_id: str, result: Dict[str, Any]) -> None:
+        self.conn.execute(
+            'INSERT OR REPLACE INTO ratings (property_id, rating, analysis, monthly_payment) VALUES (?, ?, ?, ?)',
+            (property_id, result.get('rating_score'), result.get('rating_text'), result.get('monthly_payment'))
+        )
+
+    def close(self) -> None:
+        if self.autocommit and self.completed:
+            self.commit(self.take_completed())
+        self.conn.close()
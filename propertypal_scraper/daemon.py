@@ -0,0 +1,307 @@
+"""Long-running scheduler that re-runs each search in urls.json on its own cadence.
+
+Searches in urls.json may set an ``interval`` and ``jitter`` (seconds, or
+"30m", "6h", "1d"); defaults come from a top-level ``schedule`` object:
+
+    {
+      "schedule": {"interval": "6h", "jitter": "15m"},
+      "searches": [
+        {"name": "Belfast", "url": "...", "interval": "2h", "perplexity": true}
+      ]
+    }
+
+All crawls run in this process, so the geocoding service, FlareSolverr
+session and dedup index stay warm between runs (see shared.py). urls.json is
+re-read whenever it changes, a search never overlaps itself, and every
+search's last and next run are saved to DAEMON_STATE_FILE so a restart
+resumes the schedule instead of running everything at once.
+
+Usage:
+    python -m propertypal_scraper.daemon
+    python run_scraper.py --daemon --parallel 2
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import signal
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from propertypal_scraper.utils import slugify
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = '6h'
+_DURATION_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$', re.IGNORECASE)
+_DURATION_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_duration(value: Any) -> float:
+    """Seconds in ``value``: a number of seconds or '90s', '30m', '6h', '1d'."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    match = _DURATION_RE.match(str(value))
+    if not match:
+        raise ValueError(f"Invalid duration: {value!r}")
+    return float(match.group(1)) * _DURATION_UNITS[match.group(2).lower()]
+
+
+@dataclass(frozen=True)
+class ScheduledSearch:
+    key: str
+    name: str
+    url: str
+    interval: float
+    jitter: float
+    perplexity: bool
+
+
+def load_schedule(urls_file: str) -> Dict[str, ScheduledSearch]:
+    """Searches in ``urls_file`` keyed by slug. Raises ValueError on a bad file."""
+    try:
+        with open(urls_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in {urls_file}: {e}") from e
+
+    defaults = config.get('schedule', {})
+    searches = {}
+    for search in config.get('searches', []):
+        if not search.get('name') or not search.get('url'):
+            raise ValueError(f"Search without name or url in {urls_file}: {search}")
+        key = slugify(search['name'])
+        searches[key] = ScheduledSearch(
+            key=key,
+            name=search['name'],
+            url=search['url'],
+            interval=parse_duration(search.get('interval', defaults.get('interval', DEFAULT_INTERVAL))),
+            jitter=parse_duration(search.get('jitter', defaults.get('jitter', 0))),
+            perplexity=bool(search.get('perplexity', defaults.get('perplexity', False))),
+        )
+    return searches
+
+
+class Scheduler:
+    """Runs due searches through one CrawlerRunner, at most ``max_concurrent`` at a time."""
+
+    def __init__(
+        self,
+        urls_file: str,
+        state_file: str,
+        max_concurrent: int = 1,
+        limit: Optional[int] = None,
+        tick_seconds: float = 10.0
+    ):
+        self.urls_file = urls_file
+        self.state_file = state_file
+        self.max_concurrent = max_concurrent
+        self.limit = limit
+        self.tick_seconds = tick_seconds
+        self.searches: Dict[str, ScheduledSearch] = {}
+        self.urls_mtime = None
+        self.running: Dict[str, Any] = {}
+        self.state: Dict[str, Dict[str, Any]] = self._load_state()
+        self.runner = None
+        self.loop = None
+
+    # State
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('searches', {})
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_state(self) -> None:
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        tmp_path = self.state_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'updated_at': datetime.now().isoformat(), 'searches': self.state}, f, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+    def next_run(self, key: str) -> float:
+        value = self.state.get(key, {}).get('next_run')
+        return datetime.fromisoformat(value).timestamp() if value else 0.0
+
+    def _schedule(self, key: str, after: float) -> None:
+        search = self.searches[key]
+        next_run = after + search.interval + random.uniform(0, search.jitter)
+        self.state.setdefault(key, {})['next_run'] = datetime.fromtimestamp(next_run).isoformat(timespec='seconds')
+
+    # urls.json
+
+    def reload(self) -> None:
+        """Re-read urls.json if it changed; keeps the current searches if it's invalid."""
+        try:
+            mtime = os.path.getmtime(self.urls_file)
+        except OSError as e:
+            logger.error(f"Cannot read {self.urls_file}: {e}")
+            return
+        if mtime == self.urls_mtime:
+            return
+        self.urls_mtime = mtime
+
+        try:
+            searches = load_schedule(self.urls_file)
+        except ValueError as e:
+            logger.error(f"Keeping the current schedule: {e}")
+            return
+
+        for key in self.searches.keys() - searches.keys():
+            logger.info(f"Search removed: {self.searches[key].name}")
+        previous, self.searches = self.searches, searches
+        for key, search in searches.items():
+            state = self.state.get(key, {})
+            if key not in previous:
+                logger.info(f"Search scheduled: {search.name} (every {search.interval / 3600:g}h)")
+            if 'next_run' not in state:
+                # First time seen: spread the first runs over the jitter window
+                self.state.setdefault(key, {})['next_run'] = datetime.fromtimestamp(
+                    time.time() + random.uniform(0, search.jitter)
+                ).isoformat(timespec='seconds')
+            elif key in previous and previous[key].interval != search.interval and state.get('last_started'):
+                self._schedule(key, datetime.fromisoformat(state['last_started']).timestamp())
+        self._save_state()
+
+    # Crawls
+
+    def tick(self) -> None:
+        self.reload()
+        now = time.time()
+        due = sorted(
+            (key for key in self.searches if key not in self.running and self.next_run(key) <= now),
+            key=self.next_run
+        )
+        for key in due[:max(0, self.max_concurrent - len(self.running))]:
+            self._start(key)
+
+    def _start(self, key: str) -> None:
+        search = self.searches[key]
+        crawler = self.runner.create_crawler('property_spider')
+        started = time.time()
+        self.state.setdefault(key, {})['last_started'] = datetime.fromtimestamp(started).isoformat(timespec='seconds')
+        logger.info(f"Starting search: {search.name}")
+
+        deferred = self.runner.crawl(
+            crawler, url=search.url, search=search.name,
+            use_perplexity='true' if search.perplexity else 'false'
+        )
+        self.running[key] = deferred
+        deferred.addBoth(self._finished, key, search, crawler, started)
+
+    def _finished(self, result, key: str, search: ScheduledSearch, crawler, started: float) -> None:
+        del self.running[key]
+        stats = crawler.stats.get_stats() if crawler.stats else {}
+        status = stats.get('finish_reason', 'error')
+        if hasattr(result, 'getErrorMessage'):
+            status = 'error'
+            logger.error(f"Search {search.name} failed: {result.getErrorMessage()}")
+
+        state = self.state.setdefault(key, {})
+        state.update(
+            last_finished=datetime.now().isoformat(timespec='seconds'),
+            last_status=status,
+            last_items=stats.get('item_scraped_count', 0),
+            last_duration_seconds=round(time.time() - started, 1),
+            runs=state.get('runs', 0) + 1,
+        )
+        if key in self.searches:
+            self._schedule(key, started)
+        self._save_state()
+        logger.info(
+            f"Search {search.name} {status}: {state['last_items']} items in "
+            f"{state['last_duration_seconds']:.0f}s, next run {state.get('next_run')}"
+        )
+
+    # Daemon
+
+    def run(self) -> None:
+        from scrapy.crawler import CrawlerRunner
+        from scrapy.utils.log import configure_logging
+        from scrapy.utils.ossignal import install_shutdown_handlers
+        from scrapy.utils.project import get_project_settings
+        from scrapy.utils.reactor import install_reactor
+
+        from propertypal_scraper import shared
+
+        settings = get_project_settings()
+        if self.limit is not None:
+            settings.set('CLOSESPIDER_ITEMCOUNT', self.limit)
+        configure_logging(settings)
+        if settings.get('TWISTED_REACTOR'):
+            install_reactor(settings['TWISTED_REACTOR'])
+        from twisted.internet import reactor, task
+
+        shared.enable()
+        self.runner = CrawlerRunner(settings)
+        self.reload()
+        logger.info(
+            f"Scheduler started: {len(self.searches)} searches, "
+            f"up to {self.max_concurrent} at a time, state in {self.state_file}"
+        )
+
+        self.loop = task.LoopingCall(self.tick)
+        self.loop.start(self.tick_seconds)
+        # Like CrawlerProcess: first Ctrl-C stops gracefully, a second one kills
+        install_shutdown_handlers(self._signal_shutdown)
+        reactor.run(installSignalHandlers=False)
+
+    def _signal_shutdown(self, signum, _):
+        from scrapy.utils.ossignal import install_shutdown_handlers
+        from twisted.internet import reactor
+
+        install_shutdown_handlers(self._signal_kill)
+        reactor.callFromThread(self.stop)
+
+    def _signal_kill(self, signum, _):
+        from scrapy.utils.ossignal import install_shutdown_handlers
+        from twisted.internet import reactor
+
+        install_shutdown_handlers(signal.SIG_IGN)
+        reactor.callFromThread(reactor.stop)
+
+    def stop(self):
+        """Stop scheduling, let running crawls shut down, close shared resources, stop the reactor."""
+        from twisted.internet import reactor
+        from twisted.internet.defer import DeferredList
+
+        from propertypal_scraper import shared
+
+        logger.info(f"Scheduler stopping ({len(self.running)} searches running)")
+        if self.loop and self.loop.running:
+            self.loop.stop()
+        # Wait on our own crawl Deferreds so _finished() has recorded every run
+        running = list(self.running.values())
+        self.runner.stop()
+        deferred = DeferredList(running)
+        deferred.addBoth(lambda _: self._save_state())
+        deferred.addBoth(lambda _: shared.close_all())
+        deferred.addBoth(lambda _: reactor.running and reactor.stop())
+        return deferred
+
+
+def main(argv=None):
+    from propertypal_scraper import settings
+
+    parser = argparse.ArgumentParser(description="Re-run searches from urls.json on a schedule")
+    parser.add_argument('--urls', default='urls.json', help="Search list (re-read when it changes)")
+    parser.add_argument('--state', default=settings.DAEMON_STATE_FILE, help="Schedule state file")
+    parser.add_argument('--parallel', type=int, default=1, help="Maximum searches running at once")
+    parser.add_argument('--limit', type=int, help="Item cap per run")
+    parser.add_argument('--tick', type=float, default=settings.DAEMON_TICK_SECONDS, help="Seconds between checks")
+    args = parser.parse_args(argv)
+
+    Scheduler(
+        args.urls, args.state, max_concurrent=args.parallel, limit=args.limit, tick_seconds=args.tick
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
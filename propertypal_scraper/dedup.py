@@ -0,0 +1,111 @@
+"""Persistent property_id index shared by every search and run.
+
+An in-memory Bloom filter answers "never seen" without touching disk. Only
+possible hits (and inserts) go to the on-disk index, a keyed SQLite table in
+WAL mode, so several crawls can share one index at the same time.
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Iterable, Mapping, Optional, Tuple
+
+from propertypal_scraper.diff import field_hash
+
+POLICIES = ('run', 'drop', 'touch', 'reemit')
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one blake2b digest)."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class DedupIndex:
+    """property_id -> (fingerprint, first_seen, last_seen, search) on disk."""
+
+    def __init__(self, path: str, capacity: int = 1_000_000, error_rate: float = 0.001):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        # Autocommit: every write is visible to other crawls sharing the index
+        self.conn = sqlite3.connect(path, isolation_level=None, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS seen ('
+            'property_id TEXT PRIMARY KEY, fingerprint INTEGER, '
+            'first_seen TEXT, last_seen TEXT, search TEXT) WITHOUT ROWID'
+        )
+
+        existing = self.conn.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+        self.bloom = BloomFilter(max(capacity, existing * 2), error_rate)
+        for (property_id,) in self.conn.execute('SELECT property_id FROM seen'):
+            self.bloom.add(property_id)
+        self.false_positives = 0
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+
+    def lookup(self, property_id: str) -> Optional[Tuple[int, str, str, str]]:
+        """Stored ``(fingerprint, first_seen, last_seen, search)`` or None."""
+        if property_id not in self.bloom:
+            return None
+        row = self.conn.execute(
+            'SELECT fingerprint, first_seen, last_seen, search FROM seen WHERE property_id = ?',
+            (property_id,)
+        ).fetchone()
+        if row is None:
+            self.false_positives += 1
+        return row
+
+    def insert(self, property_id: str, fingerprint: int, search: Optional[str]) -> bool:
+        """Record a new listing. Returns False if another crawl added it first."""
+        now = datetime.now().isoformat()
+        cursor = self.conn.execute(
+            'INSERT OR IGNORE INTO seen (property_id, fingerprint, first_seen, last_seen, search) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (property_id, fingerprint, now, now, search)
+        )
+        self.bloom.add(property_id)
+        return cursor.rowcount == 1
+
+    def touch(self, property_id: str, fingerprint: Optional[int] = None) -> None:
+        """Update last_seen (and the fingerprint, if given)."""
+        now = datetime.now().isoformat()
+        if fingerprint is None:
+            self.conn.execute('UPDATE seen SET last_seen = ? WHERE property_id = ?', (now, property_id))
+        else:
+            self.conn.execute(
+                'UPDATE seen SET last_seen = ?, fingerprint = ? WHERE property_id = ?',
+                (now, fingerprint, property_id)
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def record_fingerprint(record: Mapping[str, Any], fields: Iterable[str]) -> int:
+    """One 32-bit hash over the tracked fields of a listing."""
+    return field_hash([record.get(field) for field in fields])
@@ -0,0 +1,153 @@
+"""Run-to-run change detection for a search.
+
+Each listing is reduced to a small fingerprint: its price and status plus a
+CRC32 per tracked field. Fingerprints from the previous run of a search are
+kept on disk, so comparing a run against the last one costs a few integers
+per listing rather than a copy of every item.
+"""
+
+import json
+import os
+import zlib
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from propertypal_scraper.exporters import json_default
+
+# Scraped fields compared between runs
+DEFAULT_DIFF_FIELDS = [
+    'price', 'listing_status', 'property_type', 'location', 'bedrooms',
+    'bathrooms', 'receptions', 'size', 'tenure', 'energy_rating', 'heating',
+    'rates', 'description', 'features',
+]
+
+# property_id -> (price, listing_status, per-field hashes)
+Fingerprint = Tuple[Optional[int], Optional[str], List[int]]
+
+
+def field_hash(value: Any) -> int:
+    """Stable 32-bit hash of a field value."""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        data = value.strip().encode('utf-8')
+    else:
+        data = json.dumps(value, sort_keys=True, ensure_ascii=False, default=json_default).encode('utf-8')
+    return zlib.crc32(data)
+
+
+class FingerprintStore:
+    """Fingerprints of every listing seen in the last run of one search."""
+
+    def __init__(self, path: str, fields: Iterable[str] = DEFAULT_DIFF_FIELDS):
+        self.path = path
+        self.fields = list(fields)
+        self.listings: Dict[str, Fingerprint] = {}
+        self.load()
+
+    def load(self) -> None:
+        """Load the previous run; hashes of fields no longer tracked are remapped."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+
+        stored_fields = data.get('fields', [])
+        if stored_fields == self.fields:
+            self.listings = {pid: tuple(fp) for pid, fp in data.get('listings', {}).items()}
+            return
+
+        # Tracked fields changed: keep hashes for fields in both, unknown (None) for new ones
+        positions = [stored_fields.index(f) if f in stored_fields else None for f in self.fields]
+        for pid, (price, status, hashes) in data.get('listings', {}).items():
+            remapped = [hashes[i] if i is not None else None for i in positions]
+            self.listings[pid] = (price, status, remapped)
+
+    def save(self, listings: Dict[str, Fingerprint]) -> None:
+        """Atomically replace the stored fingerprints."""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'fields': self.fields, 'listings': listings}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+
+class ChangeDetector:
+    """Compare items against the previous run and produce change events.
+
+    Events are plain dicts with an ``event`` key of ``new``, ``price_changed``,
+    ``field_changed`` or ``disappeared``.
+    """
+
+    def __init__(self, store: FingerprintStore):
+        self.store = store
+        self.fields = store.fields
+        self.previous = store.listings
+        self.current: Dict[str, Fingerprint] = {}
+
+    def fingerprint(self, record: Mapping[str, Any]) -> Fingerprint:
+        return (
+            record.get('price'),
+            record.get('listing_status'),
+            [field_hash(record.get(field)) for field in self.fields],
+        )
+
+    def compare(self, record: Mapping[str, Any]) -> List[Dict[str, Any]]:
+        """Events for one item (empty if it is unchanged since the last run)."""
+        property_id = record.get('property_id')
+        if not property_id:
+            return []
+
+        fingerprint = self.fingerprint(record)
+        self.current[property_id] = fingerprint
+        base = {'property_id': property_id, 'url': record.get('url'), 'location': record.get('location')}
+
+        previous = self.previous.get(property_id)
+        if previous is None:
+            return [dict(base, event='new', price=record.get('price'),
+                         listing_status=record.get('listing_status'))]
+
+        old_price, old_status, old_hashes = previous
+        new_price, new_status, new_hashes = fingerprint
+        if old_hashes == new_hashes:
+            return []
+
+        events = []
+        if old_price != new_price:
+            events.append(dict(
+                base, event='price_changed', old_price=old_price, new_price=new_price,
+                change=(new_price - old_price) if old_price is not None and new_price is not None else None
+            ))
+
+        changed = [
+            field for field, old, new in zip(self.fields, old_hashes, new_hashes)
+            if field != 'price' and old is not None and old != new
+        ]
+        if changed:
+            event = dict(base, event='field_changed', fields=changed,
+                         values={field: record.get(field) for field in changed})
+            if 'listing_status' in changed:
+                event['old_listing_status'] = old_status
+            events.append(event)
+        return events
+
+    def disappeared(self) -> List[Dict[str, Any]]:
+        """Listings from the previous run that were not seen in this one."""
+        return [
+            {'property_id': pid, 'event': 'disappeared', 'last_price': fp[0], 'last_listing_status': fp[1]}
+            for pid, fp in self.previous.items() if pid not in self.current
+        ]
+
+    def save(self, complete: bool = True) -> None:
+        """Persist this run's fingerprints.
+
+        A partial run (limit reached, crash, Ctrl-C) is merged into the previous
+        fingerprints instead of replacing them, so listings it never reached
+        aren't reported as new next time.
+        """
+        if complete:
+            self.store.save(self.current)
+        else:
+            self.store.save({**self.previous, **self.current})
@@ -0,0 +1,715 @@
+"""Streaming file writers used by the export pipelines."""
+
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+COMPRESSION_EXTENSIONS = {
+    'none': '',
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps fallback for values the encoder doesn't know."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def project(record: Dict[str, Any], fields: Optional[Iterable[str]] = None,
+            exclude: Iterable[str] = ()) -> Dict[str, Any]:
+    """Keep only ``fields`` (if given) and drop ``exclude`` from a record."""
+    if fields:
+        record = {field: record.get(field) for field in fields}
+    if exclude:
+        record = {k: v for k, v in record.items() if k not in exclude}
+    return record
+
+
+def open_compressed(path: str, compression: str = 'none', mode: str = 'wb'):
+    """Open a binary file stream with the given compression."""
+    if compression == 'none':
+        return open(path, mode)
+    if compression == 'gzip':
+        return gzip.open(path, mode)
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd compression requires the zstandard package")
+        raw = open(path, mode)
+        if 'r' in mode:
+            return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Read records from a JSON array or JSON Lines export (.gz/.zst aware)."""
+    compression = next(
+        (name for name, ext in COMPRESSION_EXTENSIONS.items() if ext and path.endswith(ext)), 'none'
+    )
+    with open_compressed(path, compression, 'rb') as raw:
+        stream = io.TextIOWrapper(raw, encoding='utf-8')
+        first = stream.read(1)
+        while first.isspace():
+            first = stream.read(1)
+        if first == '[':
+            yield from json.loads(first + stream.read())
+            return
+        yield from (json.loads(line) for line in (first + stream.readline(), *stream) if line.strip())
+
+
+class JsonLinesWriter:
+    """Buffered JSON Lines writer with optional gzip/zstd compression.
+
+    Records are written to ``<path>.part`` and the file is renamed into place
+    on close, so a finished file is always complete. Each line is a standalone
+    JSON document, so a crawl that dies still leaves every flushed record
+    readable.
+
+    With ``resume_offset`` the file of an earlier run (``.part`` or finished)
+    is truncated to that size and appended to; ``checkpoint`` returns the
+    offsets to resume from.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        compression: str = 'none',
+        flush_interval: float = 5.0,
+        buffer_size: int = 64 * 1024,
+        fields: Optional[Iterable[str]] = None,
+        exclude: Iterable[str] = (),
+        resume_offset: Optional[int] = None
+    ):
+        """
+        Args:
+            path: Destination path without the compression extension
+            compression: 'none', 'gzip' or 'zstd'
+            flush_interval: Max seconds between writes to disk
+            buffer_size: Flush early once this many bytes are buffered
+            fields: Only export these fields (in this order)
+            exclude: Drop these fields from every record
+            resume_offset: Append to an earlier run's file, cut back to this size
+        """
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+
+        self.path = path + COMPRESSION_EXTENSIONS[compression]
+        self.part_path = self.path + '.part'
+        self.compression = compression
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self.fields = list(fields) if fields else None
+        self.exclude = set(exclude)
+        self.count = 0
+
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._last_flush = time.monotonic()
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if resume_offset is None:
+            self._stream = open_compressed(self.part_path, compression)
+            return
+
+        if not os.path.exists(self.part_path) and os.path.exists(self.path):
+            os.replace(self.path, self.part_path)
+        with open(self.part_path, 'ab') as f:
+            f.truncate(resume_offset)
+        self._stream = open_compressed(self.part_path, compression, 'ab')
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Buffer one record, flushing if the interval or buffer size is reached."""
+        record = project(record, self.fields, self.exclude)
+        line = json.dumps(record, ensure_ascii=False, default=json_default).encode('utf-8') + b'\n'
+        self._buffer.append(line)
+        self._buffered_bytes += len(line)
+        self.count += 1
+
+        if (self._buffered_bytes >= self.buffer_size or
+                time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered records through to the file."""
+        if self._buffer:
+            self._stream.write(b''.join(self._buffer))
+            self._buffer = []
+            self._buffered_bytes = 0
+        self._stream.flush()
+        self._last_flush = time.monotonic()
+
+    def checkpoint(self) -> int:
+        """Flush through to disk and return the file size to resume from.
+
+        A compressed stream is ended (gzip member, zstd frame) and a new one
+        started, so the file up to the returned offset decompresses on its own.
+        """
+        self.flush()
+        if self.compression != 'none':
+            self._stream.close()
+        with open(self.part_path, 'rb+') as f:
+            os.fsync(f.fileno())
+            offset = f.seek(0, os.SEEK_END)
+        if self.compression != 'none':
+            self._stream = open_compressed(self.part_path, self.compression, 'ab')
+        return offset
+
+    def close(self) -> None:
+        """Flush, close and atomically move the file into place."""
+        self.flush()
+        self._stream.close()
+        with open(self.part_path, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.replace(self.part_path, self.path)
+
+
+# Typed columns for the Parquet export; pyarrow type names
+PARQUET_COLUMNS = [
+    ('property_id', 'string'),
+    ('url', 'string'),
+    ('scraped_at', 'timestamp'),
+    ('price', 'int64'),
+    ('currency', 'string'),
+    ('location', 'string'),
+    ('property_type', 'string'),
+    ('bedrooms', 'int16'),
+    ('bathrooms', 'int16'),
+    ('receptions', 'int16'),
+    ('size', 'string'),
+    ('tenure', 'string'),
+    ('energy_rating', 'string'),
+    ('heating', 'string'),
+    ('typical_mortgage', 'string'),
+    ('rates', 'string'),
+    ('size_sqm', 'float64'),
+    ('price_per_sqm', 'float64'),
+    ('rates_annual', 'float64'),
+    ('epc_band', 'string'),
+    ('epc_score', 'int16'),
+    ('epc_potential_band', 'string'),
+    ('epc_potential_score', 'int16'),
+    ('mortgage_monthly', 'float64'),
+    ('description', 'string'),
+    ('features', 'list<string>'),
+    ('listing_status', 'string'),
+    ('canonical_id', 'string'),
+    ('perplexity_rating', 'float64'),
+    ('perplexity_analysis', 'string'),
+    ('calculated_monthly_payment', 'float64'),
+    ('distance_to_destination', 'float64'),
+    ('latitude', 'float64'),
+    ('longitude', 'float64'),
+    ('walking_distance_km', 'float64'),
+    ('walking_minutes', 'float64'),
+    ('commute_minutes', 'float64'),
+]
+
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    types = {
+        'string': pa.string(),
+        'timestamp': pa.timestamp('us'),
+        'int64': pa.int64(),
+        'int16': pa.int16(),
+        'float64': pa.float64(),
+        'list<string>': pa.list_(pa.string()),
+    }
+    return pa.schema([pa.field(name, types[type_name]) for name, type_name in PARQUET_COLUMNS])
+
+
+def _to_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+class ParquetPartitionWriter:
+    """Buffer records into Arrow record batches and write partitioned Parquet.
+
+    Files go to ``<root>/scrape_date=YYYY-MM-DD/search=<slug>/<name>.parquet``
+    (Hive-style partitions), so a whole history can be opened with
+    ``pyarrow.dataset.dataset(root, partitioning='hive')`` and queried with
+    column pruning and partition/row-group filtering. Each file is written as
+    ``.part`` and renamed into place on close.
+
+    Raises ImportError if pyarrow is not installed.
+    """
+
+    def __init__(self, root: str, search: str, name: str,
+                 batch_size: int = 1000, compression: str = 'zstd'):
+        import pyarrow  # noqa: F401 - fail fast when the optional dependency is missing
+
+        self.root = root
+        self.search = search
+        self.name = name
+        self.batch_size = batch_size
+        self.compression = compression
+        self.schema = _parquet_schema()
+        self.count = 0
+        self.paths = []
+
+        self._buffers: Dict[str, Dict[str, list]] = {}
+        self._writers = {}
+
+    def write(self, record: Dict[str, Any]) -> None:
+        scraped_at = _to_datetime(record.get('scraped_at')) or datetime.now()
+        partition = scraped_at.date().isoformat()
+
+        columns = self._buffers.get(partition)
+        if columns is None:
+            columns = self._buffers[partition] = {field.name: [] for field in self.schema}
+
+        for name, type_name in PARQUET_COLUMNS:
+            value = record.get(name)
+            if type_name == 'timestamp':
+                value = scraped_at
+            elif value is not None and type_name in ('int64', 'int16'):
+                value = int(value)
+            elif value is not None and type_name == 'float64':
+                value = float(value)
+            elif value is not None and type_name == 'string' and not isinstance(value, str):
+                value = str(value)
+            columns[name].append(value)
+        self.count += 1
+
+        if len(columns['property_id']) >= self.batch_size:
+            self._write_batch(partition)
+
+    def _write_batch(self, partition: str) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = self._buffers.pop(partition, None)
+        if not columns or not columns['property_id']:
+            return
+
+        batch = pa.RecordBatch.from_pydict(columns, schema=self.schema)
+        writer = self._writers.get(partition)
+        if writer is None:
+            directory = os.path.join(self.root, f'scrape_date={partition}', f'search={self.search}')
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f'{self.name}.parquet')
+            writer = pq.ParquetWriter(path + '.part', self.schema, compression=self.compression)
+            self._writers[partition] = writer
+            self.paths.append(path)
+        writer.write_batch(batch)
+
+    def close(self) -> None:
+        """Write remaining buffers, finalize every file and move them into place."""
+        for partition in list(self._buffers):
+            self._write_batch(partition)
+        for writer in self._writers.values():
+            writer.close()
+        for path in self.paths:
+            os.replace(path + '.part', path)
+
+
+def normalize_record(record: Mapping[str, Any]) -> Dict[str, Any]:
+    """Prepare an item once for every sink.
+
+    Datetimes become ISO strings and lists/dicts are copied, so the record can
+    be handed to the export thread without sharing state with the item.
+    """
+    normalized = {}
+    for key, value in record.items():
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, list):
+            value = list(value)
+        elif isinstance(value, dict):
+            value = dict(value)
+        normalized[key] = value
+    return normalized
+
+
+# Columns of the CSV export
+CSV_FIELDS = [
+    'property_id', 'url', 'scraped_at', 'price', 'currency', 'location',
+    'property_type', 'bedrooms', 'bathrooms', 'receptions', 'description',
+    'size_sqm', 'price_per_sqm', 'rates_annual', 'epc_band', 'epc_score',
+    'epc_potential_band', 'epc_potential_score', 'mortgage_monthly',
+    'calculated_monthly_payment', 'perplexity_rating', 'perplexity_analysis',
+    'distance_to_destination', 'walking_distance_km', 'walking_minutes',
+    'commute_minutes',
+    'latitude', 'longitude', 'listing_status', 'canonical_id'
+]
+
+
+class ExportSink(ABC):
+    """Destination for normalized records.
+
+    ``write_batch`` and ``close`` are only called from the export thread.
+    """
+
+    name = 'sink'
+
+    @abstractmethod
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        """Write ``records`` in order."""
+
+    def checkpoint(self) -> Any:
+        """Make everything written so far durable; returns what a resumed run needs (or None)."""
+        return None
+
+    def close(self) -> None:
+        pass
+
+    @property
+    def paths(self) -> List[str]:
+        return []
+
+
+class JsonLinesSink(ExportSink):
+    name = 'json'
+
+    def __init__(self, writer: JsonLinesWriter):
+        self.writer = writer
+
+    def write_batch(self, records):
+        for record in records:
+            self.writer.write(record)
+
+    def checkpoint(self):
+        return self.writer.checkpoint()
+
+    def close(self):
+        self.writer.close()
+
+    @property
+    def paths(self):
+        return [self.writer.path]
+
+
+class CsvSink(ExportSink):
+    """Flat CSV; lists are joined with commas and None becomes an empty cell."""
+
+    name = 'csv'
+
+    def __init__(self, path: str, fieldnames: Iterable[str] = CSV_FIELDS, resume_offset: Optional[int] = None):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        if resume_offset:
+            with open(path, 'ab') as f:
+                f.truncate(resume_offset)
+            self.file = open(path, 'a', newline='', encoding='utf-8', buffering=256 * 1024)
+            self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames, extrasaction='ignore')
+        else:
+            self.file = open(path, 'w', newline='', encoding='utf-8', buffering=256 * 1024)
+            self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames, extrasaction='ignore')
+            self.writer.writeheader()
+
+    def _row(self, record):
+        row = {}
+        for field in self.fieldnames:
+            value = record.get(field)
+            if isinstance(value, list):
+                value = ', '.join(str(v) for v in value)
+            elif value is None:
+                value = ''
+            row[field] = value
+        return row
+
+    def write_batch(self, records):
+        self.writer.writerows(self._row(record) for record in records)
+        self.file.flush()
+
+    def checkpoint(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return os.fstat(self.file.fileno()).st_size
+
+    def close(self):
+        self.file.close()
+
+    @property
+    def paths(self):
+        return [self.path]
+
+
+class RatingsSink(ExportSink):
+    """JSON array of Perplexity ratings, one entry per rated item.
+
+    The file is only created once the first rated item arrives. The closing
+    bracket is rewritten after every batch, so the file is a valid array even
+    if the crawl dies; ``resume_offset`` continues the array of an earlier run.
+    """
+
+    name = 'ratings'
+
+    def __init__(self, path: str, resume_offset: Optional[int] = None):
+        self.path = path
+        self.file = None
+        self.resume_offset = resume_offset
+        self.entries = 0
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if self.resume_offset and os.path.exists(self.path):
+            self.file = open(self.path, 'r+b')
+            self.file.truncate(self.resume_offset)
+            # Position on the closing '\n]' so the next entry replaces it
+            self.file.seek(self.resume_offset - 2)
+            self.entries = 1
+        else:
+            self.file = open(self.path, 'wb')
+            self.file.write(b'[')
+
+    def write_batch(self, records):
+        chunks = []
+        for record in records:
+            if record.get('perplexity_rating') is None and record.get('perplexity_analysis') is None:
+                continue
+            if self.file is None:
+                self._open()
+
+            rating_output = {
+                'property_id': record.get('property_id'),
+                'url': record.get('url'),
+                'location': record.get('location'),
+                'price': record.get('price'),
+                'rating_score': record.get('perplexity_rating'),
+                'monthly_payment': record.get('calculated_monthly_payment'),
+                'analysis': record.get('perplexity_analysis'),
+                'rated_at': datetime.now().isoformat()
+            }
+            chunks.append((b',\n' if self.entries else b'\n') +
+                          json.dumps(rating_output, indent=2, ensure_ascii=False).encode('utf-8'))
+            self.entries += 1
+        if not chunks:
+            return
+
+        self.file.write(b''.join(chunks) + b'\n]')
+        self.file.flush()
+        self.file.seek(-2, os.SEEK_END)
+
+    def checkpoint(self):
+        if self.file is None:
+            return None
+        os.fsync(self.file.fileno())
+        return os.fstat(self.file.fileno()).st_size
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+    @property
+    def paths(self):
+        return [self.path] if self.file else []
+
+
+class ParquetSink(ExportSink):
+    """Partitioned Parquet files.
+
+    Parquet files can't be appended to, so with a ``new_writer`` factory each
+    checkpoint finishes the current files and the next records go to new ones.
+    """
+
+    name = 'parquet'
+
+    def __init__(self, writer: ParquetPartitionWriter, new_writer: Optional[Callable[[], ParquetPartitionWriter]] = None):
+        self.writer = writer
+        self.new_writer = new_writer
+        self.finished_paths: List[str] = []
+
+    def write_batch(self, records):
+        for record in records:
+            self.writer.write(record)
+
+    def checkpoint(self):
+        if self.new_writer is not None and self.writer.count:
+            self.writer.close()
+            self.finished_paths.extend(self.writer.paths)
+            self.writer = self.new_writer()
+        return None
+
+    def close(self):
+        self.writer.close()
+
+    @property
+    def paths(self):
+        return self.finished_paths + self.writer.paths
+
+
+_STOP = object()
+
+
+class _CheckpointRequest:
+    def __init__(self):
+        self.done = threading.Event()
+        self.offsets: Dict[str, Any] = {}
+
+
+class BackgroundExporter:
+    """Feed normalized records to sinks from a dedicated writer thread.
+
+    ``submit`` only puts the record on a bounded queue; the thread collects
+    batches (``batch_size`` records or ``batch_interval`` seconds, whichever
+    comes first) and hands each batch to every sink. When the queue is full
+    ``submit`` returns a Deferred that fires once the record is queued, so a
+    slow disk applies backpressure to the item pipeline without blocking the
+    reactor or growing memory. A sink that raises is logged and dropped; the
+    others carry on.
+    """
+
+    def __init__(self, sinks: List[ExportSink], queue_size: int = 1000,
+                 batch_size: int = 100, batch_interval: float = 1.0):
+        self.sinks = list(sinks)
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.count = 0
+        self.batches = 0
+        self.blocked_seconds = 0.0
+        self.max_depth = 0
+        self.failed: Dict[str, Exception] = {}
+        self.paths: List[str] = []
+        # (record, Deferred, time) waiting for room in the queue, in order
+        self._waiting = deque()
+
+        self._thread = threading.Thread(target=self._run, name='export-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, record: Dict[str, Any]):
+        """Queue ``record``; returns None, or a Deferred firing once it is queued if the queue is full.
+
+        Call from the reactor thread.
+        """
+        if not self._waiting:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                pass
+            else:
+                self._track_depth()
+                return None
+
+        from twisted.internet.defer import Deferred
+
+        waiter = Deferred()
+        self._waiting.append((record, waiter, time.monotonic()))
+        # The queue may have emptied since put_nowait failed, with nothing left to wake us
+        self._admit_waiting()
+        return waiter
+
+    def _admit_waiting(self) -> None:
+        """Move waiting records into the queue while there is room (reactor thread)."""
+        while self._waiting:
+            record, waiter, since = self._waiting[0]
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                return
+            self._waiting.popleft()
+            self.blocked_seconds += time.monotonic() - since
+            self._track_depth()
+            waiter.callback(None)
+
+    def _track_depth(self) -> None:
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """Write everything submitted so far and checkpoint every sink.
+
+        Blocks until the export thread gets there; returns each sink's
+        checkpoint value by name (sinks returning None are left out).
+        """
+        request = _CheckpointRequest()
+        self.queue.put(request)
+        request.done.wait()
+        return request.offsets
+
+    def close(self) -> None:
+        """Drain the queue, close every sink and wait for the thread."""
+        self.queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        batch = []
+        deadline = time.monotonic() + self.batch_interval
+        while True:
+            try:
+                record = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                record = None
+            else:
+                if self._waiting:
+                    from twisted.internet import reactor
+
+                    # Room for the records held back by submit
+                    reactor.callFromThread(self._admit_waiting)
+            if record is _STOP:
+                break
+            if isinstance(record, _CheckpointRequest):
+                self._write(batch)
+                batch = []
+                record.offsets = self._checkpoint()
+                record.done.set()
+                continue
+            if record is not None:
+                batch.append(record)
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.batch_interval
+
+        self._write(batch)
+        for sink in self.sinks:
+            try:
+                sink.close()
+                self.paths.extend(sink.paths)
+            except Exception as e:
+                logger.exception(f"Export sink '{sink.name}' failed to close")
+                self.failed[sink.name] = e
+
+    def _checkpoint(self) -> Dict[str, Any]:
+        offsets = {}
+        for sink in list(self.sinks):
+            try:
+                offset = sink.checkpoint()
+            except Exception as e:
+                logger.exception(f"Export sink '{sink.name}' failed to checkpoint; disabling it")
+                self.failed[sink.name] = e
+                self.sinks.remove(sink)
+                continue
+            if offset is not None:
+                offsets[sink.name] = offset
+        return offsets
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        for sink in list(self.sinks):
+            try:
+                sink.write_batch(batch)
+            except Exception as e:
+                logger.exception(f"Export sink '{sink.name}' failed; disabling it")
+                self.failed[sink.name] = e
+                self.sinks.remove(sink)
+        self.count += len(batch)
+        self.batches += 1
@@ -0,0 +1,645 @@
+"""Shared request frontier for crawls distributed over several workers.
+
+With FRONTIER=<name> set, FrontierScheduler replaces Scrapy's scheduler: the
+requests a worker's spider yields are pushed to the shared frontier named
+<name> instead of its own queue, and every worker leases its next requests
+from there. Each request is crawled once by one of the workers:
+
+- the frontier is also the dedup set: a request whose fingerprint it has
+  seen is dropped, even the start URL every worker yields
+- a leased request belongs to its worker for FRONTIER_LEASE_SECONDS; the
+  worker extends the lease while the page is in flight and acknowledges it
+  once its items have left the item pipelines. A worker that dies stops
+  extending, so its requests go to another worker when the lease runs out
+- a download or callback that fails returns the request to the frontier for
+  another worker (and FlareSolverr) to try, up to FRONTIER_MAX_ATTEMPTS
+- a worker finishes when the frontier has nothing pending or leased
+
+Backends implement Frontier. FRONTIER_URL picks one: a directory holds one
+SQLite database per frontier (SQLiteFrontier; workers on one host), an
+http:// URL points at a coordinator serving those databases to workers on
+other hosts (HttpFrontier):
+
+    python -m propertypal_scraper.frontier serve --port 8790
+    FRONTIER=belfast FRONTIER_URL=http://coordinator:8790 FLARESOLVERR_URL=http://localhost:8191/v1 \\
+        scrapy crawl property_spider -a url="..."
+
+Only the URL, callback (a spider method), method, priority and JSON-safe
+meta of a request are shared.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from scrapy import signals
+from scrapy.exceptions import IgnoreRequest
+from scrapy.http import Request
+from twisted.internet import defer, task, threads
+
+from propertypal_scraper.signals import frontier_page_done
+
+logger = logging.getLogger(__name__)
+
+# (fingerprint, serialized request, priority)
+Entry = Tuple[str, str, int]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    fingerprint TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS requests_state ON requests (state, priority DESC, seq);
+"""
+
+
+class Frontier(ABC):
+    """Shared queue and dedup set of requests, with leases and acknowledgements.
+
+    States: pending -> leased -> done, or back to pending on nack/release and
+    when a lease expires; failed after ``max_attempts`` nacks.
+    """
+
+    @abstractmethod
+    def push(self, entries: Iterable[Entry]) -> int:
+        """Add requests not seen before; returns how many were new."""
+
+    @abstractmethod
+    def lease(self, worker: str, limit: int, lease_seconds: float) -> List[Tuple[str, str]]:
+        """Up to ``limit`` pending (or expired) requests as ``(fingerprint, data)``, leased to ``worker``."""
+
+    @abstractmethod
+    def extend(self, worker: str, fingerprints: List[str], lease_seconds: float) -> None:
+        """Renew ``worker``'s leases on requests still being crawled."""
+
+    @abstractmethod
+    def ack(self, worker: str, fingerprints: List[str]) -> None:
+        """Mark requests done."""
+
+    @abstractmethod
+    def nack(self, worker: str, fingerprints: List[str], error: str = '') -> None:
+        """Return failed requests to the frontier, or mark them failed after ``max_attempts``."""
+
+    @abstractmethod
+    def release(self, worker: str, fingerprints: List[str]) -> None:
+        """Return unfinished requests to the frontier without counting an attempt."""
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Requests per state; expired leases count as pending."""
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteFrontier(Frontier):
+    """Frontier in one SQLite database, safe to share between processes on one host."""
+
+    def __init__(self, path: str, max_attempts: int = 3):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, isolation_level=None, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def _transaction(self, statements):
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = statements(self.conn)
+                self.conn.execute('COMMIT')
+                return result
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+
+    def push(self, entries):
+        entries = list(entries)
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                'INSERT OR IGNORE INTO requests (fingerprint, data, priority) VALUES (?, ?, ?)', entries
+            )
+            return conn.total_changes - before
+
+        return self._transaction(insert) if entries else 0
+
+    def lease(self, worker, limit, lease_seconds):
+        def take(conn):
+            now = time.time()
+            rows = conn.execute(
+                "SELECT fingerprint, data FROM requests "
+                "WHERE state = 'pending' OR (state = 'leased' AND lease_until < ?) "
+                "ORDER BY priority DESC, seq LIMIT ?",
+                (now, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE requests SET state = 'leased', worker = ?, lease_until = ? WHERE fingerprint = ?",
+                [(worker, now + lease_seconds, fingerprint) for fingerprint, _ in rows]
+            )
+            return rows
+
+        return self._transaction(take)
+
+    def extend(self, worker, fingerprints, lease_seconds):
+        self._transaction(lambda conn: conn.executemany(
+            "UPDATE requests SET lease_until = ? WHERE fingerprint = ? AND state = 'leased' AND worker = ?",
+            [(time.time() + lease_seconds, fingerprint, worker) for fingerprint in fingerprints]
+        ))
+
+    def ack(self, worker, fingerprints):
+        # Also when the lease expired meanwhile: the page was crawled
+        self._transaction(lambda conn: conn.executemany(
+            "UPDATE requests SET state = 'done', worker = ?, lease_until = NULL WHERE fingerprint = ?",
+            [(worker, fingerprint) for fingerprint in fingerprints]
+        ))
+
+    def nack(self, worker, fingerprints, error=''):
+        self._transaction(lambda conn: conn.executemany(
+            "UPDATE requests SET attempts = attempts + 1, error = ?, lease_until = NULL, "
+            "state = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END "
+            "WHERE fingerprint = ? AND state = 'leased' AND worker = ?",
+            [(error, self.max_attempts, fingerprint, worker) for fingerprint in fingerprints]
+        ))
+
+    def release(self, worker, fingerprints):
+        self._transaction(lambda conn: conn.executemany(
+            "UPDATE requests SET state = 'pending', lease_until = NULL "
+            "WHERE fingerprint = ? AND state = 'leased' AND worker = ?",
+            [(fingerprint, worker) for fingerprint in fingerprints]
+        ))
+
+    def counts(self):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT CASE WHEN state = 'leased' AND lease_until < ? THEN 'pending' ELSE state END, count(*) "
+                "FROM requests GROUP BY 1",
+                (time.time(),)
+            ).fetchall()
+        return {state: 0 for state in ('pending', 'leased', 'done', 'failed')} | dict(rows)
+
+    def close(self):
+        self.conn.close()
+
+
+class HttpFrontier(Frontier):
+    """Client of a frontier served by ``python -m propertypal_scraper.frontier serve``."""
+
+    def __init__(self, url: str, timeout: float = 30):
+        import requests
+
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _call(self, method: str, **params) -> Any:
+        response = self.session.post(f'{self.url}/{method}', json=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()['result']
+
+    def push(self, entries):
+        entries = [list(entry) for entry in entries]
+        return self._call('push', entries=entries) if entries else 0
+
+    def lease(self, worker, limit, lease_seconds):
+        return [tuple(row) for row in self._call('lease', worker=worker, limit=limit, lease_seconds=lease_seconds)]
+
+    def extend(self, worker, fingerprints, lease_seconds):
+        self._call('extend', worker=worker, fingerprints=fingerprints, lease_seconds=lease_seconds)
+
+    def ack(self, worker, fingerprints):
+        self._call('ack', worker=worker, fingerprints=fingerprints)
+
+    def nack(self, worker, fingerprints, error=''):
+        self._call('nack', worker=worker, fingerprints=fingerprints, error=error)
+
+    def release(self, worker, fingerprints):
+        self._call('release', worker=worker, fingerprints=fingerprints)
+
+    def counts(self):
+        return self._call('counts')
+
+    def close(self):
+        self.session.close()
+
+
+def open_frontier(url: str, name: str, max_attempts: int = 3) -> Frontier:
+    """Frontier ``name`` at FRONTIER_URL ``url`` (a directory or a coordinator's http(s) URL)."""
+    if url.startswith(('http://', 'https://')):
+        return HttpFrontier(f"{url.rstrip('/')}/{name}")
+    return SQLiteFrontier(os.path.join(url, f'{name}.db'), max_attempts=max_attempts)
+
+
+class FrontierScheduler:
+    """Scrapy scheduler that queues requests in a shared Frontier (see module docstring)
+
+    The reactor thread never waits on the frontier. Pushes, acknowledgements
+    and lease extensions are buffered, and every FRONTIER_FLUSH_SECONDS (or as
+    soon as the engine runs out of requests) they are sent in one round trip
+    on a worker thread. The same round trip leases the next requests ahead of
+    time and refreshes the frontier counts.
+
+    Configure via environment variables:
+    - FRONTIER: Name of the shared frontier; enables this scheduler
+    - FRONTIER_URL: Directory of SQLite frontiers or a coordinator URL (default: data/frontier)
+    - FRONTIER_WORKER_ID: Worker name in leases (default: hostname-pid)
+    - FRONTIER_LEASE_SECONDS: Lease length (default: 300)
+    - FRONTIER_LEASE_BATCH: Requests leased ahead; more than 1 holds requests
+      other workers could be crawling (default: 1)
+    - FRONTIER_POLL_SECONDS: Wait between polls of an empty frontier (default: 2)
+    - FRONTIER_FLUSH_SECONDS: Wait between round trips to the frontier (default: 0.5)
+    - FRONTIER_MAX_ATTEMPTS: Failed attempts before a request is given up (default: 3)
+    """
+
+    def __init__(self, crawler, frontier: Frontier, worker: str, lease_seconds: float,
+                 batch: int, poll_seconds: float, flush_seconds: float = 0.5):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.frontier = frontier
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self.batch = batch
+        self.poll_seconds = poll_seconds
+        self.flush_seconds = flush_seconds
+        self.queue = deque()
+        # Leased from the frontier and not acked, nacked or released yet
+        self.inflight = set()
+        # Waiting for the next round trip
+        self.pushes: List[Entry] = []
+        self.acks: List[str] = []
+        self.nacks: List[Tuple[str, str]] = []
+        self.syncing = None
+        self.sync_loop = None
+        self.closing = False
+        self.last_poll = 0.0
+        self.last_extend = time.monotonic()
+        self.last_counts = None
+        self.spider = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        from propertypal_scraper import settings
+
+        scheduler = cls(
+            crawler,
+            open_frontier(settings.FRONTIER_URL, settings.FRONTIER, settings.FRONTIER_MAX_ATTEMPTS),
+            worker=settings.FRONTIER_WORKER_ID,
+            lease_seconds=settings.FRONTIER_LEASE_SECONDS,
+            batch=settings.FRONTIER_LEASE_BATCH,
+            poll_seconds=settings.FRONTIER_POLL_SECONDS,
+            flush_seconds=settings.FRONTIER_FLUSH_SECONDS
+        )
+        crawler.signals.connect(scheduler.item_done, signal=signals.item_scraped)
+        crawler.signals.connect(scheduler.item_done, signal=signals.item_dropped)
+        crawler.signals.connect(scheduler.item_done, signal=frontier_page_done)
+        crawler.signals.connect(scheduler.spider_error, signal=signals.spider_error)
+        return scheduler
+
+    def open(self, spider):
+        if getattr(spider, 'checkpoint', None) is not None:
+            raise ValueError("A distributed crawl (FRONTIER) can't also be a resumable job (job=)")
+        self.spider = spider
+
+        def opened(counts):
+            self.last_counts = counts
+            spider.logger.info(
+                f"Distributed crawl: worker {self.worker}, frontier {counts['pending']} pending, "
+                f"{counts['leased']} leased, {counts['done']} done, {counts['failed']} failed"
+            )
+            self.sync_loop = task.LoopingCall(self._sync)
+            self.sync_loop.start(self.flush_seconds, now=False)
+
+        return threads.deferToThread(self.frontier.counts).addCallback(opened)
+
+    def close(self, reason):
+        """Flush the buffers and release unfinished leases; fires once the frontier is closed."""
+        self.closing = True
+        if self.sync_loop is not None and self.sync_loop.running:
+            self.sync_loop.stop()
+
+        def final_round_trip(_):
+            # Stopped early (Ctrl-C, item cap): another worker can take these now
+            release = sorted(self.inflight)
+            self.stats.set_value('frontier/released', len(release))
+            self.inflight.clear()
+            self.queue.clear()
+            pushes, acks, nacks = self._take_buffers()
+            return threads.deferToThread(self._round_trip, pushes, acks, nacks, [], 0, release)
+
+        def closed(result):
+            _, _, counts = result
+            self.spider.logger.info(
+                f"Worker {self.worker} {reason}: frontier {counts['done']} done, {counts['pending']} pending, "
+                f"{counts['failed']} failed"
+            )
+
+        def failed(failure):
+            self.spider.logger.error(f"Frontier unreachable while closing: {failure.getErrorMessage()}")
+
+        d = self.syncing if self.syncing is not None else defer.succeed(None)
+        d.addCallback(final_round_trip)
+        d.addCallbacks(closed, failed)
+        d.addBoth(lambda _: threads.deferToThread(self.frontier.close))
+        return d
+
+    # Scheduler interface
+
+    def enqueue_request(self, request: Request) -> bool:
+        if request.meta.get('frontier_key') in self.inflight:
+            # Leased by this worker already: a lease coming in, or a retry from RetryMiddleware
+            self.queue.append(request)
+            return True
+        # Duplicates are counted once the frontier has seen it
+        fingerprint = self.crawler.request_fingerprinter.fingerprint(request).hex()
+        self.pushes.append((fingerprint, self._serialize(request), request.priority))
+        return True
+
+    def next_request(self) -> Optional[Request]:
+        if len(self.queue) <= self.batch:
+            # Lease ahead, or at once if the engine has nothing to do
+            self._sync()
+        return self.queue.popleft() if self.queue else None
+
+    def has_pending_requests(self) -> bool:
+        if self.queue or self.inflight or self.pushes or self.acks or self.nacks or self.syncing is not None:
+            return True
+        # Other workers may still add requests while they hold leases
+        counts = self.last_counts
+        return counts is None or bool(counts['pending'] or counts['leased'])
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    # Acknowledgements
+
+    def item_done(self, response, spider, item=None):
+        """item_scraped/item_dropped/frontier_page_done: the page is finished."""
+        if response is not None:
+            self.page_done(response.meta.get('frontier_key'))
+
+    def page_done(self, key: Optional[str]) -> None:
+        if key in self.inflight:
+            self.inflight.discard(key)
+            self.acks.append(key)
+            self.stats.inc_value('frontier/acked')
+
+    def spider_error(self, failure, response, spider):
+        self.page_failed(response.meta.get('frontier_key'), failure.getErrorMessage())
+
+    def page_failed(self, key: Optional[str], error: str) -> None:
+        if key in self.inflight:
+            self.inflight.discard(key)
+            self.nacks.append((key, error[:500]))
+            self.stats.inc_value('frontier/nacked')
+
+    # Round trips
+
+    def _take_buffers(self):
+        pushes, acks, nacks = self.pushes, self.acks, self.nacks
+        self.pushes, self.acks, self.nacks = [], [], []
+        return pushes, acks, nacks
+
+    def _sync(self):
+        """Start a round trip if there is something to send or lease, unless one is running."""
+        if self.syncing is not None or self.closing:
+            return
+        now = time.monotonic()
+        extend = []
+        if self.inflight and now - self.last_extend >= self.lease_seconds / 3:
+            extend = sorted(self.inflight)
+            self.last_extend = now
+        want = 0
+        if len(self.queue) < self.batch and (self.pushes or now - self.last_poll >= self.poll_seconds):
+            # Also refreshes the counts has_pending_requests relies on
+            want = self.batch - len(self.queue)
+            self.last_poll = now
+        if not (self.pushes or self.acks or self.nacks or extend or want):
+            return
+
+        pushes, acks, nacks = self._take_buffers()
+        self.syncing = threads.deferToThread(self._round_trip, pushes, acks, nacks, extend, want)
+        self.syncing.addCallbacks(self._synced, self._sync_failed, errbackArgs=(pushes, acks, nacks))
+
+    def _round_trip(self, pushes, acks, nacks, extend, want, release=()):
+        """Runs on a worker thread: everything buffered in one go."""
+        pushed = self.frontier.push(pushes) if pushes else 0
+        if acks:
+            self.frontier.ack(self.worker, acks)
+        for key, error in nacks:
+            self.frontier.nack(self.worker, [key], error)
+        if extend:
+            self.frontier.extend(self.worker, extend, self.lease_seconds)
+        if release:
+            self.frontier.release(self.worker, list(release))
+        leased = self.frontier.lease(self.worker, want, self.lease_seconds) if want else []
+        return (len(pushes), pushed), leased, self.frontier.counts()
+
+    def _synced(self, result):
+        self.syncing = None
+        (sent, pushed), leased, self.last_counts = result
+        self.stats.inc_value('frontier/pushed', pushed)
+        self.stats.inc_value('frontier/duplicates', sent - pushed)
+        self.stats.inc_value('frontier/leased', len(leased))
+        for fingerprint, data in leased:
+            self.inflight.add(fingerprint)
+            if not self.closing:
+                # Back through enqueue_request into the local queue, and wakes the engine
+                self.crawler.engine.crawl(self._deserialize(fingerprint, data))
+        if leased:
+            self.last_poll = 0.0
+
+    def _sync_failed(self, failure, pushes, acks, nacks):
+        """Keep what wasn't sent for the next round trip."""
+        self.syncing = None
+        self.last_extend = 0.0
+        self.pushes[:0], self.acks[:0], self.nacks[:0] = pushes, acks, nacks
+        self.stats.inc_value('frontier/errors')
+        self.spider.logger.warning(f"Frontier round trip failed, retrying: {failure.getErrorMessage()}")
+
+    # Requests
+
+    def _serialize(self, request: Request) -> str:
+        meta = {}
+        for key, value in request.meta.items():
+            try:
+                json.dumps(value)
+            except (TypeError, ValueError):
+                continue
+            meta[key] = value
+        return json.dumps({
+            'url': request.url,
+            'callback': getattr(request.callback, '__name__', None),
+            'method': request.method,
+            'meta': meta,
+        })
+
+    def _deserialize(self, fingerprint: str, data: str) -> Request:
+        data = json.loads(data)
+        callback = data['callback']
+        return Request(
+            data['url'],
+            callback=getattr(self.spider, callback) if callback else None,
+            errback=self._download_failed,
+            method=data['method'],
+            meta={**data['meta'], 'frontier_key': fingerprint},
+            # Deduplicated by the frontier
+            dont_filter=True
+        )
+
+    def _download_failed(self, failure):
+        """Errback of leased requests: give the request back, then let Scrapy log the error."""
+        key = failure.request.meta.get('frontier_key')
+        if failure.check(IgnoreRequest):
+            self.page_done(key)
+        else:
+            self.page_failed(key, failure.getErrorMessage())
+        failure.raiseException()
+
+
+class FrontierMiddleware:
+    """Acknowledge frontier pages that yield no items once their callback is done
+
+    Pages with items are acknowledged by FrontierScheduler once the items have
+    left the pipelines. Does nothing unless FRONTIER is set.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        from scrapy.exceptions import NotConfigured
+
+        from propertypal_scraper import settings
+
+        if not settings.FRONTIER:
+            raise NotConfigured
+        return cls(crawler)
+
+    def process_spider_output(self, response, result, spider):
+        items = 0
+        for item_or_request in result:
+            if not isinstance(item_or_request, Request):
+                items += 1
+            yield item_or_request
+        self._page_done(response, items)
+
+    async def process_spider_output_async(self, response, result, spider):
+        items = 0
+        async for item_or_request in result:
+            if not isinstance(item_or_request, Request):
+                items += 1
+            yield item_or_request
+        self._page_done(response, items)
+
+    def _page_done(self, response, items):
+        if not items:
+            self.crawler.signals.send_catch_log(
+                signal=frontier_page_done, spider=self.crawler.spider, response=response
+            )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # POST /<frontier>/<method> with JSON keyword arguments -> {"result": ...}
+    METHODS = {'push', 'lease', 'extend', 'ack', 'nack', 'release', 'counts'}
+
+    def do_POST(self):
+        try:
+            _, name, method = self.path.split('/')
+        except ValueError:
+            name = method = None
+        if method not in self.METHODS or not name or name.startswith('.'):
+            self.send_error(404)
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        params = json.loads(self.rfile.read(length) or b'{}')
+        try:
+            result = getattr(self.server.frontier(name), method)(**params)
+        except Exception as e:
+            logger.exception(f"Frontier {name}: {method} failed")
+            self.send_error(500, str(e))
+            return
+        body = json.dumps({'result': result}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+class FrontierServer(ThreadingHTTPServer):
+    """Serves the SQLite frontiers in ``directory`` to HttpFrontier clients."""
+
+    daemon_threads = True
+
+    def __init__(self, address, directory: str, max_attempts: int = 3):
+        super().__init__(address, _Handler)
+        self.directory = directory
+        self.max_attempts = max_attempts
+        self.frontiers: Dict[str, SQLiteFrontier] = {}
+        self.lock = threading.Lock()
+
+    def frontier(self, name: str) -> SQLiteFrontier:
+        with self.lock:
+            if name not in self.frontiers:
+                self.frontiers[name] = open_frontier(self.directory, name, self.max_attempts)
+            return self.frontiers[name]
+
+
+def main(argv=None):
+    from propertypal_scraper import settings
+
+    parser = argparse.ArgumentParser(description="Shared request frontier for distributed crawls")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help="Serve the frontiers in a directory to workers on other hosts")
+    serve.add_argument('--dir', default=settings.FRONTIER_DIR, help="Directory of frontier databases")
+    serve.add_argument('--host', default='0.0.0.0')
+    serve.add_argument('--port', type=int, default=8790)
+    status = commands.add_parser('status', help="Show request counts of a frontier")
+    status.add_argument('name')
+    status.add_argument('--url', default=settings.FRONTIER_URL, help="Directory or coordinator URL")
+    args = parser.parse_args(argv)
+
+    if args.command == 'status':
+        frontier = open_frontier(args.url, args.name)
+        print(' '.join(f"{state}={count}" for state, count in frontier.counts().items()))
+        frontier.close()
+        return
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(name)s] %(levelname)s: %(message)s')
+    server = FrontierServer((args.host, args.port), args.dir, settings.FRONTIER_MAX_ATTEMPTS)
+    logger.info(f"Serving frontiers in {args.dir} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for frontier in server.frontiers.values():
+            frontier.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,15 @@ import json
 import os
 import time
 import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, Iterable, List
 
+import requests
 from geopy.geocoders import Nominatim, Photon, GoogleV3, Here, MapBox, OpenCage
 from geopy.distance import geodesic
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError, GeocoderQuotaExceeded
@@ -15,6 +20,11 @@ from geopy.exc import GeocoderTimedOut, GeocoderServiceError, GeocoderQuotaExcee
 logger = logging.getLogger(__name__)
 
 
+def normalize_address(address: str) -> str:
+    """Normalize address for consistent cache keys."""
+    return address.lower().strip()
+
+
 class GeocodingCache:
     """File-based cache for geocoding results with TTL support."""
 
@@ -22,6 +32,9 @@ class GeocodingCache:
         self.cache_file = Path(cache_file)
         self.ttl_days = ttl_days
         self._cache: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        # Serialises writers of the file only; get/set don't wait for a save
+        self._save_lock = threading.Lock()
         self._load_cache()
 
     def _load_cache(self) -> None:
@@ -38,17 +51,30 @@ class GeocodingCache:
             self._cache = {}
 
     def _save_cache(self) -> None:
-        """Persist cache to file."""
+        """Persist cache to file.
+
+        Entries are replaced, never changed in place, so a shallow snapshot
+        taken under the lock can be serialised outside it.
+        """
+        with self._lock:
+            snapshot = dict(self._cache)
         self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_file.with_name(self.cache_file.name + '.tmp')
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self._cache, f, indent=2, ensure_ascii=False)
+            with self._save_lock:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, self.cache_file)
         except IOError as e:
             logger.error(f"Failed to save geocoding cache: {e}")
 
+    def save(self) -> None:
+        """Persist cache to file (after a batch of unpersisted ``set`` calls)."""
+        self._save_cache()
+
     def _normalize_key(self, address: str) -> str:
         """Normalize address for consistent cache keys."""
-        return address.lower().strip()
+        return normalize_address(address)
 
     def _is_expired(self, entry: Dict[str, Any]) -> bool:
         """Check if a cache entry has expired."""
@@ -63,13 +89,14 @@ class GeocodingCache:
             Returns (None, None) tuple for addresses that failed geocoding (negative cache).
         """
         key = self._normalize_key(address)
-        if key not in self._cache:
-            return None
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
 
-        entry = self._cache[key]
-        if self._is_expired(entry):
-            del self._cache[key]
-            return None
+            if self._is_expired(entry):
+                del self._cache[key]
+                return None
 
         coords = entry.get('coords')
         if coords is None:
@@ -77,30 +104,136 @@ class GeocodingCache:
             return (None, None)
         return tuple(coords)
 
-    def set(self, address: str, coords: Optional[Tuple[float, float]]) -> None:
+    def set(self, address: str, coords: Optional[Tuple[float, float]], persist: bool = True) -> None:
         """Cache geocoding result.
 
         Args:
             address: The address that was geocoded
             coords: Tuple of (latitude, longitude), or None for failed geocoding
+            persist: Write the cache file now. Batch callers pass False and call save() once.
         """
         key = self._normalize_key(address)
-        self._cache[key] = {
-            'coords': list(coords) if coords else None,
-            'cached_at': datetime.now().isoformat()
-        }
-        self._save_cache()
+        with self._lock:
+            self._cache[key] = {
+                'coords': list(coords) if coords else None,
+                'cached_at': datetime.now().isoformat()
+            }
+        if persist:
+            self._save_cache()
 
     def clear_expired(self) -> int:
         """Remove expired entries from cache. Returns count of removed entries."""
-        expired_keys = [k for k, v in self._cache.items() if self._is_expired(v)]
-        for key in expired_keys:
-            del self._cache[key]
+        with self._lock:
+            expired_keys = [k for k, v in self._cache.items() if self._is_expired(v)]
+            for key in expired_keys:
+                del self._cache[key]
         if expired_keys:
             self._save_cache()
         return len(expired_keys)
 
 
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker for a geocoding provider.
+
+    After ``failure_threshold`` consecutive failures (or an outright block) the
+    breaker opens and the provider is skipped. Once ``reset_timeout`` seconds
+    have passed a single trial request is let through (half-open); success
+    closes the breaker, failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 300.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent to the provider now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def trial_due(self) -> bool:
+        """Check whether the provider has cooled down and is waiting for a trial request."""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self._opened_at >= self.reset_timeout
+            return self.state == self.HALF_OPEN and not self._trial_in_flight
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def trip(self) -> None:
+        """Open immediately (blocked, quota exceeded)."""
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            self._open()
+
+    def _open(self) -> None:
+        if self.state != self.OPEN:
+            self.times_opened += 1
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+
+
+class ProviderStats:
+    """Rolling success rate and latency over a provider's recent requests."""
+
+    def __init__(self, window: int = 50):
+        self._samples: deque = deque(maxlen=window)
+        self.requests = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def record(self, success: bool, latency: float) -> None:
+        with self._lock:
+            self._samples.append((success, latency))
+            self.requests += 1
+
+    @property
+    def sample_count(self) -> int:
+        return len(self._samples)
+
+    @property
+    def success_rate(self) -> float:
+        with self._lock:
+            if not self._samples:
+                return 1.0
+            return sum(1 for ok, _ in self._samples if ok) / len(self._samples)
+
+    @property
+    def mean_latency(self) -> float:
+        with self._lock:
+            if not self._samples:
+                return float('inf')
+            return sum(latency for _, latency in self._samples) / len(self._samples)
+
+
 class GeocodingService:
     """Multi-provider geocoding service with caching and retry logic."""
 
@@ -108,6 +241,8 @@ class GeocodingService:
         'nominatim': {
             'class': Nominatim,
             'requires_key': False,
+            'max_concurrency': 1,
+            'rate_limited': True,
             'kwargs': {
                 'user_agent': 'PropertyPal-Scraper-Geocoding/1.0',
                 'timeout': 10
@@ -116,6 +251,8 @@ class GeocodingService:
         'photon': {
             'class': Photon,
             'requires_key': False,
+            'max_concurrency': 2,
+            'rate_limited': True,
             'kwargs': {
                 'user_agent': 'PropertyPal-Scraper-Geocoding/1.0',
                 'timeout': 10
@@ -124,24 +261,29 @@ class GeocodingService:
         'google': {
             'class': GoogleV3,
             'requires_key': True,
+            'max_concurrency': 8,
             'env_key': 'GOOGLE_GEOCODING_API_KEY',
             'kwargs': {'timeout': 10}
         },
         'here': {
             'class': Here,
             'requires_key': True,
+            'max_concurrency': 8,
             'env_key': 'HERE_API_KEY',
             'kwargs': {'timeout': 10}
         },
         'mapbox': {
             'class': MapBox,
             'requires_key': True,
+            'max_concurrency': 8,
+            'batch_size': 1000,
             'env_key': 'MAPBOX_ACCESS_TOKEN',
             'kwargs': {'timeout': 10}
         },
         'opencage': {
             'class': OpenCage,
             'requires_key': True,
+            'max_concurrency': 8,
             'env_key': 'OPENCAGE_API_KEY',
             'kwargs': {'timeout': 10}
         }
@@ -153,7 +295,10 @@ class GeocodingService:
         max_retries: int = 3,
         base_delay: float = 1.0,
         cache_file: str = None,
-        cache_ttl_days: int = 30
+        cache_ttl_days: int = 30,
+        breaker_failure_threshold: int = 3,
+        breaker_reset_timeout: float = 300.0,
+        stats_window: int = 50
     ):
         """Initialize geocoding service.
 
@@ -163,6 +308,9 @@ class GeocodingService:
             base_delay: Base delay for exponential backoff (seconds)
             cache_file: Path to cache file. If None, caching is disabled.
             cache_ttl_days: Cache TTL in days
+            breaker_failure_threshold: Consecutive failures before a provider is skipped
+            breaker_reset_timeout: Seconds before a skipped provider is tried again
+            stats_window: Number of recent requests used to rank providers
         """
         self.providers = providers or ['nominatim', 'photon']
         self.max_retries = max_retries
@@ -173,8 +321,24 @@ class GeocodingService:
 
         # Initialize geocoders for each provider
         self._geocoders = {}
+        self._api_keys = {}
         self._init_geocoders()
 
+        # Per-provider concurrency limits and request spacing for free services
+        self._slots = {
+            name: threading.BoundedSemaphore(self.PROVIDER_CONFIGS[name].get('max_concurrency', 1))
+            for name in self._geocoders
+        }
+        self._last_request: Dict[str, float] = {}
+        self._throttle_lock = threading.Lock()
+
+        # Health tracking used to skip failing providers and reorder the rest
+        self._breakers = {
+            name: CircuitBreaker(breaker_failure_threshold, breaker_reset_timeout)
+            for name in self._geocoders
+        }
+        self._stats = {name: ProviderStats(stats_window) for name in self._geocoders}
+
     def _init_geocoders(self) -> None:
         """Initialize geocoder instances for configured providers."""
         for provider in self.providers:
@@ -191,6 +355,7 @@ class GeocodingService:
                     logger.debug(f"Skipping {provider}: {config['env_key']} not set")
                     continue
                 kwargs = {**config['kwargs'], 'api_key': api_key}
+                self._api_keys[provider] = api_key
             else:
                 kwargs = config['kwargs'].copy()
 
@@ -203,6 +368,20 @@ class GeocodingService:
         if not self._geocoders:
             raise ValueError("No geocoding providers available")
 
+    @contextmanager
+    def _provider_slot(self, provider_name: str):
+        """Hold one of a provider's concurrency slots, spacing requests to free services."""
+        with self._slots[provider_name]:
+            if self.PROVIDER_CONFIGS[provider_name].get('rate_limited'):
+                # Reserve the next start time under the lock; sleep outside it
+                with self._throttle_lock:
+                    now = time.monotonic()
+                    start = max(now, self._last_request.get(provider_name, 0.0) + self.base_delay)
+                    self._last_request[provider_name] = start
+                if start > now:
+                    time.sleep(start - now)
+            yield
+
     def _geocode_with_retry(
         self,
         geocoder,
@@ -211,41 +390,109 @@ class GeocodingService:
     ) -> Optional[Tuple[float, float]]:
         """Attempt geocoding with exponential backoff retry."""
         last_error = None
+        breaker = self._breakers[provider_name]
+        stats = self._stats[provider_name]
 
         for attempt in range(self.max_retries):
+            if attempt and not breaker.allow_request():
+                logger.debug(f"{provider_name} circuit opened, abandoning retries")
+                break
+
+            start = time.monotonic()
             try:
-                location = geocoder.geocode(address)
+                with self._provider_slot(provider_name):
+                    location = geocoder.geocode(address)
+                stats.record(True, time.monotonic() - start)
+                breaker.record_success()
                 if location:
                     return (location.latitude, location.longitude)
                 return None
 
             except GeocoderQuotaExceeded as e:
+                stats.record(False, time.monotonic() - start)
+                self._trip(provider_name, e)
                 logger.warning(f"{provider_name} quota exceeded: {e}")
                 raise  # Don't retry quota errors, move to next provider
 
             except (GeocoderTimedOut, GeocoderServiceError) as e:
+                stats.record(False, time.monotonic() - start)
+                breaker.record_failure()
                 last_error = e
                 delay = self.base_delay * (2 ** attempt)
                 logger.debug(f"{provider_name} attempt {attempt + 1} failed: {e}. Retrying in {delay}s")
                 time.sleep(delay)
 
             except Exception as e:
+                stats.record(False, time.monotonic() - start)
                 last_error = e
                 if "403" in str(e) or "blocked" in str(e).lower():
+                    self._trip(provider_name, e)
                     logger.warning(f"{provider_name} blocked: {e}")
                     raise  # Don't retry blocks, move to next provider
+                breaker.record_failure()
                 delay = self.base_delay * (2 ** attempt)
                 logger.debug(f"{provider_name} attempt {attempt + 1} failed: {e}. Retrying in {delay}s")
                 time.sleep(delay)
 
-        logger.warning(f"{provider_name} failed after {self.max_retries} attempts: {last_error}")
+        if breaker.state == CircuitBreaker.OPEN:
+            logger.warning(f"{provider_name} circuit open after repeated failures: {last_error}")
+        else:
+            logger.warning(f"{provider_name} failed after {self.max_retries} attempts: {last_error}")
         return None
 
-    def geocode(self, address: str) -> Optional[Tuple[float, float]]:
+    def _trip(self, provider_name: str, error: Exception) -> None:
+        """Open a provider's circuit immediately."""
+        breaker = self._breakers[provider_name]
+        if breaker.state != CircuitBreaker.OPEN:
+            logger.warning(
+                f"Circuit opened for {provider_name} for {breaker.reset_timeout:.0f}s: {error}"
+            )
+        breaker.trip()
+
+    def _ordered_providers(self) -> List[str]:
+        """Providers ordered by recent health.
+
+        Providers due a half-open trial go first so they can recover. The rest
+        are ranked by success rate (in 10% steps, so noise doesn't reshuffle
+        them), then mean latency, then configured priority. Providers without
+        recent samples keep their configured place behind healthy measured ones.
+        """
+        priority = {name: i for i, name in enumerate(self._geocoders)}
+
+        def rank(name):
+            stats = self._stats[name]
+            return (
+                not self._breakers[name].trial_due(),
+                -round(stats.success_rate, 1),
+                round(stats.mean_latency, 1),
+                priority[name]
+            )
+
+        return sorted(self._geocoders, key=rank)
+
+    def provider_health(self) -> Dict[str, Dict[str, Any]]:
+        """Breaker state and rolling statistics for each provider."""
+        health = {}
+        for name in self._ordered_providers():
+            breaker = self._breakers[name]
+            stats = self._stats[name]
+            latency = stats.mean_latency
+            health[name] = {
+                'state': breaker.state,
+                'times_opened': breaker.times_opened,
+                'requests': stats.requests,
+                'skipped': stats.skipped,
+                'success_rate': round(stats.success_rate, 3),
+                'mean_latency_ms': None if latency == float('inf') else round(latency * 1000, 1),
+            }
+        return health
+
+    def geocode(self, address: str, persist: bool = True) -> Optional[Tuple[float, float]]:
         """Geocode an address using configured providers with fallback.
 
         Args:
             address: The address to geocode
+            persist: Write the cache file after caching the result
 
         Returns:
             Tuple of (latitude, longitude) if successful, None otherwise
@@ -263,16 +510,21 @@ class GeocodingService:
                 logger.debug(f"Cache hit: {address} -> {cached}")
                 return cached
 
-        # Try each provider in order
-        for provider_name, geocoder in self._geocoders.items():
+        # Try each provider, healthiest first, skipping open circuits
+        attempted = False
+        for provider_name in self._ordered_providers():
+            if not self._breakers[provider_name].allow_request():
+                self._stats[provider_name].skipped += 1
+                continue
+
+            attempted = True
+            geocoder = self._geocoders[provider_name]
             try:
                 coords = self._geocode_with_retry(geocoder, address, provider_name)
                 if coords:
                     logger.debug(f"Geocoded with {provider_name}: {address} -> {coords}")
                     if self.cache:
-                        self.cache.set(address, coords)
-                    # Rate limit between requests
-                    time.sleep(self.base_delay)
+                        self.cache.set(address, coords, persist=persist)
                     return coords
             except (GeocoderQuotaExceeded, Exception) as e:
                 if "403" in str(e) or "blocked" in str(e).lower() or isinstance(e, GeocoderQuotaExceeded):
@@ -280,12 +532,132 @@ class GeocodingService:
                     continue
                 raise
 
+        if not attempted:
+            # Every circuit is open - not a real answer, so don't cache it
+            logger.warning(f"All geocoding providers unavailable, skipping: {address}")
+            return None
+
         # All providers failed - cache negative result
         logger.warning(f"All geocoding providers failed for: {address}")
         if self.cache:
-            self.cache.set(address, None)
+            self.cache.set(address, None, persist=persist)
         return None
 
+    def geocode_many(
+        self,
+        addresses: Iterable[str],
+        max_workers: int = 4
+    ) -> Dict[str, Optional[Tuple[float, float]]]:
+        """Geocode a batch of addresses at once.
+
+        Addresses are deduplicated by cache key and looked up in the cache
+        first. The remaining unique addresses go to batch endpoints where a
+        provider has one, then to parallel single lookups (bounded by each
+        provider's concurrency limit). The cache file is written once.
+
+        Returns:
+            Mapping of each input address to its coordinates (or None)
+        """
+        unique: Dict[str, str] = {}
+        for address in addresses:
+            if address:
+                unique.setdefault(normalize_address(address), address)
+
+        resolved: Dict[str, Optional[Tuple[float, float]]] = {}
+        to_fetch: List[str] = []
+        for key, address in unique.items():
+            cached = self.cache.get(address) if self.cache else None
+            if cached is None:
+                to_fetch.append(address)
+            else:
+                resolved[key] = None if cached == (None, None) else cached
+
+        if to_fetch:
+            logger.info(f"Batch geocoding {len(to_fetch)} new locations ({len(resolved)} cached)")
+            for address, coords in self._geocode_batch_endpoints(to_fetch).items():
+                resolved[normalize_address(address)] = coords
+                if self.cache:
+                    self.cache.set(address, coords, persist=False)
+
+            remaining = [a for a in to_fetch if normalize_address(a) not in resolved]
+            if remaining:
+                with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    lookups = pool.map(lambda a: self._geocode_quietly(a, persist=False), remaining)
+                    for address, coords in zip(remaining, lookups):
+                        resolved[normalize_address(address)] = coords
+
+            if self.cache:
+                self.cache.save()
+
+        return {address: resolved.get(key) for key, address in unique.items()}
+
+    def _geocode_quietly(self, address: str, persist: bool = True) -> Optional[Tuple[float, float]]:
+        """geocode() for worker threads: errors are logged rather than raised."""
+        try:
+            return self.geocode(address, persist=persist)
+        except Exception as e:
+            logger.error(f"Error geocoding {address}: {e}")
+            return None
+
+    def _geocode_batch_endpoints(self, addresses: List[str]) -> Dict[str, Tuple[float, float]]:
+        """Resolve addresses through providers that offer a batch endpoint.
+
+        Only successful lookups are returned; anything else falls back to the
+        per-address path. Each batch request counts as one request for the
+        provider's circuit breaker and health statistics.
+        """
+        results: Dict[str, Tuple[float, float]] = {}
+        for provider_name in self._geocoders:
+            batch_size = self.PROVIDER_CONFIGS[provider_name].get('batch_size')
+            batch_fn = getattr(self, f'_batch_geocode_{provider_name}', None)
+            if not batch_size or not batch_fn:
+                continue
+
+            breaker = self._breakers[provider_name]
+            stats = self._stats[provider_name]
+            pending = [a for a in addresses if a not in results]
+            for start in range(0, len(pending), batch_size):
+                if not breaker.allow_request():
+                    stats.skipped += 1
+                    break
+                chunk = pending[start:start + batch_size]
+                started = time.monotonic()
+                try:
+                    with self._provider_slot(provider_name):
+                        found = batch_fn(chunk)
+                except Exception as e:
+                    stats.record(False, time.monotonic() - started)
+                    status = getattr(getattr(e, 'response', None), 'status_code', None)
+                    if status in (401, 403, 429) or "blocked" in str(e).lower():
+                        # Blocked or out of quota
+                        self._trip(provider_name, e)
+                    else:
+                        breaker.record_failure()
+                    logger.warning(f"{provider_name} batch geocoding failed: {e}")
+                    break
+                stats.record(True, time.monotonic() - started)
+                breaker.record_success()
+                results.update(found)
+        return results
+
+    def _batch_geocode_mapbox(self, addresses: List[str]) -> Dict[str, Tuple[float, float]]:
+        """Geocode up to 1000 addresses in one Mapbox batch request."""
+        response = requests.post(
+            'https://api.mapbox.com/search/geocode/v6/batch',
+            params={'access_token': self._api_keys['mapbox']},
+            json=[{'q': address, 'limit': 1} for address in addresses],
+            timeout=60
+        )
+        response.raise_for_status()
+
+        results = {}
+        for address, collection in zip(addresses, response.json().get('batch', [])):
+            features = collection.get('features') or []
+            if features:
+                lon, lat = features[0]['geometry']['coordinates'][:2]
+                results[address] = (lat, lon)
+        return results
+
     def calculate_distance(
         self,
         origin: str,
@@ -304,5 +676,65 @@ class GeocodingService:
         if not origin_coords:
             return None
 
+        return self.distance_between(origin_coords, destination_coords)
+
+    @staticmethod
+    def distance_between(
+        origin_coords: Tuple[float, float],
+        destination_coords: Tuple[float, float]
+    ) -> float:
+        """Geodesic distance in kilometers between two coordinate pairs."""
         distance = geodesic(origin_coords, destination_coords).kilometers
         return round(distance, 2)
+
+
+class GeocodingPrefetcher:
+    """Geocode addresses on a background thread before they are needed.
+
+    Lookups are keyed (e.g. by property ID) so the consumer can pick up the
+    result later with ``pop``, even if its own address string differs.
+    Results are cached under the address looked up; the cache file is written
+    by the worker threads every ``save_every`` lookups and at shutdown.
+    """
+
+    def __init__(self, service: GeocodingService, max_workers: int = 1, save_every: int = 50):
+        self.service = service
+        self.save_every = save_every
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='geocode-prefetch')
+        self._pending: Dict[str, Future] = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, address: str) -> bool:
+        """Queue a lookup. Returns False if one is already queued for ``key``."""
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending[key] = self._executor.submit(self._timed_geocode, address)
+            return True
+
+    def pop(self, key: str) -> Optional[Future]:
+        """Take the lookup for ``key``; its result is ``(coords, seconds_taken)``."""
+        with self._lock:
+            return self._pending.pop(key, None)
+
+    def _timed_geocode(self, address: str) -> Tuple[Optional[Tuple[float, float]], float]:
+        start = time.monotonic()
+        coords = self.service._geocode_quietly(address, persist=False)
+        seconds = time.monotonic() - start
+        with self._lock:
+            self._unsaved += 1
+            save = self._unsaved >= self.save_every
+            if save:
+                self._unsaved = 0
+        if save and self.service.cache:
+            self.service.cache.save()
+        return coords, seconds
+
+    def shutdown(self) -> None:
+        """Stop the worker, dropping lookups that haven't started, and save the cache."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            save, self._unsaved = self._unsaved > 0, 0
+        if save and self.service.cache:
+            self.service.cache.save()
@@ -0,0 +1,233 @@
+"""Consolidated property history in a local SQLite database.
+
+``listings`` holds the latest state of every property seen in any run;
+``price_history`` gets a row whenever a property's price or status changes,
+so "what dropped in price this week" is an indexed query instead of a scan
+over many export files.
+
+Usage:
+    python -m propertypal_scraper.history --price-drops 7
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, List, Mapping, Optional
+
+from propertypal_scraper.exporters import json_default
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    property_id TEXT PRIMARY KEY,
+    url TEXT,
+    search TEXT,
+    location TEXT,
+    property_type TEXT,
+    price INTEGER,
+    bedrooms INTEGER,
+    bathrooms INTEGER,
+    receptions INTEGER,
+    tenure TEXT,
+    energy_rating TEXT,
+    heating TEXT,
+    listing_status TEXT,
+    size_sqm REAL,
+    price_per_sqm REAL,
+    rates_annual REAL,
+    epc_score INTEGER,
+    distance_to_destination REAL,
+    latitude REAL,
+    longitude REAL,
+    perplexity_rating REAL,
+    calculated_monthly_payment REAL,
+    first_seen TEXT NOT NULL,
+    scraped_at TEXT NOT NULL,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS price_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    property_id TEXT NOT NULL,
+    scraped_at TEXT NOT NULL,
+    price INTEGER,
+    previous_price INTEGER,
+    listing_status TEXT,
+    previous_status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_price_history_property ON price_history (property_id, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_price_history_scraped_at ON price_history (scraped_at);
+CREATE INDEX IF NOT EXISTS idx_price_history_price ON price_history (price);
+"""
+
+# Run after columns added by MIGRATIONS exist
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_listings_scraped_at ON listings (scraped_at);
+CREATE INDEX IF NOT EXISTS idx_listings_price ON listings (price);
+CREATE INDEX IF NOT EXISTS idx_listings_price_per_sqm ON listings (price_per_sqm);
+"""
+
+# Columns added after the first release: (table, column, type)
+MIGRATIONS = [
+    ('listings', 'size_sqm', 'REAL'),
+    ('listings', 'price_per_sqm', 'REAL'),
+    ('listings', 'rates_annual', 'REAL'),
+    ('listings', 'epc_score', 'INTEGER'),
+]
+
+# Columns copied from the item into ``listings``; everything else lives in ``data``
+LISTING_COLUMNS = [
+    'url', 'location', 'property_type', 'price', 'bedrooms', 'bathrooms',
+    'receptions', 'tenure', 'energy_rating', 'heating', 'listing_status',
+    'size_sqm', 'price_per_sqm', 'rates_annual', 'epc_score',
+    'distance_to_destination', 'latitude', 'longitude', 'perplexity_rating',
+    'calculated_monthly_payment',
+]
+
+
+def _timestamp(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value) if value else datetime.now().isoformat()
+
+
+class PropertyHistoryStore:
+    """Latest listing state plus price/status change timeline."""
+
+    def __init__(self, path: str, commit_interval: int = 100):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            commit_interval: Commit after this many upserts
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.commit_interval = commit_interval
+        self._pending = 0
+
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.conn.executescript(INDEXES)
+
+    def _migrate(self) -> None:
+        """Add columns introduced since the database was created."""
+        for table, column, column_type in MIGRATIONS:
+            existing = {row['name'] for row in self.conn.execute(f'PRAGMA table_info({table})')}
+            if column not in existing:
+                self.conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+        self.conn.commit()
+
+    def upsert(self, record: Mapping[str, Any], search: Optional[str] = None) -> bool:
+        """Store the current state of a listing.
+
+        Returns:
+            True if the listing is new or its price/status changed
+        """
+        property_id = record.get('property_id')
+        if not property_id:
+            return False
+
+        scraped_at = _timestamp(record.get('scraped_at'))
+        price = record.get('price')
+        status = record.get('listing_status')
+
+        previous = self.conn.execute(
+            'SELECT price, listing_status FROM listings WHERE property_id = ?', (property_id,)
+        ).fetchone()
+        changed = previous is None or previous['price'] != price or previous['listing_status'] != status
+        if changed:
+            self.conn.execute(
+                'INSERT INTO price_history (property_id, scraped_at, price, previous_price, '
+                'listing_status, previous_status) VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    property_id, scraped_at, price,
+                    previous['price'] if previous else None,
+                    status,
+                    previous['listing_status'] if previous else None,
+                )
+            )
+
+        values = [record.get(column) for column in LISTING_COLUMNS]
+        data = json.dumps(dict(record), ensure_ascii=False, default=json_default)
+        columns = ', '.join(LISTING_COLUMNS)
+        placeholders = ', '.join('?' for _ in LISTING_COLUMNS)
+        updates = ', '.join(f'{column} = excluded.{column}' for column in LISTING_COLUMNS)
+        self.conn.execute(
+            f'INSERT INTO listings (property_id, search, {columns}, first_seen, scraped_at, data) '
+            f'VALUES (?, ?, {placeholders}, ?, ?, ?) '
+            f'ON CONFLICT(property_id) DO UPDATE SET {updates}, '
+            f'search = excluded.search, scraped_at = excluded.scraped_at, data = excluded.data',
+            [property_id, search, *values, scraped_at, scraped_at, data]
+        )
+
+        self._pending += 1
+        if self._pending >= self.commit_interval:
+            self.commit()
+        return changed
+
+    def commit(self) -> None:
+        self.conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.commit()
+        self.conn.close()
+
+    def price_drops(self, since: datetime, search: Optional[str] = None) -> List[sqlite3.Row]:
+        """Listings whose price went down since ``since``, biggest drop first."""
+        query = (
+            'SELECT h.property_id, l.location, l.url, l.search, h.previous_price, h.price, '
+            '(h.previous_price - h.price) AS drop_amount, h.scraped_at '
+            'FROM price_history h JOIN listings l ON l.property_id = h.property_id '
+            'WHERE h.scraped_at >= ? AND h.price < h.previous_price'
+        )
+        params: List[Any] = [since.isoformat()]
+        if search:
+            query += ' AND l.search = ?'
+            params.append(search)
+        query += ' ORDER BY drop_amount DESC'
+        return self.conn.execute(query, params).fetchall()
+
+    def timeline(self, property_id: str) -> List[sqlite3.Row]:
+        """Price/status changes for one property, oldest first."""
+        return self.conn.execute(
+            'SELECT scraped_at, price, previous_price, listing_status FROM price_history '
+            'WHERE property_id = ? ORDER BY scraped_at',
+            (property_id,)
+        ).fetchall()
+
+
+def main():
+    from propertypal_scraper import settings
+
+    parser = argparse.ArgumentParser(description="Query the property history store")
+    parser.add_argument('--db', default=settings.HISTORY_DB_FILE, help="History database file")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--price-drops', type=int, metavar='DAYS', help="Price drops in the last N days")
+    group.add_argument('--timeline', metavar='PROPERTY_ID', help="Price history of one property")
+    parser.add_argument('--search', help="Only listings from this search (slug)")
+    args = parser.parse_args()
+
+    store = PropertyHistoryStore(args.db)
+    try:
+        if args.price_drops is not None:
+            since = datetime.now() - timedelta(days=args.price_drops)
+            rows = store.price_drops(since, search=args.search)
+            for row in rows:
+                print(f"-£{row['drop_amount']:,}  £{row['previous_price']:,} -> £{row['price']:,}  "
+                      f"{row['location']}  {row['url']}")
+            print(f"\n{len(rows)} price drops since {since:%Y-%m-%d}")
+        else:
+            for row in store.timeline(args.timeline):
+                print(f"{row['scraped_at']}  {row['listing_status']}  £{row['price']:,}" if row['price']
+                      else f"{row['scraped_at']}  {row['listing_status']}  (no price)")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,62 @@
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
 import re
 
+from propertypal_scraper.utils import parse_annual_amount, parse_epc, parse_monthly_amount, parse_size_sqm
+
+_PRICE_SYMBOLS_RE = re.compile(r'[£,]')
+_DIGITS_RE = re.compile(r'\d+')
+
+
+def clean_price(v: Any) -> Optional[int]:
+    """Extract numeric price from string like '£105,000' or 'Guide Price £105,000'"""
+    if v is None:
+        return None
+    if isinstance(v, int):
+        return v
+    # Remove £, commas, and extract first number
+    match = _DIGITS_RE.search(_PRICE_SYMBOLS_RE.sub('', str(v)))
+    if match:
+        return int(match.group())
+    return None
+
+
+def extract_number(v: Any) -> Optional[int]:
+    """Extract number from strings like '2 Bedrooms' or '2'"""
+    if v is None:
+        return None
+    if isinstance(v, int):
+        return v
+    # Extract first digit sequence
+    match = _DIGITS_RE.search(str(v))
+    if match:
+        return int(match.group())
+    return None
+
+
+def numeric_companions(
+    price: Optional[int],
+    size: Optional[str],
+    rates: Optional[str],
+    energy_rating: Optional[str],
+    typical_mortgage: Optional[str]
+) -> Dict[str, Any]:
+    """Typed values parsed from the raw size/rates/EPC/mortgage strings."""
+    size_sqm = parse_size_sqm(size)
+    epc_band, epc_score, epc_potential_band, epc_potential_score = parse_epc(energy_rating)
+    return {
+        'size_sqm': size_sqm,
+        'rates_annual': parse_annual_amount(rates),
+        'epc_band': epc_band,
+        'epc_score': epc_score,
+        'epc_potential_band': epc_potential_band,
+        'epc_potential_score': epc_potential_score,
+        'mortgage_monthly': parse_monthly_amount(typical_mortgage),
+        'price_per_sqm': round(price / size_sqm, 2) if price and size_sqm else None,
+    }
+
 
 class PropertyListing(BaseModel):
     """Pydantic model for PropertyPal property listings"""
@@ -31,6 +85,16 @@ class PropertyListing(BaseModel):
     typical_mortgage: Optional[str] = None  # "£460.69 per month"
     rates: Optional[str] = None  # "£863.37 pa"
 
+    # Parsed numeric companions of the raw strings above (see numeric_companions)
+    size_sqm: Optional[float] = None  # 60.0
+    rates_annual: Optional[float] = None  # 863.37
+    epc_band: Optional[str] = None  # "F"
+    epc_score: Optional[int] = None  # 28
+    epc_potential_band: Optional[str] = None  # "F"
+    epc_potential_score: Optional[int] = None  # 37
+    mortgage_monthly: Optional[float] = None  # 460.69
+    price_per_sqm: Optional[float] = None
+
     # Description Details
     description: Optional[str] = None
     additional_info: Optional[str] = None  # Bullet points
@@ -40,6 +104,7 @@ class PropertyListing(BaseModel):
 
     # Metadata
     listing_status: str = "forSale"
+    canonical_id: Optional[str] = None  # Earlier property_id of the same house, if relisted
 
     # Perplexity Rating
     perplexity_rating: Optional[float] = None
@@ -49,34 +114,35 @@ class PropertyListing(BaseModel):
     # Distance to destination (in km)
     distance_to_destination: Optional[float] = None
 
+    # Geocoded property coordinates
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+    # Walking route to destination over the street graph
+    walking_distance_km: Optional[float] = None
+    walking_minutes: Optional[float] = None
+
+    # Public-transport commute to destination (GTFS timetable)
+    commute_minutes: Optional[float] = None
+
     @field_validator('price', mode='before')
     @classmethod
     def clean_price(cls, v):
-        """Extract numeric price from string like '£105,000' or 'Guide Price £105,000'"""
-        if v is None:
-            return None
-        if isinstance(v, int):
-            return v
-        # Remove £, commas, and extract first number
-        cleaned = re.sub(r'[£,]', '', str(v))
-        match = re.search(r'\d+', cleaned)
-        if match:
-            return int(match.group())
-        return None
+        return clean_price(v)
 
     @field_validator('bedrooms', 'bathrooms', 'receptions', mode='before')
     @classmethod
     def extract_number(cls, v):
-        """Extract number from strings like '2 Bedrooms' or '2'"""
-        if v is None:
-            return None
-        if isinstance(v, int):
-            return v
-        # Extract first digit sequence
-        match = re.search(r'\d+', str(v))
-        if match:
-            return int(match.group())
-        return None
+        return extract_number(v)
+
+    @model_validator(mode='after')
+    def parse_numeric_companions(self):
+        """Fill size_sqm, rates_annual, EPC and mortgage values from the raw strings."""
+        parsed = numeric_companions(self.price, self.size, self.rates, self.energy_rating, self.typical_mortgage)
+        for name, value in parsed.items():
+            if getattr(self, name) is None:
+                setattr(self, name, value)
+        return self
 
 
     class Config:
@@ -84,3 +150,84 @@ class PropertyListing(BaseModel):
         json_encoders = {
             datetime: lambda v: v.isoformat()
         }
+
+
+@dataclass(slots=True)
+class PropertyRecord:
+    """Lightweight listing item used when full Pydantic validation is off.
+
+    Same fields as PropertyListing, but stored in __slots__ and only the
+    price, room counts and numeric companions are converted. Pipelines read and update it in place
+    through ItemAdapter, so it isn't copied between stages.
+    """
+
+    # Identifiers
+    property_id: str
+    url: str
+    location: str
+    property_type: str
+    scraped_at: datetime = field(default_factory=datetime.now)
+
+    # Header Info
+    price: Optional[int] = None
+    currency: str = "GBP"
+    bedrooms: Optional[int] = None
+    bathrooms: Optional[int] = None
+    receptions: Optional[int] = None
+
+    # Property Features
+    size: Optional[str] = None
+    tenure: Optional[str] = None
+    energy_rating: Optional[str] = None
+    heating: Optional[str] = None
+
+    # Property Financials
+    typical_mortgage: Optional[str] = None
+    rates: Optional[str] = None
+
+    # Parsed numeric companions
+    size_sqm: Optional[float] = None
+    rates_annual: Optional[float] = None
+    epc_band: Optional[str] = None
+    epc_score: Optional[int] = None
+    epc_potential_band: Optional[str] = None
+    epc_potential_score: Optional[int] = None
+    mortgage_monthly: Optional[float] = None
+    price_per_sqm: Optional[float] = None
+
+    # Description Details
+    description: Optional[str] = None
+    additional_info: Optional[str] = None
+    room_details: Optional[List[str]] = field(default_factory=list)
+    directions: Optional[str] = None
+    features: List[str] = field(default_factory=list)
+
+    # Metadata
+    listing_status: str = "forSale"
+    canonical_id: Optional[str] = None  # Earlier property_id of the same house, if relisted
+
+    # Enrichment (filled in by pipelines)
+    perplexity_rating: Optional[float] = None
+    perplexity_analysis: Optional[str] = None
+    calculated_monthly_payment: Optional[float] = None
+    distance_to_destination: Optional[float] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    walking_distance_km: Optional[float] = None
+    walking_minutes: Optional[float] = None
+    commute_minutes: Optional[float] = None
+
+    @classmethod
+    def from_raw(cls, data: Dict[str, Any]) -> 'PropertyRecord':
+        """Build a record from scraped strings, converting price, room counts and numeric companions."""
+        price = clean_price(data.get('price'))
+        return cls(**{
+            **data,
+            'price': price,
+            'bedrooms': extract_number(data.get('bedrooms')),
+            'bathrooms': extract_number(data.get('bathrooms')),
+            'receptions': extract_number(data.get('receptions')),
+            **numeric_companions(
+                price, data.get('size'), data.get('rates'), data.get('energy_rating'), data.get('typical_mortgage')
+            ),
+        })
@@ -0,0 +1,215 @@
+"""Memory-bounded crawling and allocation tracking for region-wide runs.
+
+With MEMORY_BOUNDED=true (see settings.py):
+
+- At most MEMORY_MAX_ACTIVE_BYTES of responses are held while their items go
+  through the pipelines (Scrapy's SCRAPER_SLOT_MAX_ACTIVE_SIZE; a FlareSolverr
+  page can be 1 MB), and at most MEMORY_CONCURRENT_ITEMS items per response
+  are processed at once (CONCURRENT_ITEMS). Past that the engine stops
+  downloading until responses have been released.
+- SpillDupeFilter and the run dedup set of DuplicateFilterPipeline keep at
+  most MEMORY_MAX_SET_ITEMS entries in memory and the rest in a SQLite file
+  in MEMORY_SPILL_DIR, deleted when the crawl ends.
+- The spider skips fields listed in SPIDER_SKIP_FIELDS.
+
+AllocationReporter (TRACEMALLOC_ENABLED=true) traces Python allocations and
+every TRACEMALLOC_INTERVAL_ITEMS items logs the top allocation sites, what
+grew since the last report, and the current and peak RSS.
+"""
+
+import os
+import sqlite3
+import tempfile
+import tracemalloc
+from typing import Hashable, Iterable, Optional
+
+from scrapy import signals
+from scrapy.dupefilters import RFPDupeFilter
+from scrapy.exceptions import NotConfigured
+
+
+class SpillSet:
+    """Set of strings or bytes holding at most ``max_items`` in memory and the rest in SQLite.
+
+    When the in-memory part is full it is moved to a temporary database in
+    ``directory`` and emptied. Lookups check memory first, then the
+    database's primary key index.
+    """
+
+    def __init__(self, max_items: int, directory: Optional[str] = None, name: str = 'set'):
+        self.max_items = max_items
+        self.directory = directory
+        self.name = name
+        self.memory = set()
+        self.spilled = 0
+        self.path = None
+        self.conn = None
+
+    def __contains__(self, value: Hashable) -> bool:
+        if value in self.memory:
+            return True
+        if self.conn is None:
+            return False
+        return self.conn.execute('SELECT 1 FROM items WHERE value = ?', (value,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return len(self.memory) + self.spilled
+
+    def add(self, value: Hashable) -> None:
+        if value in self:
+            return
+        self.memory.add(value)
+        if len(self.memory) >= self.max_items:
+            self._spill()
+
+    def update(self, values: Iterable[Hashable]) -> None:
+        for value in values:
+            self.add(value)
+
+    def _spill(self) -> None:
+        if self.conn is None:
+            os.makedirs(self.directory or tempfile.gettempdir(), exist_ok=True)
+            fd, self.path = tempfile.mkstemp(prefix=f'{self.name}_', suffix='.db', dir=self.directory)
+            os.close(fd)
+            self.conn = sqlite3.connect(self.path)
+            self.conn.execute('PRAGMA journal_mode=OFF')
+            self.conn.execute('PRAGMA synchronous=OFF')
+            self.conn.execute('CREATE TABLE items (value PRIMARY KEY) WITHOUT ROWID')
+        with self.conn:
+            self.conn.executemany('INSERT OR IGNORE INTO items (value) VALUES (?)', ((v,) for v in self.memory))
+        self.spilled += len(self.memory)
+        self.memory = set()
+
+    def close(self) -> None:
+        self.memory = set()
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+            os.remove(self.path)
+
+
+class SpillDupeFilter(RFPDupeFilter):
+    """RFPDupeFilter whose request fingerprints spill to disk past MEMORY_MAX_SET_ITEMS"""
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        from propertypal_scraper import settings
+
+        dupefilter = super().from_crawler(crawler)
+        seen = SpillSet(settings.MEMORY_MAX_SET_ITEMS, settings.MEMORY_SPILL_DIR, name='requests')
+        # JOBDIR fingerprints read by RFPDupeFilter.__init__
+        seen.update(dupefilter._fingerprints)
+        dupefilter._fingerprints = seen
+        return dupefilter
+
+    def close(self, reason: str) -> None:
+        super().close(reason)
+        self._fingerprints.close()
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB (Linux /proc), or None."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class AllocationReporter:
+    """Log the top allocation sites every N items with tracemalloc
+
+    Configure via environment variables:
+    - TRACEMALLOC_ENABLED: Enable allocation tracking (default: false)
+    - TRACEMALLOC_INTERVAL_ITEMS: Items between reports (default: 500)
+    - TRACEMALLOC_TOP: Allocation sites per report (default: 10)
+    - TRACEMALLOC_FRAMES: Stack frames kept per allocation (default: 1)
+    """
+
+    # Allocations of the tracing machinery itself
+    FILTERS = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    ]
+
+    def __init__(self, crawler, interval: int, top: int, frames: int):
+        self.crawler = crawler
+        self.interval = interval
+        self.top = top
+        self.frames = frames
+        self.items = 0
+        self.reported_at = None
+        self.previous = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        from propertypal_scraper import settings
+
+        if not settings.TRACEMALLOC_ENABLED:
+            raise NotConfigured
+        reporter = cls(
+            crawler, settings.TRACEMALLOC_INTERVAL_ITEMS, settings.TRACEMALLOC_TOP, settings.TRACEMALLOC_FRAMES
+        )
+        crawler.signals.connect(reporter.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(reporter.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(reporter.spider_closed, signal=signals.spider_closed)
+        return reporter
+
+    def spider_opened(self, spider):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        spider.logger.info(f"Allocation tracking enabled: top {self.top} sites every {self.interval} items")
+
+    def item_scraped(self, item, response, spider):
+        self.items += 1
+        if self.items % self.interval == 0:
+            self.report(spider)
+
+    def spider_closed(self, spider):
+        if self.reported_at != self.items:
+            self.report(spider)
+        tracemalloc.stop()
+        self.previous = None
+
+    def report(self, spider):
+        snapshot = tracemalloc.take_snapshot().filter_traces(self.FILTERS)
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        rss, rss_peak = current_rss_mb(), peak_rss_mb()
+
+        stats = self.crawler.stats
+        stats.max_value('memory/traced_peak_mb', round(traced_peak / 2 ** 20, 1))
+        if rss_peak is not None:
+            stats.max_value('memory/peak_rss_mb', round(rss_peak, 1))
+
+        lines = [
+            f"Memory after {self.items} items: traced {traced / 2 ** 20:.1f} MB "
+            f"(peak {traced_peak / 2 ** 20:.1f} MB)"
+            + (f", RSS {rss:.1f} MB (peak {rss_peak:.1f} MB)" if rss is not None and rss_peak is not None else '')
+        ]
+        lines.append("Top allocation sites:")
+        for stat in snapshot.statistics('traceback' if self.frames > 1 else 'lineno')[:self.top]:
+            lines.append(f"  {stat.size / 1024:10.1f} KB {stat.count:8d} blocks  {self._site(stat.traceback)}")
+        if self.previous is not None:
+            lines.append("Grown since the last report:")
+            growth = [diff for diff in snapshot.compare_to(self.previous, 'lineno') if diff.size_diff > 0]
+            for diff in growth[:self.top]:
+                lines.append(f"  {diff.size_diff / 1024:+10.1f} KB {diff.count_diff:+8d} blocks  {self._site(diff.traceback)}")
+        self.previous = snapshot
+        self.reported_at = self.items
+        spider.logger.info('\n'.join(lines))
+
+    @staticmethod
+    def _site(traceback) -> str:
+        return ' <- '.join(f"{frame.filename}:{frame.lineno}" for frame in traceback)
@@ -3,10 +3,21 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import json
+import logging
+import os
+from typing import List
+
 from scrapy import signals
-from scrapy.http import HtmlResponse
+from scrapy.http import HtmlResponse, Request
+from scrapy_user_agents import middlewares as user_agents
+from scrapy_user_agents.user_agent_picker import UserAgentPicker
 import requests
 
+from propertypal_scraper import shared
+
+logger = logging.getLogger(__name__)
+
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
@@ -27,7 +38,22 @@ class FlareSolverrMiddleware:
         return middleware
 
     def spider_opened(self, spider):
-        """Create a FlareSolverr session when spider opens"""
+        """Create a FlareSolverr session when spider opens (or reuse the daemon's)"""
+        self.session_id = shared.acquire(
+            ('flaresolverr_session', self.flaresolverr_url),
+            lambda: self._create_session(spider.logger),
+            close=lambda session_id: self._destroy_session(session_id, logger)
+        )
+
+    def spider_closed(self, spider):
+        """Destroy FlareSolverr session when spider closes (unless shared)"""
+        shared.release(
+            ('flaresolverr_session', self.flaresolverr_url),
+            self.session_id,
+            lambda session_id: self._destroy_session(session_id, spider.logger)
+        )
+
+    def _create_session(self, logger):
         try:
             response = requests.post(
                 self.flaresolverr_url,
@@ -38,26 +64,25 @@ class FlareSolverrMiddleware:
             )
             data = response.json()
             if data.get('status') == 'ok':
-                self.session_id = data.get('session')
-                spider.logger.info(f"FlareSolverr session created: {self.session_id}")
+                logger.info(f"FlareSolverr session created: {data.get('session')}")
+                return data.get('session')
         except Exception as e:
-            spider.logger.error(f"Failed to create FlareSolverr session: {e}")
+            logger.error(f"Failed to create FlareSolverr session: {e}")
+        return None
 
-    def spider_closed(self, spider):
-        """Destroy FlareSolverr session when spider closes"""
-        if self.session_id:
-            try:
-                requests.post(
-                    self.flaresolverr_url,
-                    json={
-                        "cmd": "sessions.destroy",
-                        "session": self.session_id
-                    },
-                    timeout=30
-                )
-                spider.logger.info(f"FlareSolverr session destroyed: {self.session_id}")
-            except Exception as e:
-                spider.logger.error(f"Failed to destroy FlareSolverr session: {e}")
+    def _destroy_session(self, session_id, logger):
+        try:
+            requests.post(
+                self.flaresolverr_url,
+                json={
+                    "cmd": "sessions.destroy",
+                    "session": session_id
+                },
+                timeout=30
+            )
+            logger.info(f"FlareSolverr session destroyed: {session_id}")
+        except Exception as e:
+            logger.error(f"Failed to destroy FlareSolverr session: {e}")
 
     def process_request(self, request, spider):
         """Process request through FlareSolverr"""
@@ -96,6 +121,188 @@ class FlareSolverrMiddleware:
             return None
 
 
+class CachedUserAgentPicker(UserAgentPicker):
+    """UserAgentPicker built from the already filtered list a previous start saved.
+
+    ``UserAgentPicker(uas, ...)`` parses every user agent in ``uas`` to keep
+    the ones matching ``ua_type``; this constructor takes the kept list as is
+    and sets up the same state, so ``get_ua`` works unchanged.
+    """
+
+    def __init__(self, uas_list: List[str], ua_type: str, same_os_family: bool, per_proxy: bool, fallback):
+        self.ua_type = ua_type
+        self.same_os_family = same_os_family
+        self.per_proxy = per_proxy
+        self.fallback = fallback
+        self.proxy2ua = {}
+        # Only needed while filtering
+        self.uas_by_device = {}
+        self.uas_list = list(uas_list)
+
+    @classmethod
+    def from_cache(cls, uas_list: List[str], ua_type: str, same_os_family: bool = True,
+                   per_proxy: bool = False, fallback=None) -> 'CachedUserAgentPicker':
+        return cls(uas_list, ua_type, same_os_family, per_proxy, fallback)
+
+
+class CachedUserAgentMiddleware(user_agents.RandomUserAgentMiddleware):
+    """Random user agent per request, without re-parsing the user agent list on every start
+
+    scrapy-user-agents parses all ~2,000 user agents in its list (over 2s)
+    to keep the ones matching RANDOM_UA_TYPE. The kept ones are saved to
+    USER_AGENT_CACHE_FILE and reused while the list file and the RANDOM_UA_*
+    settings are unchanged.
+    """
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        ua_file = settings.get('RANDOM_UA_FILE')
+        if ua_file:
+            ua_file = os.path.abspath(os.path.expanduser(ua_file))
+        else:
+            ua_file = os.path.join(os.path.dirname(user_agents.__file__), 'default_uas.txt')
+        key = [
+            ua_file, os.path.getmtime(ua_file),
+            settings.get('RANDOM_UA_TYPE', 'desktop.chrome'),
+            settings.getbool('RANDOM_UA_SAME_OS_FAMILY', True),
+        ]
+        cache_file = settings.get('USER_AGENT_CACHE_FILE')
+
+        uas = self._load_cache(cache_file, key) if cache_file else None
+        if uas is None:
+            super().__init__(crawler)
+            if cache_file:
+                self._save_cache(cache_file, key, self.ua_picker.uas_list)
+            return
+
+        self.ua_picker = CachedUserAgentPicker.from_cache(
+            uas,
+            ua_type=key[2],
+            same_os_family=key[3],
+            per_proxy=settings.getbool('RANDOM_UA_PER_PROXY', False),
+            fallback=settings.get('RANDOM_UA_FALLBACK', None)
+        )
+
+    @staticmethod
+    def _load_cache(path, key):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return cache.get('uas') if cache.get('key') == key else None
+
+    @staticmethod
+    def _save_cache(path, key, uas):
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'uas': uas}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save user agent cache {path}: {e}")
+
+
+class CheckpointMiddleware:
+    """Persist and resume the request frontier of a job (spider argument ``job``)
+
+    Every request the spider yields is stored in the job checkpoint before it
+    is scheduled, and its page is marked finished once the callback is done
+    and its items have left the item pipelines. When a job is restarted,
+    pages that were pending or in flight are requested again and requests
+    already in the checkpoint are dropped. Callbacks must be spider methods;
+    meta and cb_kwargs are not stored. Does nothing for crawls without a job.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.stats = crawler.stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        middleware = cls(crawler)
+        crawler.signals.connect(middleware.item_done, signal=signals.item_scraped)
+        crawler.signals.connect(middleware.item_done, signal=signals.item_dropped)
+        return middleware
+
+    @property
+    def checkpoint(self):
+        return getattr(self.crawler.spider, 'checkpoint', None)
+
+    async def process_start(self, start):
+        checkpoint = self.checkpoint
+        if checkpoint is not None and checkpoint.resumed:
+            spider = self.crawler.spider
+            done, pending = checkpoint.counts()
+            spider.logger.info(f"Resuming job '{checkpoint.job}': {done} pages done, {pending} pending")
+            for fingerprint, url, callback in checkpoint.pending():
+                # Already in the checkpoint, so bypass the dupefilter and _track()
+                yield Request(
+                    url, callback=getattr(spider, callback) if callback else None,
+                    dont_filter=True, meta={'checkpoint_key': fingerprint}
+                )
+                self.stats.inc_value('checkpoint/resumed_requests')
+
+        async for item_or_request in start:
+            if isinstance(item_or_request, Request):
+                item_or_request = self._track(item_or_request)
+                if item_or_request is None:
+                    continue
+            yield item_or_request
+
+    def process_spider_output(self, response, result, spider):
+        items = 0
+        for item_or_request in result:
+            if isinstance(item_or_request, Request):
+                item_or_request = self._track(item_or_request)
+                if item_or_request is None:
+                    continue
+            else:
+                items += 1
+            yield item_or_request
+        self._page_done(response, items)
+
+    async def process_spider_output_async(self, response, result, spider):
+        items = 0
+        async for item_or_request in result:
+            if isinstance(item_or_request, Request):
+                item_or_request = self._track(item_or_request)
+                if item_or_request is None:
+                    continue
+            else:
+                items += 1
+            yield item_or_request
+        self._page_done(response, items)
+
+    def item_done(self, item, response, spider):
+        """item_scraped/item_dropped: the page that produced the item is finished."""
+        key = response.meta.get('checkpoint_key') if response is not None else None
+        if key and self.checkpoint is not None:
+            self.checkpoint.complete(key, ItemAdapter(item).get('property_id'))
+
+    def _track(self, request):
+        """Store a new request in the checkpoint; None if the job has seen it already."""
+        checkpoint = self.checkpoint
+        if checkpoint is None:
+            return request
+
+        fingerprint = self.crawler.request_fingerprinter.fingerprint(request).hex()
+        if checkpoint.is_known(fingerprint):
+            self.stats.inc_value('checkpoint/skipped_requests')
+            return None
+        callback = getattr(request.callback, '__name__', None)
+        checkpoint.add(fingerprint, request.url, callback)
+        request.meta['checkpoint_key'] = fingerprint
+        return request
+
+    def _page_done(self, response, items):
+        # Pages with items finish in item_done(), once the items are through the pipelines
+        key = response.meta.get('checkpoint_key')
+        if key and not items and self.checkpoint is not None:
+            self.checkpoint.complete(key)
+
+
 class PropertypalScraperSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
     # scrapy acts as if the spider middleware does not modify the
@@ -3,13 +3,33 @@ import time
 import requests
 from typing import Dict, Any
 
+DEPOSIT = 15000
+INTEREST_RATE = 0.04
+LOAN_TERM_YEARS = 40
+
+
+def calculate_monthly_payment(price: int, deposit: int = DEPOSIT, interest_rate: float = INTEREST_RATE,
+                              loan_term_years: int = LOAN_TERM_YEARS) -> float:
+    """Calculate monthly mortgage payment (repayment mortgage)"""
+    if not price or price <= deposit:
+        return 0.0
+
+    loan_amount = price - deposit
+    monthly_rate = interest_rate / 12
+    num_payments = loan_term_years * 12
+
+    monthly_payment = loan_amount * (monthly_rate * (1 + monthly_rate) ** num_payments) / \
+                     ((1 + monthly_rate) ** num_payments - 1)
+
+    return round(monthly_payment, 2)
+
 
 class PerplexityPropertyRater:
     """Rate properties using Perplexity's Housing Agent space"""
 
-    DEPOSIT = 15000
-    INTEREST_RATE = 0.04
-    LOAN_TERM_YEARS = 40
+    DEPOSIT = DEPOSIT
+    INTEREST_RATE = INTEREST_RATE
+    LOAN_TERM_YEARS = LOAN_TERM_YEARS
 
     def __init__(self, api_key: str = None):
         self.api_key = api_key or os.getenv('PERPLEXITY_API_KEY')
@@ -24,17 +44,7 @@ class PerplexityPropertyRater:
 
     def calculate_monthly_payment(self, price: int) -> float:
         """Calculate monthly mortgage payment"""
-        if not price or price <= self.DEPOSIT:
-            return 0.0
-
-        loan_amount = price - self.DEPOSIT
-        monthly_rate = self.INTEREST_RATE / 12
-        num_payments = self.LOAN_TERM_YEARS * 12
-
-        monthly_payment = loan_amount * (monthly_rate * (1 + monthly_rate) ** num_payments) / \
-                         ((1 + monthly_rate) ** num_payments - 1)
-
-        return round(monthly_payment, 2)
+        return calculate_monthly_payment(price, self.DEPOSIT, self.INTEREST_RATE, self.LOAN_TERM_YEARS)
 
     def build_prompt(self, property_data: Dict[str, Any]) -> str:
         """Build prompt for Perplexity Housing Agent"""
@@ -1,28 +1,146 @@
-import json
-import csv
+import glob
+import itertools
 import os
-from datetime import datetime
+import time
+from datetime import date, datetime
 from itemadapter import ItemAdapter
-from propertypal_scraper.perplexity_rating import PerplexityPropertyRater
-from propertypal_scraper.geocoding import GeocodingService
-from propertypal_scraper import settings
+from scrapy import signals
+from scrapy.exceptions import DropItem
+from scrapy.utils.defer import deferred_from_coro, maybe_deferred_to_future
+from twisted.internet import task, threads
+from twisted.internet.defer import Deferred
+from propertypal_scraper.exporters import (
+    BackgroundExporter, CsvSink, JsonLinesSink, JsonLinesWriter, ParquetPartitionWriter,
+    ParquetSink, RatingsSink, normalize_record
+)
+from propertypal_scraper.history import PropertyHistoryStore
+from propertypal_scraper.diff import FingerprintStore, ChangeDetector
+from propertypal_scraper.dedup import POLICIES as DEDUP_POLICIES, DedupIndex, record_fingerprint
+from propertypal_scraper.memory import SpillSet
+from propertypal_scraper.signals import card_address_found, job_checkpoint
+from propertypal_scraper.utils import slugify
+from propertypal_scraper import settings, shared
+
+# Stages with heavy dependencies (numpy, geopy, requests, OSM and GTFS
+# parsing) import them in open_spider, so a disabled stage costs nothing at
+# startup. Stages switched off in settings aren't even loaded (ITEM_PIPELINES).
 
 
 class DuplicateFilterPipeline:
-    """Drop items whose URL has already been seen in this spider run"""
+    """Drop listings that were already seen, in this run or (optionally) any earlier one
+
+    Duplicates within a run (same property_id or URL) are always dropped. With
+    a persistent policy the property_id index in DEDUP_INDEX_FILE is shared by
+    every search and run:
+
+    - drop: drop any listing seen before
+    - touch: drop it, but record that it was seen again (last_seen)
+    - reemit: drop it unless its tracked fields changed since it was last seen
+
+    Listings that pass are new (or changed), so rating and geocoding never
+    run twice for the same listing across overlapping searches. Listings a
+    resumable job indexed itself before it was restarted still count as new,
+    unless they are in the exports of its last checkpoint.
+
+    Configure via environment variables:
+    - DEDUP_POLICY: run, drop, touch or reemit (default: run, i.e. per-run only)
+    - DEDUP_INDEX_FILE: Shared index file (default: data/state/dedup.db)
+    - DEDUP_BLOOM_CAPACITY: Expected number of listings (default: 1000000)
+    - DEDUP_FIELDS: Fields compared by reemit (default: CHANGESET_FIELDS)
+    - MEMORY_BOUNDED / MEMORY_MAX_SET_ITEMS: Spill the per-run set to disk past this size
+    """
+
+    def __init__(self):
+        self.index = None
+        self.stats = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = cls()
+        pipeline.stats = crawler.stats
+        return pipeline
 
     def open_spider(self, spider):
-        self.seen = set()
+        if settings.MEMORY_BOUNDED:
+            self.seen = SpillSet(settings.MEMORY_MAX_SET_ITEMS, settings.MEMORY_SPILL_DIR, name='dedup')
+        else:
+            self.seen = set()
+        checkpoint = getattr(spider, 'checkpoint', None)
+        self.job_started_at = checkpoint.started_at if checkpoint else None
+        # Listings in the checkpointed exports; the rest were truncated away on resume
+        self.job_exported = set(checkpoint.property_ids()) if checkpoint and checkpoint.resumed else set()
+        self.policy = settings.DEDUP_POLICY
+        if self.policy not in DEDUP_POLICIES:
+            spider.logger.warning(f"Unknown DEDUP_POLICY '{self.policy}', using 'run'")
+            self.policy = 'run'
+        if self.policy == 'run':
+            return
+
+        self.index = shared.acquire(
+            ('dedup', settings.DEDUP_INDEX_FILE),
+            lambda: DedupIndex(settings.DEDUP_INDEX_FILE, capacity=settings.DEDUP_BLOOM_CAPACITY),
+            close=DedupIndex.close
+        )
+        self.false_positives_at_open = self.index.false_positives
+        spider.logger.info(
+            f"Dedup index: {settings.DEDUP_INDEX_FILE} ({len(self.index)} listings, policy: {self.policy})"
+        )
+
+    def close_spider(self, spider):
+        if isinstance(self.seen, SpillSet):
+            self.seen.close()
+        if self.index is not None:
+            if self.stats:
+                self.stats.set_value(
+                    'dedup/bloom_false_positives', self.index.false_positives - self.false_positives_at_open
+                )
+            shared.release(('dedup', settings.DEDUP_INDEX_FILE), self.index, DedupIndex.close)
 
     def process_item(self, item, spider):
-        from itemadapter import ItemAdapter
-        url = ItemAdapter(item).get('url')
-        if url in self.seen:
-            spider.logger.debug(f"Duplicate URL dropped: {url}")
-            from scrapy.exceptions import DropItem
-            raise DropItem(f"Duplicate URL: {url}")
-        self.seen.add(url)
-        return item
+        adapter = ItemAdapter(item)
+        key = adapter.get('property_id') or adapter.get('url')
+        if key in self.seen:
+            self._drop('duplicate', f"Duplicate in this run: {adapter.get('url')}", spider)
+        self.seen.add(key)
+
+        if self.index is None or not adapter.get('property_id'):
+            return item
+
+        property_id = adapter['property_id']
+        fingerprint = record_fingerprint(adapter, settings.DEDUP_FIELDS)
+        search = getattr(spider, 'search_slug', None)
+
+        stored = self.index.lookup(property_id)
+        if stored is None and self.index.insert(property_id, fingerprint, search):
+            self._inc('new')
+            return item
+        if stored is None:
+            # Another crawl sharing the index added it just now
+            stored = self.index.lookup(property_id)
+        if (self.job_started_at and stored[3] == search and stored[1] >= self.job_started_at
+                and property_id not in self.job_exported):
+            # First seen by an earlier run of this job, but not exported by its last checkpoint
+            self._inc('new')
+            return item
+
+        if self.policy == 'drop':
+            self._drop('seen', f"Seen before: {adapter.get('url')}", spider)
+        if self.policy == 'reemit' and stored[0] != fingerprint:
+            self.index.touch(property_id, fingerprint)
+            self._inc('changed')
+            return item
+
+        self.index.touch(property_id)
+        self._drop('seen', f"Seen before (last {stored[2]}): {adapter.get('url')}", spider)
+
+    def _inc(self, key):
+        if self.stats:
+            self.stats.inc_value(f'dedup/{key}')
+
+    def _drop(self, key, message, spider):
+        self._inc(key)
+        spider.logger.debug(message)
+        raise DropItem(message)
 
 
 class ValidationPipeline:
@@ -51,120 +169,255 @@ class ValidationPipeline:
         return item
 
 
-class JSONPipeline:
-    """Export items to JSON file with timestamp"""
+class ChangesetPipeline:
+    """Stream new/changed/disappeared listings compared with the previous run
+
+    Fingerprints of the last run of each search are kept in
+    data/state/fingerprints/<search>.json. Events are written as JSON Lines to
+    data/changes/<search>_<timestamp>.jsonl while the crawl runs; disappeared
+    listings are written when it finishes. Runs that stop early (--limit,
+    Ctrl-C) don't report disappeared listings. A resumable job saves its
+    fingerprints at every checkpoint, and counts listings from its earlier
+    runs as seen when it finishes. Workers of a distributed crawl don't
+    report disappeared listings either.
+
+    Configure via environment variables:
+    - CHANGESET_ENABLED: Enable change detection (default: true)
+    - CHANGESET_DIR: Output directory for changesets (default: data/changes)
+    - CHANGESET_STATE_DIR: Fingerprint directory (default: data/state/fingerprints)
+    - CHANGESET_FIELDS: Comma-separated fields to compare (default: scraped listing fields)
+    """
+
+    def __init__(self):
+        self.detector = None
+        self.writer = None
+        self.stats = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = cls()
+        pipeline.stats = crawler.stats
+        crawler.signals.connect(pipeline.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(pipeline.job_checkpoint, signal=job_checkpoint)
+        return pipeline
 
     def open_spider(self, spider):
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        self.filename = f'data/raw/properties_{timestamp}.json'
+        if not settings.CHANGESET_ENABLED:
+            return
 
-        # Ensure directory exists
-        os.makedirs('data/raw', exist_ok=True)
+        search = getattr(spider, 'search_slug', 'search')
+        store = FingerprintStore(
+            os.path.join(settings.CHANGESET_STATE_DIR, f'{search}.json'),
+            fields=settings.CHANGESET_FIELDS
+        )
+        self.detector = ChangeDetector(store)
+        self.search = search
+
+        checkpoint = getattr(spider, 'checkpoint', None)
+        if checkpoint is not None:
+            # Seen by earlier runs of this job; their fingerprints were saved at each checkpoint
+            for property_id in checkpoint.property_ids():
+                if property_id in self.detector.previous:
+                    self.detector.current[property_id] = self.detector.previous[property_id]
+
+        self.detected_at = datetime.now().isoformat()
+
+        name = f"{search}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        if settings.FRONTIER:
+            name += f"_{slugify(settings.FRONTIER_WORKER_ID)}"
+        self.writer = JsonLinesWriter(os.path.join(settings.CHANGESET_DIR, f'{name}.jsonl'))
+        spider.logger.info(
+            f"Change detection enabled: {len(store.listings)} listings from the previous run of '{search}'"
+        )
+
+    def process_item(self, item, spider):
+        if self.detector:
+            for event in self.detector.compare(ItemAdapter(item)):
+                self._write(event)
+        return item
+
+    def job_checkpoint(self, spider, checkpoint):
+        if self.detector:
+            self.detector.save(complete=False)
+
+    def spider_closed(self, spider, reason):
+        if not self.detector:
+            return
 
-        self.file = open(self.filename, 'w', encoding='utf-8')
-        self.file.write('[\n')
-        self.first_item = True
-        spider.logger.info(f"Opened JSON export file: {self.filename}")
+        # A worker of a distributed crawl only sees the listings it crawled
+        complete = reason == 'finished' and not settings.FRONTIER
+        if complete:
+            for event in self.detector.disappeared():
+                self._write(event)
+        self.detector.save(complete=complete)
+        self.writer.close()
+        spider.logger.info(f"Changeset saved to: {self.writer.path} ({self.writer.count} events)")
+
+    def _write(self, event):
+        event['search'] = self.search
+        event['detected_at'] = self.detected_at
+        self.writer.write(event)
+        if self.stats:
+            self.stats.inc_value(f"changeset/{event['event']}")
+
+
+class RelistingPipeline:
+    """Link listings relisted under a new property_id to the original listing
+
+    Description and features are compared with MinHash signatures through an
+    LSH index per postcode district (see relisting.py). A match sets
+    canonical_id and copies the original listing's rating and coordinates, so
+    the rating stage skips it and the distance stage doesn't geocode it again.
+
+    Configure via environment variables:
+    - RELISTING_ENABLED: Enable relisting detection (default: true)
+    - RELISTING_DB_FILE: Index file (default: data/state/relisting.db)
+    - RELISTING_THRESHOLD: Minimum estimated Jaccard similarity (default: 0.8)
+    - RELISTING_NUM_PERM: MinHash permutations (default: 128)
+    """
+
+    def __init__(self):
+        self.index = None
+        self.reused_fields = []
+        self.stats = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = cls()
+        pipeline.stats = crawler.stats
+        crawler.signals.connect(pipeline.item_scraped, signal=signals.item_scraped)
+        return pipeline
+
+    def open_spider(self, spider):
+        if not settings.RELISTING_ENABLED:
+            return
+
+        from propertypal_scraper.relisting import REUSED_FIELDS, RelistingIndex
+
+        self.reused_fields = REUSED_FIELDS
+        self.index = RelistingIndex(
+            settings.RELISTING_DB_FILE,
+            threshold=settings.RELISTING_THRESHOLD,
+            num_perm=settings.RELISTING_NUM_PERM
+        )
+        spider.logger.info(
+            f"Relisting detection: {settings.RELISTING_DB_FILE} "
+            f"({self.index.bands} bands x {self.index.rows} rows, threshold {settings.RELISTING_THRESHOLD})"
+        )
 
     def close_spider(self, spider):
-        self.file.write('\n]')
-        self.file.close()
-        spider.logger.info(f"Closed JSON export file: {self.filename}")
-        spider.logger.info(f"JSON output saved to: {self.filename}")
+        if self.index is not None:
+            self.index.close()
 
     def process_item(self, item, spider):
-        if not self.first_item:
-            self.file.write(',\n')
-        self.first_item = False
+        if self.index is None:
+            return item
 
-        # Convert item to dict and serialize with pretty printing
-        item_dict = ItemAdapter(item).asdict()
+        adapter = ItemAdapter(item)
+        property_id = adapter.get('property_id')
+        if not property_id:
+            return item
 
-        # Handle datetime serialization
-        if 'scraped_at' in item_dict and isinstance(item_dict['scraped_at'], datetime):
-            item_dict['scraped_at'] = item_dict['scraped_at'].isoformat()
+        match = self.index.link(property_id, adapter)
+        if match is None:
+            return item
 
-        # Remove fields not in CSV
-        fields_to_remove = ['features', 'room_details', 'directions', 'additional_info']
-        for field in fields_to_remove:
-            item_dict.pop(field, None)
+        canonical_id, similarity = match
+        adapter['canonical_id'] = canonical_id
+        self._inc('linked')
+        spider.logger.info(f"Property {property_id} relists {canonical_id} (similarity {similarity:.2f})")
+
+        reused = False
+        enrichment = self.index.enrichment(canonical_id)
+        for field in self.reused_fields:
+            value = enrichment.get(field)
+            if value is not None and adapter.get(field) is None:
+                adapter[field] = value
+                reused = True
+        if reused:
+            self._inc('reused')
+        return item
 
-        line = json.dumps(item_dict, indent=2, ensure_ascii=False)
-        self.file.write(line)
+    def item_scraped(self, item, response, spider):
+        """Store a canonical listing's enrichment once every stage has run."""
+        if self.index is None:
+            return
+        adapter = ItemAdapter(item)
+        if not adapter.get('property_id') or adapter.get('canonical_id'):
+            return
+        values = {field: adapter.get(field) for field in self.reused_fields if adapter.get(field) is not None}
+        if values:
+            self.index.save_enrichment(adapter['property_id'], values)
 
-        return item
+    def _inc(self, key):
+        if self.stats:
+            self.stats.inc_value(f'relisting/{key}')
 
 
 class PerplexityRatingPipeline:
-    """Rate properties using Perplexity Housing Agent"""
+    """Rate properties using Perplexity Housing Agent
+
+    Ratings are written to data/ratings/ by the ratings sink of ExportPipeline.
+    In a resumable job every rating is also saved to the job checkpoint, so a
+    restarted job never pays for the same rating twice.
+    """
+
+    def __init__(self):
+        self.stats = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = cls()
+        pipeline.stats = crawler.stats
+        return pipeline
 
     def open_spider(self, spider):
         # Check if perplexity rating is enabled via spider argument
         if not getattr(spider, 'use_perplexity', False):
             spider.logger.info("Perplexity rating disabled via command line argument")
             self.rater = None
-            self.file = None
             return
 
+        from propertypal_scraper.perplexity_rating import PerplexityPropertyRater
+
         try:
             self.rater = PerplexityPropertyRater()
             spider.logger.info("Perplexity rating pipeline initialized")
-
-            # Create output file for ratings
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            self.filename = f'data/ratings/perplexity_ratings_{timestamp}.json'
-            os.makedirs('data/ratings', exist_ok=True)
-
-            self.file = open(self.filename, 'w', encoding='utf-8')
-            self.file.write('[\n')
-            self.first_item = True
-            spider.logger.info(f"Opened Perplexity ratings file: {self.filename}")
         except ValueError as e:
             spider.logger.warning(f"Perplexity rating disabled: {e}")
             self.rater = None
-            self.file = None
-
-    def close_spider(self, spider):
-        if self.file:
-            self.file.write('\n]')
-            self.file.close()
-            spider.logger.info(f"Perplexity ratings saved to: {self.filename}")
 
     def process_item(self, item, spider):
         if not self.rater:
             return item
 
         adapter = ItemAdapter(item)
-        property_data = adapter.asdict()
+        if adapter.get('perplexity_rating') is not None:
+            # Rating reused from the original listing of a relisted property
+            if adapter.get('calculated_monthly_payment') is None and adapter.get('price'):
+                from propertypal_scraper.perplexity_rating import calculate_monthly_payment
 
-        spider.logger.info(f"Rating property: {property_data.get('url')}")
-        rating_result = self.rater.rate_property(property_data)
+                adapter['calculated_monthly_payment'] = calculate_monthly_payment(adapter['price'])
+            return item
+
+        checkpoint = getattr(spider, 'checkpoint', None)
+        property_id = adapter.get('property_id')
+        rating_result = checkpoint.rating(property_id) if checkpoint and property_id else None
+        if rating_result is not None:
+            spider.logger.debug(f"Rating from the job checkpoint: {adapter.get('url')}")
+            if self.stats:
+                self.stats.inc_value('checkpoint/ratings_reused')
+        else:
+            spider.logger.info(f"Rating property: {adapter.get('url')}")
+            rating_result = self.rater.rate_property(adapter)
+            if checkpoint and property_id:
+                checkpoint.save_rating(property_id, rating_result)
 
         # Add rating data to item
         adapter['perplexity_rating'] = rating_result.get('rating_score')
         adapter['perplexity_analysis'] = rating_result.get('rating_text')
         adapter['calculated_monthly_payment'] = rating_result.get('monthly_payment')
 
-        # Write rating to dedicated file
-        if self.file:
-            if not self.first_item:
-                self.file.write(',\n')
-            self.first_item = False
-
-            rating_output = {
-                'property_id': property_data.get('property_id'),
-                'url': property_data.get('url'),
-                'location': property_data.get('location'),
-                'price': property_data.get('price'),
-                'rating_score': rating_result.get('rating_score'),
-                'monthly_payment': rating_result.get('monthly_payment'),
-                'analysis': rating_result.get('rating_text'),
-                'rated_at': datetime.now().isoformat()
-            }
-
-            line = json.dumps(rating_output, indent=2, ensure_ascii=False)
-            self.file.write(line)
-
         return item
 
 
@@ -172,7 +425,9 @@ class DistanceCalculationPipeline:
     """Calculate distance from property location to destination.
 
     Uses GeocodingService with file-based caching, exponential backoff retry,
-    and multi-provider fallback (Nominatim -> Photon -> paid services).
+    and multi-provider fallback (Nominatim -> Photon -> paid services). The
+    destination is geocoded, and the walking graph and GTFS feed loaded, in a
+    background thread while the first pages download; items wait for it.
 
     Configure via environment variables:
     - DESTINATION: Target address for distance calculation
@@ -181,6 +436,19 @@ class DistanceCalculationPipeline:
     - GEOCODING_BASE_DELAY: Base delay for exponential backoff (default: 1.0)
     - GEOCODING_CACHE_FILE: Cache file path (default: data/cache/geocoding_cache.json)
     - GEOCODING_CACHE_TTL_DAYS: Cache TTL in days (default: 30)
+    - GEOCODING_BREAKER_FAILURE_THRESHOLD: Consecutive failures before a provider is skipped (default: 3)
+    - GEOCODING_BREAKER_RESET_SECONDS: Seconds before a skipped provider is retried (default: 300)
+    - WALKING_GRAPH_FILE: OSM extract used for walking distance/time (optional)
+    - WALKING_SPEED_KMH: Walking speed used for walking time (default: 4.8)
+    - WALKING_MAX_SNAP_DISTANCE_M: Max distance from a point to the street graph (default: 250)
+    - TRANSIT_GTFS_FILE: GTFS feed used for public-transport commute time (optional)
+    - TRANSIT_WEEKDAY / TRANSIT_ARRIVAL_TIME: Commute day and arrival deadline (default: tuesday 09:00)
+    - TRANSIT_DATE: Timetable service date, YYYY-MM-DD (default: the next TRANSIT_WEEKDAY)
+    - GEOCODING_BATCH_SIZE: Geocode items in windows of this size; 0 geocodes per item (default: 0)
+    - GEOCODING_BATCH_TIMEOUT: Seconds before a partial window is flushed (default: 5)
+    - GEOCODING_BATCH_WORKERS: Parallel lookups per window (default: 4)
+    - GEOCODING_PREFETCH_ENABLED: Geocode search card addresses ahead of detail pages (default: true)
+    - GEOCODING_PREFETCH_WORKERS: Background prefetch threads (default: 1)
     """
 
     def __init__(self):
@@ -188,54 +456,249 @@ class DistanceCalculationPipeline:
         self.destination_coords = None
         self.destination = os.getenv('DESTINATION')
         self.geocoding_disabled = False
+        self.walking_router = None
+        self.commute_profile = None
+        # shared.acquire keys, for shared.release at close
+        self._geocoding_key = None
+        self._walking_key = None
+        self._commute_key = None
+        self.batch_size = settings.GEOCODING_BATCH_SIZE
+        self._window = []
+        self._flush_loop = None
+        self.prefetcher = None
+        self._ready = None
+        self.stats = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = cls()
+        pipeline.stats = crawler.stats
+        crawler.signals.connect(pipeline.card_address_found, signal=card_address_found)
+        return pipeline
 
     def open_spider(self, spider):
         if not self.destination:
             spider.logger.warning("DESTINATION environment variable not set. Distance calculation disabled.")
             return
 
+        from propertypal_scraper.geocoding import GeocodingPrefetcher, GeocodingService
+
+        self._geocoding_key = ('geocoding', settings.GEOCODING_CACHE_FILE, tuple(settings.GEOCODING_PROVIDERS))
         try:
-            self.geocoding_service = GeocodingService(
-                providers=settings.GEOCODING_PROVIDERS,
-                max_retries=settings.GEOCODING_MAX_RETRIES,
-                base_delay=settings.GEOCODING_BASE_DELAY,
-                cache_file=settings.GEOCODING_CACHE_FILE,
-                cache_ttl_days=settings.GEOCODING_CACHE_TTL_DAYS
+            # Kept warm (cache, provider health) across crawls in the scheduler daemon
+            self.geocoding_service = shared.acquire(
+                self._geocoding_key,
+                lambda: GeocodingService(
+                    providers=settings.GEOCODING_PROVIDERS,
+                    max_retries=settings.GEOCODING_MAX_RETRIES,
+                    base_delay=settings.GEOCODING_BASE_DELAY,
+                    cache_file=settings.GEOCODING_CACHE_FILE,
+                    cache_ttl_days=settings.GEOCODING_CACHE_TTL_DAYS,
+                    breaker_failure_threshold=settings.GEOCODING_BREAKER_FAILURE_THRESHOLD,
+                    breaker_reset_timeout=settings.GEOCODING_BREAKER_RESET_SECONDS,
+                    stats_window=settings.GEOCODING_STATS_WINDOW
+                ),
+                close=self._close_geocoding_service
             )
-
-            spider.logger.info(f"Geocoding destination: {self.destination}")
-            self.destination_coords = self.geocoding_service.geocode(self.destination)
-
-            if self.destination_coords:
-                spider.logger.info(f"Destination coordinates: {self.destination_coords}")
-            else:
-                spider.logger.warning(f"Could not geocode destination: {self.destination}. Distance calculation disabled.")
-                self.geocoding_disabled = True
-
         except ValueError as e:
             spider.logger.error(f"No geocoding providers available: {e}")
             self.geocoding_disabled = True
+            return
         except Exception as e:
             spider.logger.error(f"Error initializing geocoding service: {e}")
             self.geocoding_disabled = True
+            return
 
-    def process_item(self, item, spider):
+        if settings.GEOCODING_PREFETCH_ENABLED and self.geocoding_service.cache:
+            self.prefetcher = GeocodingPrefetcher(
+                self.geocoding_service,
+                max_workers=settings.GEOCODING_PREFETCH_WORKERS
+            )
+        if self.batch_size:
+            spider.logger.info(f"Batch geocoding enabled (window: {self.batch_size} items)")
+            self._flush_loop = task.LoopingCall(self._flush_window, spider)
+            self._flush_loop.start(settings.GEOCODING_BATCH_TIMEOUT, now=False)
+
+        self._ready = threads.deferToThread(self._prepare_destination, spider)
+
+    def _prepare_destination(self, spider):
+        """Geocode the destination and load its walking/commute data (worker thread)."""
+        started = time.monotonic()
+        try:
+            spider.logger.info(f"Geocoding destination: {self.destination}")
+            coords = self.geocoding_service.geocode(self.destination)
+            if not coords:
+                spider.logger.warning(f"Could not geocode destination: {self.destination}. Distance calculation disabled.")
+                self.geocoding_disabled = True
+                return
+
+            spider.logger.info(f"Destination coordinates: {coords}")
+            self.destination_coords = coords
+            self._walking_key = ('walking_router', settings.WALKING_GRAPH_FILE, self.destination)
+            self.walking_router = shared.acquire(self._walking_key, lambda: self._load_walking_router(spider))
+            service_date = self._transit_service_date()
+            self._commute_key = (
+                'commute_profile', settings.TRANSIT_GTFS_FILE, self.destination,
+                service_date, settings.TRANSIT_ARRIVAL_TIME
+            )
+            self.commute_profile = shared.acquire(
+                self._commute_key, lambda: self._load_commute_profile(spider, service_date)
+            )
+        except Exception as e:
+            spider.logger.error(f"Error geocoding destination: {e}")
+            self.geocoding_disabled = True
+        finally:
+            if self.stats:
+                self.stats.set_value('startup/destination_seconds', round(time.monotonic() - started, 3))
+
+    def _load_walking_router(self, spider):
+        """Load the walking graph and precompute distances from the destination."""
+        if not settings.WALKING_GRAPH_FILE:
+            return None
+
+        from propertypal_scraper.routing import WalkingRouter
+
+        try:
+            walking_router = WalkingRouter.from_osm(
+                settings.WALKING_GRAPH_FILE,
+                walking_speed_kmh=settings.WALKING_SPEED_KMH,
+                max_snap_distance_m=settings.WALKING_MAX_SNAP_DISTANCE_M
+            )
+            if not walking_router.add_destination(self.destination, self.destination_coords):
+                spider.logger.warning("Destination is off the walking graph. Walking routing disabled.")
+                return None
+            return walking_router
+        except Exception as e:
+            spider.logger.error(f"Error loading walking graph {settings.WALKING_GRAPH_FILE}: {e}")
+            return None
+
+    @staticmethod
+    def _transit_service_date():
+        """TRANSIT_DATE, or the next TRANSIT_WEEKDAY (a daemon's later crawls move on to later dates)."""
+        if not settings.TRANSIT_GTFS_FILE:
+            return None
+
+        from propertypal_scraper.transit import next_service_date
+
+        if settings.TRANSIT_DATE:
+            return date.fromisoformat(settings.TRANSIT_DATE)
+        return next_service_date(settings.TRANSIT_WEEKDAY)
+
+    def _load_commute_profile(self, spider, service_date):
+        """Load the GTFS feed and build the reverse commute profile for the destination."""
+        if not settings.TRANSIT_GTFS_FILE:
+            return None
+
+        from propertypal_scraper.transit import CommuteProfile, TransitNetwork, parse_clock_time
+
+        try:
+            arrival_time = parse_clock_time(settings.TRANSIT_ARRIVAL_TIME)
+            window_start = arrival_time - settings.TRANSIT_MAX_COMMUTE_MINUTES * 60
+            network = TransitNetwork.from_gtfs(
+                settings.TRANSIT_GTFS_FILE,
+                service_date=service_date,
+                window=(window_start, arrival_time),
+                walking_speed_kmh=settings.WALKING_SPEED_KMH
+            )
+            commute_profile = CommuteProfile(
+                network,
+                self.destination_coords,
+                arrival_time,
+                max_walk_m=settings.TRANSIT_MAX_WALK_M,
+                walking_speed_kmh=settings.WALKING_SPEED_KMH,
+                min_transfer_seconds=settings.TRANSIT_MIN_TRANSFER_MINUTES * 60
+            )
+            spider.logger.info(
+                f"Commute profile ready for {service_date.strftime('%A %Y-%m-%d')} arriving {settings.TRANSIT_ARRIVAL_TIME}"
+            )
+            return commute_profile
+        except Exception as e:
+            spider.logger.error(f"Error loading GTFS feed {settings.TRANSIT_GTFS_FILE}: {e}")
+            return None
+
+    async def close_spider(self, spider):
+        if self._flush_loop and self._flush_loop.running:
+            self._flush_loop.stop()
+        self._flush_window(spider)
+        if self._ready is not None and not self._ready.called:
+            # Closed before the destination finished loading (e.g. nothing to crawl)
+            await maybe_deferred_to_future(self._ready)
+
+        if self.geocoding_service:
+            for provider, health in self.geocoding_service.provider_health().items():
+                if self.stats:
+                    for key, value in health.items():
+                        if value is not None:
+                            self.stats.set_value(f'geocoding/providers/{provider}/{key}', value)
+                spider.logger.info(f"Geocoding provider {provider}: {health}")
+
+        if self.prefetcher:
+            self.prefetcher.shutdown()
+            if self.stats:
+                hits = self.stats.get_value('geocoding/prefetch/hits', 0)
+                misses = self.stats.get_value('geocoding/prefetch/misses', 0)
+                if hits + misses:
+                    self.stats.set_value('geocoding/prefetch/hit_rate', round(hits / (hits + misses), 3))
+                    spider.logger.info(
+                        f"Geocoding prefetch: {hits}/{hits + misses} hits, "
+                        f"{self.stats.get_value('geocoding/prefetch/time_saved_seconds', 0):.1f}s saved"
+                    )
+
+        # Kept open for the next crawl while sharing is on; otherwise closed or dropped here
+        shared.release(self._commute_key, self.commute_profile, lambda profile: None)
+        shared.release(self._walking_key, self.walking_router, lambda router: None)
+        shared.release(self._geocoding_key, self.geocoding_service, self._close_geocoding_service)
+        self.commute_profile = self.walking_router = self.geocoding_service = None
+
+    @staticmethod
+    def _close_geocoding_service(service):
+        if service.cache:
+            service.cache.save()
+
+    def card_address_found(self, spider, property_id, address):
+        """Start geocoding a search card's address in the background."""
+        if not self.prefetcher or self.geocoding_disabled:
+            return
+        if self.geocoding_service.cache.get(address) is not None:
+            self.stats.inc_value('geocoding/prefetch/already_cached')
+            return
+        if self.prefetcher.submit(property_id, address):
+            self.stats.inc_value('geocoding/prefetch/submitted')
+
+    async def process_item(self, item, spider):
+        if self._ready is not None and not self._ready.called:
+            await maybe_deferred_to_future(self._ready)
         if not self.destination_coords or not self.geocoding_service or self.geocoding_disabled:
             return item
 
         adapter = ItemAdapter(item)
         location = adapter.get('location')
 
+        reused = adapter.get('latitude'), adapter.get('longitude')
+        if None not in reused:
+            # Coordinates reused from the original listing of a relisted property
+            self._add_distances(adapter, reused)
+            return item
+
         if not location:
             spider.logger.warning(f"No location found for property {adapter.get('property_id')}")
             return item
 
         try:
-            distance = self.geocoding_service.calculate_distance(location, self.destination_coords)
-
-            if distance is not None:
-                adapter['distance_to_destination'] = distance
-                spider.logger.debug(f"Calculated distance for {location}: {distance} km")
+            coords = None
+            if self.prefetcher:
+                coords = await self._use_prefetch(adapter.get('property_id'))
+
+            if coords is None:
+                if self.batch_size:
+                    coords = await maybe_deferred_to_future(self._enqueue(location, spider))
+                else:
+                    coords = self.geocoding_service.geocode(location)
+
+            if coords is not None:
+                adapter['latitude'], adapter['longitude'] = coords
+                self._add_distances(adapter, coords)
+                spider.logger.debug(f"Calculated distance for {location}: {adapter['distance_to_destination']} km")
             else:
                 spider.logger.debug(f"Could not geocode property location: {location}")
                 adapter['distance_to_destination'] = None
@@ -246,56 +709,303 @@ class DistanceCalculationPipeline:
 
         return item
 
+    async def _use_prefetch(self, property_id):
+        """Coordinates of this item's search card address, if it was prefetched.
+
+        They are used for this item only: the card address keeps its own
+        cache entry, and the detail page's location isn't cached under it.
+        """
+        future = self.prefetcher.pop(property_id)
+        if future is None:
+            self.stats.inc_value('geocoding/prefetch/misses')
+            return None
+
+        waited = 0.0
+        if not future.done():
+            # Already in flight - finishing it is cheaper than starting over
+            started = time.monotonic()
+            await maybe_deferred_to_future(threads.deferToThread(future.result))
+            waited = time.monotonic() - started
+
+        coords, seconds_taken = future.result()
+        if coords is None:
+            self.stats.inc_value('geocoding/prefetch/misses')
+            return None
+
+        self.stats.inc_value('geocoding/prefetch/hits')
+        self.stats.inc_value('geocoding/prefetch/time_saved_seconds', round(max(seconds_taken - waited, 0.0), 3))
+        return coords
+
+    def _enqueue(self, location, spider):
+        """Add a location to the current window; fires with its coordinates once resolved."""
+        d = Deferred()
+        self._window.append((location, d))
+        if len(self._window) >= self.batch_size:
+            self._flush_window(spider)
+        return d
+
+    def _flush_window(self, spider):
+        """Geocode every location in the window at once, off the reactor thread."""
+        if not self._window:
+            return
+        window, self._window = self._window, []
+
+        def resolved(coords_by_location):
+            for location, d in window:
+                d.callback(coords_by_location.get(location))
+
+        def failed(failure):
+            spider.logger.error(f"Batch geocoding failed: {failure.value}")
+            for _, d in window:
+                d.callback(None)
+
+        spider.logger.debug(f"Flushing geocoding window of {len(window)} items")
+        dfd = threads.deferToThread(
+            self.geocoding_service.geocode_many,
+            [location for location, _ in window],
+            settings.GEOCODING_BATCH_WORKERS
+        )
+        dfd.addCallbacks(resolved, failed)
+
+    def _add_distances(self, adapter, coords):
+        """Fill straight-line, walking and commute distances to the destination."""
+        adapter['distance_to_destination'] = self.geocoding_service.distance_between(coords, self.destination_coords)
+        self._add_walking_route(adapter, coords)
+        if self.commute_profile:
+            adapter['commute_minutes'] = self.commute_profile.commute_minutes(coords)
+
+    def _add_walking_route(self, adapter, coords):
+        """Fill walking distance/time from the precomputed destination tree."""
+        if not self.walking_router:
+            return
+
+        walking_m = self.walking_router.walking_distance(self.destination, coords)
+        if walking_m is None:
+            adapter['walking_distance_km'] = None
+            adapter['walking_minutes'] = None
+            return
+
+        adapter['walking_distance_km'] = round(walking_m / 1000, 2)
+        adapter['walking_minutes'] = round(self.walking_router.walking_minutes(walking_m), 1)
+
+
+class ExportPipeline:
+    """Export items to every output file from a background writer thread
+
+    Each item is converted to a plain dict once (datetimes as ISO strings) and
+    queued for the export thread, which writes batches to each sink:
+
+    - json: data/raw/properties_{search}_{timestamp}.jsonl[.gz|.zst]
+    - csv: data/processed/properties_{search}_{timestamp}.csv
+    - ratings: data/ratings/perplexity_ratings_{search}_{timestamp}.json (rated items only)
+    - parquet: data/parquet/scrape_date=.../search=.../properties_{timestamp}.parquet
+      (requires pyarrow)
+
+    A resumable job (spider argument ``job``) uses the job id instead of the
+    timestamp and appends to the files of its earlier runs. Every
+    CHECKPOINT_INTERVAL seconds the files are flushed to disk and their sizes
+    committed to the job checkpoint along with the pages whose items they
+    hold; a restarted job cuts the files back to those sizes. Parquet files
+    can't be appended to, so each checkpoint finishes them and starts new ones.
+
+    A shard of a sharded search (spider argument ``shard``) adds
+    ``_shard-<shard>`` to its file names; sharding.py merges them. A worker
+    of a distributed crawl (FRONTIER) adds its worker id.
+
+    Configure via environment variables:
+    - EXPORT_SINKS: Comma-separated sinks to enable (default: json,csv,ratings,parquet)
+    - EXPORT_QUEUE_SIZE: Max items waiting for the writer thread (default: 1000)
+    - EXPORT_BATCH_SIZE: Items per batch write (default: 100)
+    - EXPORT_BATCH_INTERVAL: Max seconds before a partial batch is written (default: 1)
+    - JSON_EXPORT_* / PARQUET_*: Per-sink options, see settings.py
+    - CHECKPOINT_INTERVAL: Seconds between job checkpoints (default: 60)
+    """
 
-class CSVPipeline:
-    """Export items to CSV file with timestamp"""
+    def __init__(self):
+        self.exporter = None
+        self.stats = None
+        self.crawler = None
+        self.checkpoint = None
+        self.checkpoint_loop = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = cls()
+        pipeline.stats = crawler.stats
+        pipeline.crawler = crawler
+        return pipeline
 
     def open_spider(self, spider):
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        self.filename = f'data/processed/properties_{timestamp}.csv'
+        self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.checkpoint = getattr(spider, 'checkpoint', None)
+        self.offsets = {}
+        # Searches running at the same time (--parallel, daemon) must not share files
+        if self.checkpoint is not None:
+            self.name = f"{getattr(spider, 'search_slug', 'search')}_{self.checkpoint.job}"
+            self.offsets = self.checkpoint.get('exports', {})
+            # Finished pages are committed with the export offsets that contain their items
+            self.checkpoint.autocommit = False
+        else:
+            self.name = f"{getattr(spider, 'search_slug', 'search')}_{self.timestamp}"
+        self.suffix = f"_shard-{spider.shard}" if getattr(spider, 'shard', None) else ''
+        if settings.FRONTIER:
+            # Every worker of a distributed crawl exports the listings it crawled
+            self.suffix += f"_{slugify(settings.FRONTIER_WORKER_ID)}"
+        self.name += self.suffix
+
+        sinks = []
+        for name in settings.EXPORT_SINKS:
+            build = getattr(self, f'_build_{name}_sink', None)
+            if build is None:
+                spider.logger.warning(f"Unknown export sink: {name}")
+                continue
+            sink = build(spider)
+            if sink:
+                sinks.append(sink)
+
+        self.exporter = BackgroundExporter(
+            sinks,
+            queue_size=settings.EXPORT_QUEUE_SIZE,
+            batch_size=settings.EXPORT_BATCH_SIZE,
+            batch_interval=settings.EXPORT_BATCH_INTERVAL
+        )
+        spider.logger.info(f"Export sinks: {', '.join(sink.name for sink in sinks) or 'none'}")
+
+        if self.checkpoint is not None:
+            self.checkpoint_loop = task.LoopingCall(lambda: deferred_from_coro(self.save_checkpoint(spider)))
+            self.checkpoint_loop.start(settings.CHECKPOINT_INTERVAL, now=False)
+
+    async def save_checkpoint(self, spider):
+        """Flush every sink and commit the offsets with the pages finished before the flush."""
+        completed = self.checkpoint.take_completed()
+        offsets = await maybe_deferred_to_future(threads.deferToThread(self.exporter.checkpoint))
+        self.checkpoint.commit(completed, offsets)
+        if self.stats:
+            self.stats.inc_value('checkpoint/saves')
+        spider.logger.debug(f"Checkpoint saved: {len(completed)} pages, exports {offsets}")
+        await maybe_deferred_to_future(self.crawler.signals.send_catch_log_deferred(
+            signal=job_checkpoint, spider=spider, checkpoint=self.checkpoint
+        ))
+
+    async def close_spider(self, spider):
+        if self.checkpoint_loop is not None:
+            if self.checkpoint_loop.running:
+                self.checkpoint_loop.stop()
+            await self.save_checkpoint(spider)
+        await maybe_deferred_to_future(threads.deferToThread(self.exporter.close))
+
+        for path in self.exporter.paths:
+            spider.logger.info(f"Output saved to: {path}")
+        for name, error in self.exporter.failed.items():
+            spider.logger.error(f"Export sink '{name}' failed: {error}")
+
+        if self.stats:
+            self.stats.set_value('export/items', self.exporter.count)
+            self.stats.set_value('export/batches', self.exporter.batches)
+            self.stats.set_value('export/queue_max_depth', self.exporter.max_depth)
+            self.stats.set_value('export/blocked_seconds', round(self.exporter.blocked_seconds, 3))
+
+    async def process_item(self, item, spider):
+        waiting = self.exporter.submit(normalize_record(ItemAdapter(item)))
+        if waiting is not None:
+            # Export queue full: hold this item until the writer thread catches up
+            await maybe_deferred_to_future(waiting)
+        return item
 
-        # Ensure directory exists
-        os.makedirs('data/processed', exist_ok=True)
+    def _build_json_sink(self, spider):
+        base_filename = f'data/raw/properties_{self.name}.jsonl'
+        writer_kwargs = dict(
+            flush_interval=settings.JSON_EXPORT_FLUSH_INTERVAL,
+            fields=settings.JSON_EXPORT_FIELDS,
+            exclude=settings.JSON_EXPORT_EXCLUDE_FIELDS
+        )
+        if self.checkpoint is not None:
+            writer_kwargs['resume_offset'] = self.offsets.get('json', 0)
+        try:
+            writer = JsonLinesWriter(
+                base_filename, compression=settings.JSON_EXPORT_COMPRESSION, **writer_kwargs
+            )
+        except ValueError as e:
+            spider.logger.warning(f"{e}. Writing uncompressed JSON Lines instead.")
+            writer = JsonLinesWriter(base_filename, **writer_kwargs)
+        return JsonLinesSink(writer)
 
-        self.file = open(self.filename, 'w', newline='', encoding='utf-8')
+    def _build_csv_sink(self, spider):
+        return CsvSink(f'data/processed/properties_{self.name}.csv', resume_offset=self.offsets.get('csv'))
 
-        # Define CSV columns
-        self.fieldnames = [
-            'property_id', 'url', 'scraped_at', 'price', 'currency', 'location',
-            'property_type', 'bedrooms', 'bathrooms', 'receptions', 'description',
-            'calculated_monthly_payment', 'perplexity_rating', 'perplexity_analysis',
-            'distance_to_destination', 'listing_status'
-        ]
+    def _build_ratings_sink(self, spider):
+        if not getattr(spider, 'use_perplexity', False):
+            return None
+        return RatingsSink(
+            f'data/ratings/perplexity_ratings_{self.name}.json', resume_offset=self.offsets.get('ratings')
+        )
+
+    def _build_parquet_sink(self, spider):
+        if not settings.PARQUET_EXPORT_ENABLED:
+            return None
+        search = getattr(spider, 'search_slug', 'search')
+        segments = itertools.count(1)
+
+        def new_writer():
+            name = f'properties_{self.timestamp}{self.suffix}'
+            if self.checkpoint is not None:
+                # One file per checkpoint: job id, start of this run, segment
+                name = f'properties_{self.checkpoint.job}_{self.timestamp}_{next(segments):03d}'
+            return ParquetPartitionWriter(
+                settings.PARQUET_EXPORT_DIR,
+                search=search,
+                name=name,
+                batch_size=settings.PARQUET_BATCH_SIZE,
+                compression=settings.PARQUET_COMPRESSION
+            )
 
-        self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames, extrasaction='ignore')
-        self.writer.writeheader()
-        spider.logger.info(f"Opened CSV export file: {self.filename}")
+        try:
+            writer = new_writer()
+        except ImportError:
+            spider.logger.info("Parquet export disabled: pyarrow is not installed (pip install pyarrow)")
+            return None
+        if self.checkpoint is None:
+            return ParquetSink(writer)
 
-    def close_spider(self, spider):
-        self.file.close()
-        spider.logger.info(f"Closed CSV export file: {self.filename}")
-        spider.logger.info(f"CSV output saved to: {self.filename}")
+        # Files a crashed run of this job never finished
+        for path in glob.glob(os.path.join(
+            settings.PARQUET_EXPORT_DIR, 'scrape_date=*', f'search={search}',
+            f'properties_{self.checkpoint.job}_*.parquet.part'
+        )):
+            os.remove(path)
+        return ParquetSink(writer, new_writer=new_writer)
 
-    def process_item(self, item, spider):
-        adapter = ItemAdapter(item)
-        row = {}
 
-        for field in self.fieldnames:
-            value = adapter.get(field)
+class HistoryStorePipeline:
+    """Upsert every item into the SQLite property history store
 
-            # Handle list fields - convert to comma-separated string
-            if isinstance(value, list):
-                value = ', '.join(str(v) for v in value)
+    Keeps the latest state of each property_id across runs and appends a
+    price_history row whenever the price or listing status changes.
 
-            # Handle datetime
-            elif isinstance(value, datetime):
-                value = value.isoformat()
+    Configure via environment variables:
+    - HISTORY_ENABLED: Enable the history store (default: true)
+    - HISTORY_DB_FILE: Database file (default: data/history/properties.db)
+    - HISTORY_COMMIT_INTERVAL: Items per transaction (default: 100)
+    """
 
-            # Handle None
-            elif value is None:
-                value = ''
+    def open_spider(self, spider):
+        self.store = None
+        self.changes = 0
+        if not settings.HISTORY_ENABLED:
+            return
+
+        self.store = PropertyHistoryStore(
+            settings.HISTORY_DB_FILE, commit_interval=settings.HISTORY_COMMIT_INTERVAL
+        )
+        spider.logger.info(f"Property history store: {settings.HISTORY_DB_FILE}")
 
-            row[field] = value
+    def close_spider(self, spider):
+        if self.store:
+            self.store.close()
+            spider.logger.info(f"History store updated: {self.changes} new or changed listings")
 
-        self.writer.writerow(row)
+    def process_item(self, item, spider):
+        if self.store:
+            if self.store.upsert(ItemAdapter(item), search=getattr(spider, 'search_slug', None)):
+                self.changes += 1
         return item
@@ -0,0 +1,330 @@
+"""Per-stage pipeline timing and a whole-crawl sampling profiler.
+
+ProfilingItemPipelineManager replaces Scrapy's item pipeline manager
+(ITEM_PROCESSOR) and wraps every pipeline in a TimedStage, which times its
+``process_item``: wall time from call to result, and CPU time spent in the
+stage's own code (async stages are only charged for the steps they run, not
+for other work done while they wait). Per stage it adds to the crawl stats:
+
+    pipeline/<Stage>/items, dropped, errors
+    pipeline/<Stage>/wall_seconds, cpu_seconds
+    pipeline/<Stage>/wall_ms_p50, wall_ms_p95, wall_ms_max, cpu_ms_p95
+    pipeline/<Stage>/wall_ms_histogram, cpu_ms_histogram  ({"<=1": n, ...})
+
+SamplingProfiler (PROFILER_ENABLED=true) samples the stack of every thread
+every PROFILER_INTERVAL_MS and writes them in folded format
+(``thread;module:function;... count``) when the crawl closes, ready for
+flamegraph.pl or speedscope:
+
+    flamegraph.pl data/profiles/belfast_20260301_090000.folded > flame.svg
+
+StartupTimer reports how long a crawl takes to get going, from process start
+(or crawler creation, for later crawls in the same process) to each of:
+
+    startup/crawler_seconds         settings loaded, spider and extensions ready
+    startup/spider_opened_seconds   middlewares and pipelines created and opened
+    startup/first_request_seconds   first request scheduled
+    startup/first_response_seconds  first response downloaded
+"""
+
+import bisect
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from scrapy import signals
+from scrapy.exceptions import DropItem, NotConfigured
+from scrapy.pipelines import ItemPipelineManager
+from scrapy.utils.defer import ensure_awaitable
+from scrapy.utils.deprecate import argument_is_required
+from scrapy.utils.python import global_object_name
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Counts of durations per fixed bucket, plus total and max."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Upper bound (ms) of the bucket holding the q-th percentile; max for the open bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKETS_MS[i], self.max * 1000) if i < len(BUCKETS_MS) else self.max * 1000
+        return self.max * 1000
+
+    def as_dict(self) -> Dict[str, int]:
+        labels = [f'<={bound:g}' for bound in BUCKETS_MS] + [f'>{BUCKETS_MS[-1]:g}']
+        return {label: n for label, n in zip(labels, self.counts) if n}
+
+
+class StageProfile:
+    def __init__(self, name: str):
+        self.name = name
+        self.wall = Histogram()
+        self.cpu = Histogram()
+        self.dropped = 0
+        self.errors = 0
+
+    def record(self, wall: float, cpu: float) -> None:
+        self.wall.add(wall)
+        self.cpu.add(cpu)
+
+    def stats(self) -> Dict[str, Any]:
+        prefix = f'pipeline/{self.name}'
+        return {
+            f'{prefix}/items': self.wall.count,
+            f'{prefix}/dropped': self.dropped,
+            f'{prefix}/errors': self.errors,
+            f'{prefix}/wall_seconds': round(self.wall.total, 4),
+            f'{prefix}/cpu_seconds': round(self.cpu.total, 4),
+            f'{prefix}/wall_ms_p50': round(self.wall.percentile(0.5), 2),
+            f'{prefix}/wall_ms_p95': round(self.wall.percentile(0.95), 2),
+            f'{prefix}/wall_ms_max': round(self.wall.max * 1000, 2),
+            f'{prefix}/cpu_ms_p95': round(self.cpu.percentile(0.95), 2),
+            f'{prefix}/wall_ms_histogram': self.wall.as_dict(),
+            f'{prefix}/cpu_ms_histogram': self.cpu.as_dict(),
+        }
+
+
+class _CpuTimed:
+    """Await a coroutine, adding the thread CPU time of each of its steps to ``cpu[0]``."""
+
+    def __init__(self, coro, cpu: List[float]):
+        self.coro = coro
+        self.cpu = cpu
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            start = time.thread_time()
+            try:
+                yielded = self.coro.throw(error) if error is not None else self.coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.cpu[0] += time.thread_time() - start
+            try:
+                value, error = (yield yielded), None
+            except GeneratorExit:
+                self.coro.close()
+                raise
+            except BaseException as e:
+                value, error = None, e
+
+
+class TimedStage:
+    """Thin pipeline wrapping one stage: times its process_item, forwards everything else to it."""
+
+    def __init__(self, pipeline, profile: StageProfile, crawler):
+        self.pipeline = pipeline
+        self.profile = profile
+        self.crawler = crawler
+        self.pass_spider = argument_is_required(pipeline.process_item, 'spider')
+        self.warn = global_object_name(pipeline.process_item)
+
+    def __getattr__(self, name):
+        return getattr(self.pipeline, name)
+
+    async def process_item(self, item):
+        args = (self.crawler.spider,) if self.pass_spider else ()
+        wall_start = time.perf_counter()
+        cpu = [0.0]
+        try:
+            cpu_start = time.thread_time()
+            try:
+                result = self.pipeline.process_item(item, *args)
+            finally:
+                cpu[0] += time.thread_time() - cpu_start
+            if inspect.iscoroutine(result):
+                return await _CpuTimed(result, cpu)
+            return await ensure_awaitable(result, _warn=self.warn)
+        except DropItem:
+            self.profile.dropped += 1
+            raise
+        except Exception:
+            self.profile.errors += 1
+            raise
+        finally:
+            self.profile.record(time.perf_counter() - wall_start, cpu[0])
+
+
+class ProfilingItemPipelineManager(ItemPipelineManager):
+    """ItemPipelineManager that wraps every stage in a TimedStage (see module docstring)."""
+
+    def __init__(self, *pipelines, crawler=None):
+        self.profiles: Dict[str, StageProfile] = {}
+        super().__init__(*(self._wrap(pipeline, crawler) for pipeline in pipelines), crawler=crawler)
+
+    def _wrap(self, pipeline, crawler):
+        if not hasattr(pipeline, 'process_item'):
+            return pipeline
+        name = type(pipeline).__name__
+        return TimedStage(pipeline, self.profiles.setdefault(name, StageProfile(name)), crawler)
+
+    async def close_spider_async(self) -> None:
+        await super().close_spider_async()
+        stats = self.crawler.stats if self.crawler else None
+        if stats is None:
+            return
+        for profile in self.profiles.values():
+            for key, value in profile.stats().items():
+                stats.set_value(key, value)
+
+
+class SamplingProfiler:
+    """Sample every thread's stack for the whole crawl; write folded stacks at close
+
+    Configure via environment variables:
+    - PROFILER_ENABLED: Enable the sampling profiler (default: false)
+    - PROFILER_INTERVAL_MS: Milliseconds between samples (default: 5)
+    - PROFILER_OUTPUT_DIR: Output directory (default: data/profiles)
+    """
+
+    def __init__(self, crawler, interval: float, output_dir: str):
+        self.crawler = crawler
+        self.interval = interval
+        self.output_dir = output_dir
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        from propertypal_scraper import settings
+
+        if not settings.PROFILER_ENABLED:
+            raise NotConfigured
+        profiler = cls(crawler, settings.PROFILER_INTERVAL_MS / 1000, settings.PROFILER_OUTPUT_DIR)
+        crawler.signals.connect(profiler.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(profiler.spider_closed, signal=signals.spider_closed)
+        return profiler
+
+    def spider_opened(self, spider):
+        self.started = datetime.now()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        spider.logger.info(f"Sampling profiler started (every {self.interval * 1000:g} ms)")
+
+    def spider_closed(self, spider):
+        self._stop.set()
+        self._thread.join()
+
+        name = f"{getattr(spider, 'search_slug', spider.name)}_{self.started.strftime('%Y%m%d_%H%M%S')}"
+        path = os.path.join(self.output_dir, f'{name}.folded')
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+        self.crawler.stats.set_value('profiler/samples', self.samples)
+        spider.logger.info(f"Profile saved to: {path} ({self.samples} samples, {len(self.stacks)} stacks)")
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self.stacks[self._fold(names.get(ident, str(ident)), frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _fold(thread_name: str, frame) -> str:
+        """Root-first ``thread;module:function;...`` (';' and spaces would break the format)."""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            module = frame.f_globals.get('__name__', os.path.basename(code.co_filename))
+            names.append(f'{module}:{code.co_name}'.replace(';', ':').replace(' ', '_'))
+            frame = frame.f_back
+        names.append(thread_name.replace(';', ':').replace(' ', '_'))
+        return ';'.join(reversed(names))
+
+
+def process_started_at() -> Optional[float]:
+    """Unix time the current process started (Linux /proc), or None."""
+    try:
+        with open('/proc/self/stat', 'r') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime', 'r') as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - (uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupTimer:
+    """Time from process start to the first request and response (see module docstring)
+
+    Logs a one-line summary once the first response arrives, along with the
+    pipeline stages that were left out because they are switched off.
+    """
+
+    _first_crawl = True
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        now = time.time()
+        origin = process_started_at() if StartupTimer._first_crawl else None
+        # A daemon's later crawls start from their crawler, not the process
+        StartupTimer._first_crawl = False
+        self.origin = origin if origin is not None and origin <= now else now
+        self.marks: Dict[str, float] = {'crawler': now - self.origin}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        timer = cls(crawler)
+        crawler.signals.connect(timer.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(timer.request_scheduled, signal=signals.request_scheduled)
+        crawler.signals.connect(timer.response_received, signal=signals.response_received)
+        return timer
+
+    def _mark(self, name: str) -> None:
+        self.marks[name] = time.time() - self.origin
+        for mark, seconds in self.marks.items():
+            self.crawler.stats.set_value(f'startup/{mark}_seconds', round(seconds, 3))
+
+    def spider_opened(self, spider):
+        self._mark('spider_opened')
+        from propertypal_scraper import settings
+
+        if settings.DISABLED_PIPELINES:
+            names = ', '.join(path.rsplit('.', 1)[-1] for path in settings.DISABLED_PIPELINES)
+            spider.logger.info(f"Pipeline stages switched off (not loaded): {names}")
+
+    def request_scheduled(self, request, spider):
+        self.crawler.signals.disconnect(self.request_scheduled, signal=signals.request_scheduled)
+        self._mark('first_request')
+
+    def response_received(self, response, request, spider):
+        self.crawler.signals.disconnect(self.response_received, signal=signals.response_received)
+        self._mark('first_response')
+        spider.logger.info(
+            f"Startup: first request after {self.marks.get('first_request', 0):.2f}s "
+            f"(crawler ready {self.marks['crawler']:.2f}s, spider opened {self.marks.get('spider_opened', 0):.2f}s), "
+            f"first response after {self.marks['first_response']:.2f}s"
+        )
@@ -0,0 +1,260 @@
+"""Near-duplicate detection for listings relisted under a new property_id.
+
+When a house is relisted (new agent, withdrawn and re-added) it gets a new
+property_id, so exact-ID deduplication misses it. Its description and
+features barely change, though. Each listing's text is reduced to word
+shingles and a MinHash signature. Signatures are split into LSH bands and
+bucketed per postcode district, so candidate matches are the handful of
+listings sharing a band bucket, not every listing ever seen. A match links the
+new listing to the canonical (first) listing of the house, whose rating and
+geocoding results can then be reused.
+
+Usage:
+    python -m propertypal_scraper.relisting --groups
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from propertypal_scraper.exporters import json_default
+from propertypal_scraper.utils import parse_postcode, to_int
+
+# Enrichment copied from the canonical listing to its relistings. Distances
+# depend on DESTINATION, so they are recomputed from the reused coordinates.
+REUSED_FIELDS = ['perplexity_rating', 'perplexity_analysis', 'latitude', 'longitude']
+
+# Mersenne prime 2^31 - 1 keeps (a * x + b) inside uint64
+_PRIME = (1 << 31) - 1
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    property_id TEXT PRIMARY KEY,
+    district TEXT,
+    postcode TEXT,
+    bedrooms INTEGER,
+    signature BLOB NOT NULL,
+    canonical_id TEXT,
+    similarity REAL,
+    first_seen TEXT NOT NULL,
+    enrichment TEXT
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    district TEXT,
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    property_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_buckets ON buckets (district, band, bucket);
+CREATE INDEX IF NOT EXISTS idx_signatures_canonical ON signatures (canonical_id);
+"""
+
+
+def listing_text(record: Mapping[str, Any]) -> str:
+    """Description plus features: the part of a listing that survives a relist."""
+    features = record.get('features') or []
+    return ' '.join([record.get('description') or '', *features])
+
+
+def shingles(text: str, size: int = 4) -> np.ndarray:
+    """CRC32 of every ``size``-word shingle of ``text`` (lowercased, punctuation dropped)."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return np.empty(0, dtype=np.uint64)
+    hashes = {zlib.crc32(' '.join(words[i:i + size]).encode('utf-8')) for i in range(len(words) - size + 1)}
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """(bands, rows) minimising the false positive plus false negative probability mass.
+
+    A pair with similarity s shares at least one band with probability
+    1 - (1 - s^rows)^bands; false positives are that curve below ``threshold``
+    and false negatives its complement above it.
+    """
+    below = np.linspace(0.0, threshold, 200)
+    above = np.linspace(threshold, 1.0, 200)
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        false_positive = np.mean(1 - (1 - below ** rows) ** bands) * threshold
+        false_negative = np.mean((1 - above ** rows) ** bands) * (1 - threshold)
+        error = false_positive + false_negative
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    """MinHash signatures with ``num_perm`` universal hash functions."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        values = hashes[:, None] % _PRIME
+        return ((values * self.a + self.b) % _PRIME).min(axis=0).astype(np.uint32)
+
+
+class RelistingIndex:
+    """MinHash signatures and LSH buckets of every listing seen, in SQLite."""
+
+    def __init__(
+        self,
+        path: str,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 4,
+        min_shingles: int = 10,
+        commit_interval: int = 100
+    ):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.min_shingles = min_shingles
+        self.commit_interval = commit_interval
+        self.pending = 0
+        self.hasher = MinHasher(num_perm)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def _band_buckets(self, signature: np.ndarray) -> List[Tuple[int, int]]:
+        rows = self.rows
+        return [
+            (band, zlib.crc32(signature[band * rows:(band + 1) * rows].tobytes()))
+            for band in range(self.bands)
+        ]
+
+    def _candidates(self, district: str, buckets: List[Tuple[int, int]]) -> List[Tuple[str, str, int, bytes, str]]:
+        pairs = ','.join('(?, ?)' for _ in buckets)
+        params = [value for pair in buckets for value in pair]
+        return self.conn.execute(
+            'SELECT property_id, postcode, bedrooms, signature, canonical_id FROM signatures WHERE property_id IN ('
+            f'SELECT property_id FROM buckets WHERE district = ? AND (band, bucket) IN (VALUES {pairs}))',
+            [district, *params]
+        ).fetchall()
+
+    def link(self, property_id: str, record: Mapping[str, Any]) -> Optional[Tuple[str, float]]:
+        """Index a listing; returns ``(canonical_id, similarity)`` if it relists an earlier one.
+
+        Candidates must be in the same postcode district and, where both are
+        known, have the same full postcode and bedroom count (new-build sites
+        share descriptions). Listings without a district or with too little
+        text are never linked. A listing already in the index keeps its first
+        link.
+        """
+        row = self.conn.execute(
+            'SELECT canonical_id, similarity FROM signatures WHERE property_id = ?', (property_id,)
+        ).fetchone()
+        if row is not None:
+            return (row[0], row[1]) if row[0] else None
+
+        district, postcode = parse_postcode(record.get('location'))
+        bedrooms = to_int(record.get('bedrooms'))
+        hashes = shingles(listing_text(record), self.shingle_size)
+        if not district or len(hashes) < self.min_shingles:
+            return None
+
+        signature = self.hasher.signature(hashes)
+        buckets = self._band_buckets(signature)
+
+        best = None
+        for candidate_id, candidate_postcode, candidate_bedrooms, blob, canonical_id in self._candidates(district, buckets):
+            if postcode and candidate_postcode and postcode != candidate_postcode:
+                continue
+            if bedrooms and candidate_bedrooms and bedrooms != candidate_bedrooms:
+                continue
+            similarity = float(np.mean(np.frombuffer(blob, dtype=np.uint32) == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (canonical_id or candidate_id, similarity)
+
+        self.conn.execute(
+            'INSERT INTO signatures '
+            '(property_id, district, postcode, bedrooms, signature, canonical_id, similarity, first_seen) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (property_id, district, postcode, bedrooms, signature.tobytes(), best[0] if best else None,
+             round(best[1], 3) if best else None, datetime.now().isoformat())
+        )
+        self.conn.executemany(
+            'INSERT INTO buckets (district, band, bucket, property_id) VALUES (?, ?, ?, ?)',
+            [(district, band, bucket, property_id) for band, bucket in buckets]
+        )
+        self._written()
+        return best
+
+    def enrichment(self, property_id: str) -> Dict[str, Any]:
+        """Stored rating/geocoding results of a listing (empty if none)."""
+        row = self.conn.execute('SELECT enrichment FROM signatures WHERE property_id = ?', (property_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else {}
+
+    def save_enrichment(self, property_id: str, values: Dict[str, Any]) -> None:
+        self.conn.execute(
+            'UPDATE signatures SET enrichment = ? WHERE property_id = ?',
+            (json.dumps(values, ensure_ascii=False, default=json_default), property_id)
+        )
+        self._written()
+
+    def groups(self) -> Dict[str, List[Tuple[str, float]]]:
+        """canonical_id -> [(relisted property_id, similarity)]."""
+        groups: Dict[str, List[Tuple[str, float]]] = {}
+        for property_id, canonical_id, similarity in self.conn.execute(
+            'SELECT property_id, canonical_id, similarity FROM signatures '
+            'WHERE canonical_id IS NOT NULL ORDER BY canonical_id, first_seen'
+        ):
+            groups.setdefault(canonical_id, []).append((property_id, similarity))
+        return groups
+
+    def _written(self) -> None:
+        self.pending += 1
+        if self.pending >= self.commit_interval:
+            self.commit()
+
+    def commit(self) -> None:
+        self.conn.commit()
+        self.pending = 0
+
+    def close(self) -> None:
+        self.commit()
+        self.conn.close()
+
+
+def main():
+    from propertypal_scraper import settings
+
+    parser = argparse.ArgumentParser(description="Inspect detected relistings")
+    parser.add_argument('--db', default=settings.RELISTING_DB_FILE, help="Relisting index file")
+    parser.add_argument('--groups', action='store_true', help="List canonical listings and their relistings")
+    args = parser.parse_args()
+
+    index = RelistingIndex(args.db)
+    try:
+        total = index.conn.execute('SELECT COUNT(*) FROM signatures').fetchone()[0]
+        groups = index.groups()
+        if args.groups:
+            for canonical_id, relistings in groups.items():
+                linked = ', '.join(f"{pid} ({similarity:.2f})" for pid, similarity in relistings)
+                print(f"{canonical_id}: {linked}")
+        print(f"{total} listings indexed, {sum(len(g) for g in groups.values())} relistings of {len(groups)} houses")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""Walking distance/time over a locally loaded OpenStreetMap street graph.
+
+The walkable network is read once from an OSM XML extract (``.osm``,
+``.osm.gz`` or ``.osm.bz2``, e.g. exported with osmium or Overpass) into a
+compact CSR (compressed sparse row) graph. A single-source Dijkstra is run from
+each destination, so looking up the walking time for a property is a nearest
+node snap plus an array read.
+"""
+
+import bz2
+import gzip
+import heapq
+import logging
+import math
+import xml.etree.ElementTree as ET
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6371008.8
+
+# highway=* values that pedestrians can use
+WALKABLE_HIGHWAYS = {
+    'footway', 'path', 'pedestrian', 'steps', 'living_street', 'residential',
+    'service', 'unclassified', 'tertiary', 'tertiary_link', 'secondary',
+    'secondary_link', 'primary', 'primary_link', 'trunk', 'trunk_link',
+    'track', 'cycleway', 'crossing', 'corridor', 'bridleway', 'road',
+}
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in metres."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def _open_extract(path: str):
+    """Open an OSM extract, transparently handling gzip/bz2 compression."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def _is_walkable(tags: Dict[str, str]) -> bool:
+    """Check whether an OSM way can be walked along."""
+    highway = tags.get('highway')
+    if highway not in WALKABLE_HIGHWAYS:
+        return False
+    if tags.get('foot') in ('no', 'private') or tags.get('access') in ('no', 'private'):
+        return tags.get('foot') in ('yes', 'designated', 'permissive')
+    return True
+
+
+class GridIndex:
+    """Uniform lat/lon grid for nearest-point lookups.
+
+    Points are bucketed into cells of ``cell_deg`` degrees; a query scans rings
+    of cells outwards from the query cell until no closer point can exist.
+    """
+
+    def __init__(self, lats: Iterable[float], lons: Iterable[float], cell_deg: float = 0.005):
+        self.cell_deg = cell_deg
+        self.lats = lats
+        self.lons = lons
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        for idx, (lat, lon) in enumerate(zip(lats, lons)):
+            self._cells.setdefault(self._cell(lat, lon), []).append(idx)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg)))
+
+    def nearest(self, lat: float, lon: float, max_distance_m: float) -> Optional[Tuple[int, float]]:
+        """Return ``(index, distance_m)`` of the closest point within ``max_distance_m``."""
+        if not self._cells:
+            return None
+
+        # Smallest cell side in metres (longitude shrinks towards the poles)
+        cell_m = self.cell_deg * math.pi / 180 * EARTH_RADIUS_M * max(math.cos(math.radians(lat)), 0.01)
+        max_ring = int(max_distance_m / cell_m) + 1
+        ci, cj = self._cell(lat, lon)
+
+        best: Optional[Tuple[int, float]] = None
+        for ring in range(max_ring + 1):
+            # Anything in this ring is at least (ring - 1) cells away
+            if best is not None and best[1] < (ring - 1) * cell_m:
+                break
+            for di in range(-ring, ring + 1):
+                for dj in range(-ring, ring + 1):
+                    if max(abs(di), abs(dj)) != ring:
+                        continue
+                    for idx in self._cells.get((ci + di, cj + dj), ()):
+                        d = haversine_m(lat, lon, self.lats[idx], self.lons[idx])
+                        if d <= max_distance_m and (best is None or d < best[1]):
+                            best = (idx, d)
+        return best
+
+    def within(self, lat: float, lon: float, radius_m: float) -> List[Tuple[int, float]]:
+        """Return all ``(index, distance_m)`` pairs within ``radius_m``."""
+        cell_m = self.cell_deg * math.pi / 180 * EARTH_RADIUS_M * max(math.cos(math.radians(lat)), 0.01)
+        reach = int(radius_m / cell_m) + 1
+        ci, cj = self._cell(lat, lon)
+
+        found = []
+        for di in range(-reach, reach + 1):
+            for dj in range(-reach, reach + 1):
+                for idx in self._cells.get((ci + di, cj + dj), ()):
+                    d = haversine_m(lat, lon, self.lats[idx], self.lons[idx])
+                    if d <= radius_m:
+                        found.append((idx, d))
+        return found
+
+
+class WalkingGraph:
+    """Undirected walkable street network stored in CSR form.
+
+    ``offsets[n]:offsets[n + 1]`` slices ``targets``/``weights`` to give the
+    neighbours of node ``n`` and the edge lengths in metres.
+    """
+
+    def __init__(self, lats: array, lons: array, offsets: array, targets: array, weights: array):
+        self.lats = lats
+        self.lons = lons
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.index = GridIndex(lats, lons)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.lats)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    @classmethod
+    def from_osm(cls, path: str) -> 'WalkingGraph':
+        """Build the graph from an OSM XML extract.
+
+        The extract is read twice, so that only the coordinates of nodes on
+        walkable ways are kept (in arrays) rather than those of every node: the
+        first pass collects the walkable ways, the second their nodes.
+        """
+        # Pass 1: walkable ways, and a slot for each node they use
+        slots: Dict[int, int] = {}
+        ways: List[array] = []
+        with _open_extract(path) as f:
+            for _, elem in ET.iterparse(f, events=('end',)):
+                if elem.tag == 'way':
+                    tags = {t.get('k'): t.get('v') for t in elem.iter('tag')}
+                    if _is_walkable(tags):
+                        refs = array('q', (int(nd.get('ref')) for nd in elem.iter('nd')))
+                        for ref in refs:
+                            if ref not in slots:
+                                slots[ref] = len(slots)
+                        ways.append(refs)
+                    elem.clear()
+                elif elem.tag in ('node', 'relation'):
+                    elem.clear()
+
+        # Pass 2: coordinates of those nodes only
+        slot_lats = array('d', [math.nan]) * len(slots)
+        slot_lons = array('d', [math.nan]) * len(slots)
+        with _open_extract(path) as f:
+            for _, elem in ET.iterparse(f, events=('end',)):
+                if elem.tag == 'node':
+                    slot = slots.get(int(elem.get('id')))
+                    if slot is not None:
+                        slot_lats[slot] = float(elem.get('lat'))
+                        slot_lons[slot] = float(elem.get('lon'))
+                    elem.clear()
+                elif elem.tag in ('way', 'relation'):
+                    elem.clear()
+
+        # Compact node ids: drop nodes missing from the extract (ways clipped at its boundary)
+        node_ids = array('l', [-1]) * len(slots)
+        lats = array('d')
+        lons = array('d')
+        for slot in range(len(slots)):
+            if not math.isnan(slot_lats[slot]):
+                node_ids[slot] = len(lats)
+                lats.append(slot_lats[slot])
+                lons.append(slot_lons[slot])
+        del slot_lats, slot_lons
+
+        edges: List[Tuple[int, int, float]] = []
+        for refs in ways:
+            prev = None
+            for ref in refs:
+                idx = node_ids[slots[ref]]
+                if idx < 0:
+                    # Way clipped at the extract boundary
+                    prev = None
+                    continue
+                if prev is not None and prev != idx:
+                    edges.append((prev, idx, haversine_m(lats[prev], lons[prev], lats[idx], lons[idx])))
+                prev = idx
+        del slots, ways, node_ids
+
+        # Counting sort edges (both directions) into CSR arrays
+        degree = [0] * (len(lats) + 1)
+        for u, v, _ in edges:
+            degree[u + 1] += 1
+            degree[v + 1] += 1
+        offsets = array('l', [0]) * (len(lats) + 1)
+        for n in range(1, len(degree)):
+            offsets[n] = offsets[n - 1] + degree[n]
+
+        targets = array('l', [0]) * offsets[-1]
+        weights = array('f', [0.0]) * offsets[-1]
+        cursor = array('l', offsets)
+        for u, v, w in edges:
+            targets[cursor[u]] = v
+            weights[cursor[u]] = w
+            cursor[u] += 1
+            targets[cursor[v]] = u
+            weights[cursor[v]] = w
+            cursor[v] += 1
+
+        graph = cls(lats, lons, offsets, targets, weights)
+        logger.info(f"Loaded walking graph from {path}: {graph.node_count} nodes, {graph.edge_count} edges")
+        return graph
+
+    def snap(self, lat: float, lon: float, max_distance_m: float) -> Optional[Tuple[int, float]]:
+        """Snap coordinates to the nearest graph node."""
+        return self.index.nearest(lat, lon, max_distance_m)
+
+    def shortest_distances(self, source: int) -> array:
+        """Single-source Dijkstra; returns metres from ``source`` to every node."""
+        dist = array('d', [math.inf]) * self.node_count
+        dist[source] = 0.0
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        heap = [(0.0, source)]
+
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for e in range(offsets[u], offsets[u + 1]):
+                nd = d + weights[e]
+                v = targets[e]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, v))
+        return dist
+
+
+class WalkingRouter:
+    """Walking distance and time from properties to one or more destinations.
+
+    Each destination costs one Dijkstra over the whole graph when it is added;
+    every property lookup afterwards is a snap and an array read.
+    """
+
+    def __init__(
+        self,
+        graph: WalkingGraph,
+        walking_speed_kmh: float = 4.8,
+        max_snap_distance_m: float = 250.0
+    ):
+        self.graph = graph
+        self.walking_speed_kmh = walking_speed_kmh
+        self.max_snap_distance_m = max_snap_distance_m
+        self._distances: Dict[str, Tuple[array, float]] = {}
+
+    @classmethod
+    def from_osm(cls, path: str, **kwargs) -> 'WalkingRouter':
+        return cls(WalkingGraph.from_osm(path), **kwargs)
+
+    def add_destination(self, name: str, coords: Tuple[float, float]) -> bool:
+        """Precompute distances from a destination. Returns False if it can't be snapped."""
+        snapped = self.graph.snap(coords[0], coords[1], self.max_snap_distance_m)
+        if snapped is None:
+            logger.warning(f"Destination {name} is not within {self.max_snap_distance_m}m of the walking graph")
+            return False
+        node, offset_m = snapped
+        self._distances[name] = (self.graph.shortest_distances(node), offset_m)
+        return True
+
+    def walking_distance(self, name: str, coords: Tuple[float, float]) -> Optional[float]:
+        """Walking distance in metres from ``coords`` to destination ``name``."""
+        if name not in self._distances:
+            return None
+        snapped = self.graph.snap(coords[0], coords[1], self.max_snap_distance_m)
+        if snapped is None:
+            return None
+        node, offset_m = snapped
+        distances, dest_offset_m = self._distances[name]
+        if math.isinf(distances[node]):
+            # Snapped onto a disconnected island of the network
+            return None
+        return distances[node] + offset_m + dest_offset_m
+
+    def walking_minutes(self, distance_m: float) -> float:
+        """Convert a walking distance in metres to minutes."""
+        return distance_m / (self.walking_speed_kmh * 1000 / 60)
@@ -0,0 +1,204 @@
+"""Priority scores for listings, matching webapp/src/lib/priorityAlgorithm.ts.
+
+The four factor scores (location, price, monthly cost, quality) don't depend
+on the weights, so they are computed once as NumPy columns. Re-scoring under
+different weights is then a single matrix-vector product, and ``top_k``
+picks the best listings with a heap instead of sorting everything.
+
+Usage:
+    python -m propertypal_scraper.scoring --top 20
+    python -m propertypal_scraper.scoring --top 50 --weights location=0.4,monthly=0.4 --output top.csv
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from propertypal_scraper.perplexity_rating import calculate_monthly_payment
+
+# Same defaults as DEFAULT_WEIGHTS in priorityAlgorithm.ts
+DEFAULT_WEIGHTS = {
+    'location': 0.6,
+    'price': 0.1,
+    'monthly': 0.2,
+    'rating': 0.1,
+}
+FACTORS = ('location', 'price', 'monthly', 'rating')
+
+MAX_PRICE = 140000
+MONTHLY_BUDGET = 800
+KM_TO_MILES = 0.621371
+MISSING_DISTANCE_MILES = 5.0
+HEATING_PENALTY = {'Oil': 60, 'Electric': 100}
+MIN_LEASE_YEARS = 60
+KILLED = -1.0
+
+
+def parse_weights(value: str) -> Dict[str, float]:
+    """'location=0.5,price=0.2' -> weights, starting from DEFAULT_WEIGHTS."""
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in filter(None, (p.strip() for p in value.split(','))):
+        name, _, number = part.partition('=')
+        if name not in DEFAULT_WEIGHTS:
+            raise ValueError(f"Unknown weight: {name} (expected one of {', '.join(FACTORS)})")
+        weights[name] = float(number)
+    return weights
+
+
+def _float_column(records: List[Dict[str, Any]], field: str) -> np.ndarray:
+    return np.array(
+        [r.get(field) if isinstance(r.get(field), (int, float)) else np.nan for r in records],
+        dtype=np.float64
+    )
+
+
+class PropertyScorer:
+    """Factor scores for a set of listings, re-weightable in bulk."""
+
+    def __init__(self, records: Iterable[Dict[str, Any]]):
+        records = list(records)
+        self.records = records
+        self.property_ids = [str(r.get('property_id')) for r in records]
+
+        distance_km = _float_column(records, 'distance_to_destination')
+        price = _float_column(records, 'price')
+        monthly = _float_column(records, 'calculated_monthly_payment')
+        rating = _float_column(records, 'perplexity_rating')
+
+        # The webapp loader fills in the mortgage when the rater didn't
+        missing_monthly = np.isnan(monthly) & (price > 0)
+        monthly[missing_monthly] = [calculate_monthly_payment(int(p)) for p in price[missing_monthly]]
+
+        heating_penalty = np.array([HEATING_PENALTY.get(r.get('heating'), 0) for r in records], dtype=np.float64)
+        epc_b = np.array([str(r.get('energy_rating') or '').startswith('B') for r in records])
+        house = np.array(['house' in str(r.get('property_type') or '').lower() for r in records])
+
+        self.killed = np.array([
+            'cash offers only' in str(r.get('description') or '').lower()
+            or (r.get('tenure') == 'Leasehold' and (r.get('lease_years') or 999) < MIN_LEASE_YEARS)
+            for r in records
+        ], dtype=bool)
+
+        # Location: distance 0 or missing counts as 5 miles, like the webapp
+        miles = np.where(np.isnan(distance_km) | (distance_km == 0), MISSING_DISTANCE_MILES, distance_km * KM_TO_MILES)
+        location = np.where(
+            miles <= 0.6, 100.0,
+            np.where(miles <= 1.5, 100.0 - (miles - 0.6) / 0.9 * 60.0, np.maximum(0.0, 40.0 - (miles - 1.5) * 10.0))
+        )
+
+        real_monthly = np.nan_to_num(monthly, nan=0.0) + heating_penalty
+        monthly_score = np.maximum(0.0, (1.0 - real_monthly / MONTHLY_BUDGET) * 100.0)
+
+        price_score = np.where(np.nan_to_num(price, nan=0.0) > 0, np.maximum(0.0, (1.0 - price / MAX_PRICE) * 100.0), 0.0)
+
+        quality = np.where(np.isnan(rating), 5.0, rating) * 10.0 + epc_b * 20.0 + house * 10.0
+        quality = np.clip(quality, 0.0, 100.0)
+
+        # Columns in FACTORS order
+        self.components = np.column_stack([location, price_score, monthly_score, quality])
+
+    def __len__(self) -> int:
+        return len(self.property_ids)
+
+    @property
+    def location_scores(self) -> np.ndarray:
+        return self.components[:, 0]
+
+    def scores(self, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Priority score per listing (rounded to 0.1); killed listings score -1."""
+        weights = weights or DEFAULT_WEIGHTS
+        vector = np.array([weights.get(f, 0.0) for f in FACTORS], dtype=np.float64)
+        scores = np.round(self.components @ vector, 1)
+        scores[self.killed] = KILLED
+        return scores
+
+    def top_k(self, k: int, weights: Optional[Dict[str, float]] = None) -> List[Tuple[float, int]]:
+        """Best ``k`` listings as ``(score, index)``, highest first; killed ones excluded."""
+        scores = self.scores(weights)
+        candidates = np.flatnonzero(~self.killed)
+        best = heapq.nlargest(k, candidates.tolist(), key=scores.__getitem__)
+        return [(float(scores[i]), i) for i in best]
+
+    def ranked(self, weights: Optional[Dict[str, float]] = None) -> List[Tuple[float, int]]:
+        """All non-killed listings, highest score first (like calculatePriorityScores)."""
+        return self.top_k(len(self), weights)
+
+    @classmethod
+    def from_history(cls, db_file: str, search: Optional[str] = None) -> 'PropertyScorer':
+        """Score the latest state of every listing in the history store."""
+        conn = sqlite3.connect(db_file)
+        conn.row_factory = sqlite3.Row
+        try:
+            query = (
+                "SELECT property_id, url, location, price, calculated_monthly_payment, "
+                "perplexity_rating, distance_to_destination, heating, energy_rating, property_type, "
+                "tenure, listing_status, json_extract(data, '$.description') AS description "
+                "FROM listings"
+            )
+            params = []
+            if search:
+                query += " WHERE search = ?"
+                params.append(search)
+            records = [dict(row) for row in conn.execute(query, params)]
+        finally:
+            conn.close()
+        return cls(records)
+
+
+def main():
+    from propertypal_scraper import settings
+
+    parser = argparse.ArgumentParser(description="Rank listings from the history store")
+    parser.add_argument('--db', default=settings.HISTORY_DB_FILE, help="History database file")
+    parser.add_argument('--search', help="Only listings from this search (slug)")
+    parser.add_argument('--top', type=int, default=20, help="Number of listings to show")
+    parser.add_argument('--weights', default='', help="e.g. location=0.5,price=0.1,monthly=0.3,rating=0.1")
+    parser.add_argument('--output', help="Write the ranking to a .csv or .jsonl file")
+    args = parser.parse_args()
+
+    try:
+        weights = parse_weights(args.weights)
+    except ValueError as e:
+        parser.error(str(e))
+
+    scorer = PropertyScorer.from_history(args.db, search=args.search)
+    top = scorer.top_k(args.top, weights)
+    location = scorer.location_scores
+
+    rows = []
+    for rank, (score, i) in enumerate(top, 1):
+        record = scorer.records[i]
+        rows.append({
+            'rank': rank,
+            'priority_score': score,
+            'location_score': round(float(location[i])),
+            'property_id': record.get('property_id'),
+            'price': record.get('price'),
+            'location': record.get('location'),
+            'url': record.get('url'),
+        })
+
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            if args.output.endswith('.csv'):
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ['rank'])
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + '\n')
+        print(f"Wrote {len(rows)} listings to {args.output}")
+    else:
+        for row in rows:
+            price = f"£{row['price']:,}" if row['price'] else 'n/a'
+            print(f"{row['rank']:>3}. {row['priority_score']:5.1f}  {price:>10}  {row['location']}")
+        print(f"\nTop {len(rows)} of {len(scorer)} listings")
+
+
+if __name__ == "__main__":
+    main()
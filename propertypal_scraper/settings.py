@@ -8,6 +8,7 @@
 #     https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
 import os
+import socket
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -54,37 +55,62 @@ DEFAULT_REQUEST_HEADERS = {
 
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
-#SPIDER_MIDDLEWARES = {
-#    "propertypal_scraper.middlewares.PropertypalScraperSpiderMiddleware": 543,
-#}
+SPIDER_MIDDLEWARES = {
+    # Near the engine, so it only records requests the other middlewares let through
+    'propertypal_scraper.middlewares.CheckpointMiddleware': 100,
+    # Distributed crawls (FRONTIER) only
+    'propertypal_scraper.frontier.FrontierMiddleware': 110,
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 DOWNLOADER_MIDDLEWARES = {
     'scrapy.downloadermiddlewares.useragent.UserAgentMiddleware': None,
-    'scrapy_user_agents.middlewares.RandomUserAgentMiddleware': 400,
+    'propertypal_scraper.middlewares.CachedUserAgentMiddleware': 400,
     'propertypal_scraper.middlewares.FlareSolverrMiddleware': 555,
 }
 
-# FlareSolverr configuration
-FLARESOLVERR_URL = 'http://localhost:8191/v1'
+# FlareSolverr configuration (each worker of a distributed crawl uses its own)
+FLARESOLVERR_URL = os.getenv('FLARESOLVERR_URL', 'http://localhost:8191/v1')
+
+# User agents picked by RANDOM_UA_TYPE, cached so they aren't parsed on every start
+USER_AGENT_CACHE_FILE = os.getenv('USER_AGENT_CACHE_FILE', 'data/cache/user_agents.json')
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-#}
+EXTENSIONS = {
+    # Time from process start to the first request, in the stats and the log
+    'propertypal_scraper.profiling.StartupTimer': 100,
+    # Whole-crawl sampling profiler, only active with PROFILER_ENABLED=true
+    'propertypal_scraper.profiling.SamplingProfiler': 500,
+    # tracemalloc top allocation sites every N items, only active with TRACEMALLOC_ENABLED=true
+    'propertypal_scraper.memory.AllocationReporter': 510,
+}
 
-# Configure item pipelines
+# Configure item pipelines (stages switched off below are removed at the end of this file)
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 ITEM_PIPELINES = {
     "propertypal_scraper.pipelines.ValidationPipeline": 100,
+    "propertypal_scraper.pipelines.ChangesetPipeline": 120,
+    "propertypal_scraper.pipelines.DuplicateFilterPipeline": 130,
+    "propertypal_scraper.pipelines.RelistingPipeline": 140,
     "propertypal_scraper.pipelines.PerplexityRatingPipeline": 150,
     "propertypal_scraper.pipelines.DistanceCalculationPipeline": 200,
-    "propertypal_scraper.pipelines.JSONPipeline": 250,
-    "propertypal_scraper.pipelines.CSVPipeline": 300,
+    "propertypal_scraper.pipelines.ExportPipeline": 250,
+    "propertypal_scraper.pipelines.HistoryStorePipeline": 400,
 }
 
+# Per-stage wall/CPU timing of every pipeline above, added to the crawl stats.
+# Opt-in: the timing manager wraps private parts of Scrapy's ItemPipelineManager (tested on 2.19)
+PIPELINE_PROFILING = os.getenv('PIPELINE_PROFILING', 'false').lower() in ('true', '1', 'yes', 'on')
+if PIPELINE_PROFILING:
+    ITEM_PROCESSOR = 'propertypal_scraper.profiling.ProfilingItemPipelineManager'
+
+# Sampling profiler: folded stacks (flamegraph.pl / speedscope) written at close
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'false').lower() in ('true', '1', 'yes', 'on')
+PROFILER_INTERVAL_MS = float(os.getenv('PROFILER_INTERVAL_MS', '5'))
+PROFILER_OUTPUT_DIR = os.getenv('PROFILER_OUTPUT_DIR', 'data/profiles')
+
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
 #AUTOTHROTTLE_ENABLED = True
@@ -109,6 +135,119 @@ ITEM_PIPELINES = {
 # Set settings whose default value is deprecated to a future-proof value
 FEED_EXPORT_ENCODING = "utf-8"
 
+# Item building: 'full' validates every listing with the Pydantic
+# PropertyListing model; 'fast' opts out and yields slotted PropertyRecord
+# items that only convert price, room counts and numeric companions
+PROPERTY_VALIDATION = os.getenv('PROPERTY_VALIDATION', 'full')
+
+# Export stage: items are written to every sink from a background thread
+EXPORT_SINKS = [s for s in os.getenv('EXPORT_SINKS', 'json,csv,ratings,parquet').split(',') if s]
+EXPORT_QUEUE_SIZE = int(os.getenv('EXPORT_QUEUE_SIZE', '1000'))
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '100'))
+EXPORT_BATCH_INTERVAL = float(os.getenv('EXPORT_BATCH_INTERVAL', '1'))
+
+# JSON Lines export configuration
+JSON_EXPORT_COMPRESSION = os.getenv('JSON_EXPORT_COMPRESSION', 'none')  # none, gzip, zstd
+JSON_EXPORT_FLUSH_INTERVAL = float(os.getenv('JSON_EXPORT_FLUSH_INTERVAL', '5'))
+JSON_EXPORT_FIELDS = [f for f in os.getenv('JSON_EXPORT_FIELDS', '').split(',') if f]
+JSON_EXPORT_EXCLUDE_FIELDS = [
+    f for f in os.getenv('JSON_EXPORT_EXCLUDE_FIELDS', 'features,room_details,directions,additional_info').split(',') if f
+]
+
+# Parquet export configuration (requires pyarrow)
+PARQUET_EXPORT_ENABLED = os.getenv('PARQUET_EXPORT_ENABLED', 'true').lower() in ('true', '1', 'yes', 'on')
+PARQUET_EXPORT_DIR = os.getenv('PARQUET_EXPORT_DIR', 'data/parquet')
+PARQUET_BATCH_SIZE = int(os.getenv('PARQUET_BATCH_SIZE', '1000'))
+PARQUET_COMPRESSION = os.getenv('PARQUET_COMPRESSION', 'zstd')
+
+# Run-to-run change detection
+CHANGESET_ENABLED = os.getenv('CHANGESET_ENABLED', 'true').lower() in ('true', '1', 'yes', 'on')
+CHANGESET_DIR = os.getenv('CHANGESET_DIR', 'data/changes')
+CHANGESET_STATE_DIR = os.getenv('CHANGESET_STATE_DIR', 'data/state/fingerprints')
+CHANGESET_FIELDS = [
+    f for f in os.getenv(
+        'CHANGESET_FIELDS',
+        'price,listing_status,property_type,location,bedrooms,bathrooms,receptions,'
+        'size,tenure,energy_rating,heating,rates,description,features'
+    ).split(',') if f
+]
+
+# Webapp data bundles (python -m propertypal_scraper.bundle)
+BUNDLE_OUTPUT_DIR = os.getenv('BUNDLE_OUTPUT_DIR', 'webapp/public/bundles')
+BUNDLE_PAGE_SIZE = int(os.getenv('BUNDLE_PAGE_SIZE', '50'))
+
+# Duplicate filtering: 'run' drops duplicates within a run; 'drop', 'touch' and
+# 'reemit' also use a persistent property_id index shared by all searches and runs
+DEDUP_POLICY = os.getenv('DEDUP_POLICY', 'run')
+DEDUP_INDEX_FILE = os.getenv('DEDUP_INDEX_FILE', 'data/state/dedup.db')
+DEDUP_BLOOM_CAPACITY = int(os.getenv('DEDUP_BLOOM_CAPACITY', '1000000'))
+DEDUP_FIELDS = [f for f in os.getenv('DEDUP_FIELDS', '').split(',') if f] or CHANGESET_FIELDS
+
+# Relisting detection: MinHash/LSH over description + features per postcode district
+RELISTING_ENABLED = os.getenv('RELISTING_ENABLED', 'true').lower() in ('true', '1', 'yes', 'on')
+RELISTING_DB_FILE = os.getenv('RELISTING_DB_FILE', 'data/state/relisting.db')
+RELISTING_THRESHOLD = float(os.getenv('RELISTING_THRESHOLD', '0.8'))
+RELISTING_NUM_PERM = int(os.getenv('RELISTING_NUM_PERM', '128'))
+
+# Scheduler daemon (python -m propertypal_scraper.daemon / run_scraper.py --daemon)
+DAEMON_STATE_FILE = os.getenv('DAEMON_STATE_FILE', 'data/state/daemon.json')
+DAEMON_TICK_SECONDS = float(os.getenv('DAEMON_TICK_SECONDS', '10'))
+
+# Resumable crawls (-a job=<id> / run_scraper.py --job <id>): frontier, ratings
+# and export offsets are checkpointed to JOBS_DIR/<id>/checkpoint.db
+JOBS_DIR = os.getenv('JOBS_DIR', 'data/jobs')
+CHECKPOINT_INTERVAL = float(os.getenv('CHECKPOINT_INTERVAL', '60'))
+
+# Search sharding (run_scraper.py --shard): searches reporting more than
+# SHARD_TARGET_SIZE results are split by price band, then bedrooms
+SHARD_TARGET_SIZE = int(os.getenv('SHARD_TARGET_SIZE', '500'))
+SHARD_MIN_PRICE_BAND = int(os.getenv('SHARD_MIN_PRICE_BAND', '10000'))
+SHARD_MAX_DEPTH = int(os.getenv('SHARD_MAX_DEPTH', '8'))
+
+# Distributed crawls: workers started with the same FRONTIER name share one
+# request frontier, in FRONTIER_DIR on this host or at a coordinator URL
+FRONTIER = os.getenv('FRONTIER')
+FRONTIER_DIR = os.getenv('FRONTIER_DIR', 'data/frontier')
+FRONTIER_URL = os.getenv('FRONTIER_URL', FRONTIER_DIR)
+FRONTIER_WORKER_ID = os.getenv('FRONTIER_WORKER_ID') or f'{socket.gethostname()}-{os.getpid()}'
+FRONTIER_LEASE_SECONDS = float(os.getenv('FRONTIER_LEASE_SECONDS', '300'))
+FRONTIER_LEASE_BATCH = int(os.getenv('FRONTIER_LEASE_BATCH', '1'))
+FRONTIER_POLL_SECONDS = float(os.getenv('FRONTIER_POLL_SECONDS', '2'))
+FRONTIER_FLUSH_SECONDS = float(os.getenv('FRONTIER_FLUSH_SECONDS', '0.5'))
+FRONTIER_MAX_ATTEMPTS = int(os.getenv('FRONTIER_MAX_ATTEMPTS', '3'))
+if FRONTIER:
+    SCHEDULER = 'propertypal_scraper.frontier.FrontierScheduler'
+
+# Memory-bounded mode for region-wide crawls: fewer responses are held while
+# their items are processed, dedup sets spill to MEMORY_SPILL_DIR past
+# MEMORY_MAX_SET_ITEMS and the fields in SPIDER_SKIP_FIELDS aren't extracted
+MEMORY_BOUNDED = os.getenv('MEMORY_BOUNDED', 'false').lower() in ('true', '1', 'yes', 'on')
+MEMORY_SPILL_DIR = os.getenv('MEMORY_SPILL_DIR', 'data/tmp')
+MEMORY_MAX_SET_ITEMS = int(os.getenv('MEMORY_MAX_SET_ITEMS', '50000'))
+MEMORY_MAX_ACTIVE_BYTES = int(os.getenv('MEMORY_MAX_ACTIVE_BYTES', '2000000'))
+MEMORY_CONCURRENT_ITEMS = int(os.getenv('MEMORY_CONCURRENT_ITEMS', '10'))
+SPIDER_SKIP_FIELDS = [
+    f for f in os.getenv(
+        'SPIDER_SKIP_FIELDS', 'additional_info,room_details,directions' if MEMORY_BOUNDED else ''
+    ).split(',') if f
+]
+if MEMORY_BOUNDED:
+    DUPEFILTER_CLASS = 'propertypal_scraper.memory.SpillDupeFilter'
+    # Downloads pause while this many response bytes wait on their items (Scrapy default: 5 MB)
+    SCRAPER_SLOT_MAX_ACTIVE_SIZE = MEMORY_MAX_ACTIVE_BYTES
+    CONCURRENT_ITEMS = MEMORY_CONCURRENT_ITEMS
+
+# Allocation tracking: log the top tracemalloc allocation sites every N items
+TRACEMALLOC_ENABLED = os.getenv('TRACEMALLOC_ENABLED', 'false').lower() in ('true', '1', 'yes', 'on')
+TRACEMALLOC_INTERVAL_ITEMS = int(os.getenv('TRACEMALLOC_INTERVAL_ITEMS', '500'))
+TRACEMALLOC_TOP = int(os.getenv('TRACEMALLOC_TOP', '10'))
+TRACEMALLOC_FRAMES = int(os.getenv('TRACEMALLOC_FRAMES', '1'))
+
+# Property history store (SQLite): latest state per listing plus price/status changes
+HISTORY_ENABLED = os.getenv('HISTORY_ENABLED', 'true').lower() in ('true', '1', 'yes', 'on')
+HISTORY_DB_FILE = os.getenv('HISTORY_DB_FILE', 'data/history/properties.db')
+HISTORY_COMMIT_INTERVAL = int(os.getenv('HISTORY_COMMIT_INTERVAL', '100'))
+
 # Geocoding configuration
 # Providers to try in order (nominatim, photon are free; google, here, mapbox, opencage require API keys)
 GEOCODING_PROVIDERS = os.getenv('GEOCODING_PROVIDERS', 'nominatim,photon').split(',')
@@ -116,3 +255,45 @@ GEOCODING_MAX_RETRIES = int(os.getenv('GEOCODING_MAX_RETRIES', '3'))
 GEOCODING_BASE_DELAY = float(os.getenv('GEOCODING_BASE_DELAY', '1.0'))
 GEOCODING_CACHE_FILE = os.getenv('GEOCODING_CACHE_FILE', 'data/cache/geocoding_cache.json')
 GEOCODING_CACHE_TTL_DAYS = int(os.getenv('GEOCODING_CACHE_TTL_DAYS', '30'))
+# Circuit breakers: skip a provider after N consecutive failures, retry it after a cool-down
+GEOCODING_BREAKER_FAILURE_THRESHOLD = int(os.getenv('GEOCODING_BREAKER_FAILURE_THRESHOLD', '3'))
+GEOCODING_BREAKER_RESET_SECONDS = float(os.getenv('GEOCODING_BREAKER_RESET_SECONDS', '300'))
+# Recent requests per provider used to rank providers by success rate and latency
+GEOCODING_STATS_WINDOW = int(os.getenv('GEOCODING_STATS_WINDOW', '50'))
+# Batch mode: geocode items in windows (0 = one item at a time)
+GEOCODING_BATCH_SIZE = int(os.getenv('GEOCODING_BATCH_SIZE', '0'))
+GEOCODING_BATCH_TIMEOUT = float(os.getenv('GEOCODING_BATCH_TIMEOUT', '5'))
+GEOCODING_BATCH_WORKERS = int(os.getenv('GEOCODING_BATCH_WORKERS', '4'))
+# Geocode addresses from search result cards while detail pages download
+GEOCODING_PREFETCH_ENABLED = os.getenv('GEOCODING_PREFETCH_ENABLED', 'true').lower() in ('true', '1', 'yes', 'on')
+GEOCODING_PREFETCH_WORKERS = int(os.getenv('GEOCODING_PREFETCH_WORKERS', '1'))
+
+# Walking routing configuration
+# OSM XML extract of the walkable network (.osm/.osm.gz/.osm.bz2); routing disabled if unset
+WALKING_GRAPH_FILE = os.getenv('WALKING_GRAPH_FILE')
+WALKING_SPEED_KMH = float(os.getenv('WALKING_SPEED_KMH', '4.8'))
+WALKING_MAX_SNAP_DISTANCE_M = float(os.getenv('WALKING_MAX_SNAP_DISTANCE_M', '250'))
+
+# Public-transport commute configuration
+# GTFS feed (zip or directory); commute times disabled if unset
+TRANSIT_GTFS_FILE = os.getenv('TRANSIT_GTFS_FILE')
+TRANSIT_WEEKDAY = os.getenv('TRANSIT_WEEKDAY', 'tuesday')
+# Service date (YYYY-MM-DD); defaults to the next TRANSIT_WEEKDAY
+TRANSIT_DATE = os.getenv('TRANSIT_DATE')
+TRANSIT_ARRIVAL_TIME = os.getenv('TRANSIT_ARRIVAL_TIME', '09:00')
+TRANSIT_MAX_WALK_M = float(os.getenv('TRANSIT_MAX_WALK_M', '800'))
+TRANSIT_MAX_COMMUTE_MINUTES = int(os.getenv('TRANSIT_MAX_COMMUTE_MINUTES', '120'))
+TRANSIT_MIN_TRANSFER_MINUTES = int(os.getenv('TRANSIT_MIN_TRANSFER_MINUTES', '2'))
+
+# Stage registry: stages switched off above are left out of ITEM_PIPELINES, so
+# they are never instantiated and their dependencies never imported
+PIPELINE_STAGE_ENABLED = {
+    'ChangesetPipeline': CHANGESET_ENABLED,
+    'RelistingPipeline': RELISTING_ENABLED,
+    'DistanceCalculationPipeline': bool(os.getenv('DESTINATION')),
+    'HistoryStorePipeline': HISTORY_ENABLED,
+}
+DISABLED_PIPELINES = [
+    path for path in ITEM_PIPELINES if not PIPELINE_STAGE_ENABLED.get(path.rsplit('.', 1)[-1], True)
+]
+ITEM_PIPELINES = {path: order for path, order in ITEM_PIPELINES.items() if path not in DISABLED_PIPELINES}
@@ -0,0 +1,360 @@
+"""Split broad searches into shards small enough to crawl in parallel.
+
+A search for a whole city or a wide price band is paged through serially by
+one spider and may run into the site's cap on results. The planner fetches
+the first results page of a search, reads its result count and, while it is
+above SHARD_TARGET_SIZE, halves the price band (then the bedroom range) and
+recurses into each half. Both URL styles are understood:
+
+    .../property-for-sale/belfast/bedrooms-2-6/price-100000-140000/sort-dateHigh
+    .../search?...&min=100000&max=140000&minbeds=2&maxbeds=6&term=BT1
+
+Only ranges with both bounds are split. A search without a price or bedroom
+filter can give bounds in urls.json; they are added as filters, so listings
+without a price or bedroom count fall outside every shard:
+
+    {"name": "Belfast", "url": "...", "shard": {"price": [0, 1000000], "bedrooms": [1, 8]}}
+
+``run_scraper.py --shard`` crawls the shards of each selected search as
+separate processes, each exporting JSON Lines only, then merges them with
+merge_shards(): one deduplicated set of exports and one changeset for the
+whole search, as if it had been crawled in one go.
+
+Usage:
+    python -m propertypal_scraper.sharding "Belfast 2-6 bed £100k-£140k"
+"""
+
+import argparse
+import json
+import os
+import re
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from propertypal_scraper.utils import slugify
+
+Range = Optional[Tuple[int, int]]
+
+# Path-style filter segments and query-style parameters of each range
+_PATH_RANGES = {'bedrooms': 'bedrooms', 'price': 'price'}
+_QUERY_RANGES = {'bedrooms': ('minbeds', 'maxbeds'), 'price': ('min', 'max')}
+_COUNT_RE = re.compile(r'(\d[\d,]*)\s+(?:properties|property|results|homes)\b', re.IGNORECASE)
+_PAGE_RE = re.compile(r'(?:page=|/page-)(\d+)')
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    price: Range = None
+    bedrooms: Range = None
+
+
+def _query_style(url: str) -> bool:
+    return bool(urlsplit(url).query)
+
+
+def parse_filters(url: str) -> SearchFilters:
+    """Price and bedroom ranges of a search URL (None where a bound is missing)."""
+    parts = urlsplit(url)
+    ranges = {}
+    if parts.query:
+        params = dict(parse_qsl(parts.query))
+        for name, (low, high) in _QUERY_RANGES.items():
+            if params.get(low, '').isdigit() and params.get(high, '').isdigit():
+                ranges[name] = (int(params[low]), int(params[high]))
+    else:
+        for name, segment in _PATH_RANGES.items():
+            match = re.search(rf'/{segment}-(\d+)-(\d+)(?=/|$)', parts.path)
+            if match:
+                ranges[name] = (int(match.group(1)), int(match.group(2)))
+    return SearchFilters(**ranges)
+
+
+def with_filters(url: str, filters: SearchFilters) -> str:
+    """``url`` with its price/bedroom ranges set to ``filters`` (other parts unchanged)."""
+    parts = urlsplit(url)
+    if parts.query:
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        for name, (low, high) in _QUERY_RANGES.items():
+            value = getattr(filters, name)
+            if value is None:
+                continue
+            updates = {low: str(value[0]), high: str(value[1])}
+            params = [(key, updates.pop(key, val)) for key, val in params]
+            params += list(updates.items())
+        return urlunsplit(parts._replace(query=urlencode(params)))
+
+    path = parts.path.rstrip('/')
+    # bedrooms before price, both before sort-*: the order the site uses
+    for name in ('bedrooms', 'price'):
+        value = getattr(filters, name)
+        if value is None:
+            continue
+        segment = f'/{_PATH_RANGES[name]}-{value[0]}-{value[1]}'
+        pattern = rf'/{_PATH_RANGES[name]}-\d+-\d+(?=/|$)'
+        if re.search(pattern, path):
+            path = re.sub(pattern, segment, path)
+        elif name == 'bedrooms' and re.search(r'/price-\d+-\d+(?=/|$)', path):
+            path = re.sub(r'(?=/price-\d+-\d+(?:/|$))', segment, path, count=1)
+        elif re.search(r'/sort-[^/]+$', path):
+            path = re.sub(r'(?=/sort-[^/]+$)', segment, path)
+        else:
+            path += segment
+    return urlunsplit(parts._replace(path=path))
+
+
+def result_count(html: str) -> Optional[int]:
+    """Number of results a search page reports, or an estimate from its pagination.
+
+    The estimate is the listing cards on the page times the last page linked,
+    or None if the page shows neither.
+    """
+    from parsel import Selector
+
+    selector = Selector(text=html)
+    for text in (' '.join(selector.xpath('//h1//text()').getall()), ' '.join(selector.xpath('//body//text()').getall())):
+        match = _COUNT_RE.search(text)
+        if match:
+            return int(match.group(1).replace(',', ''))
+
+    cards = len(selector.css('li.pp-property-box') or selector.css('li[class*="property-box"]'))
+    if not cards:
+        return None
+    pages = [int(match.group(1)) for href in selector.xpath('//a/@href').getall() for match in [_PAGE_RE.search(href)] if match]
+    return cards * max(pages, default=1)
+
+
+def flaresolverr_fetch(flaresolverr_url: str, timeout: float = 70) -> Callable[[str], str]:
+    """Fetch function returning the HTML of a URL through FlareSolverr."""
+    import requests
+
+    def fetch(url: str) -> str:
+        response = requests.post(
+            flaresolverr_url, json={'cmd': 'request.get', 'url': url, 'maxTimeout': 60000}, timeout=timeout
+        )
+        data = response.json()
+        if data.get('status') != 'ok':
+            raise RuntimeError(f"FlareSolverr error: {data.get('message')}")
+        return data.get('solution', {}).get('response', '')
+
+    return fetch
+
+
+@dataclass(frozen=True)
+class Shard:
+    url: str
+    filters: SearchFilters
+    count: Optional[int]
+
+    @property
+    def label(self) -> str:
+        parts = []
+        if self.filters.price:
+            parts.append(f"£{self.filters.price[0]:,}-£{self.filters.price[1]:,}")
+        if self.filters.bedrooms:
+            parts.append(f"{self.filters.bedrooms[0]}-{self.filters.bedrooms[1]} bed")
+        return ', '.join(parts) or 'all'
+
+
+def _split(value: Tuple[int, int], step: int) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """Two non-overlapping halves of an inclusive range, the cut rounded to ``step``."""
+    low, high = value
+    if high - low < step:
+        return None
+    cut = low + (high - low) // 2
+    cut -= cut % step
+    # At least one step in the lower half where there is room, and never an empty upper half
+    cut = min(max(cut, low + step - 1), high - 1)
+    return (low, cut), (cut + 1, high)
+
+
+class ShardPlanner:
+    """Recursively split a search by price band, then bedroom range
+
+    Configure via environment variables:
+    - SHARD_TARGET_SIZE: Maximum results per shard (default: 500)
+    - SHARD_MIN_PRICE_BAND: Narrowest price band to split further (default: 10000)
+    - SHARD_MAX_DEPTH: Maximum number of splits along one branch (default: 8)
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], str],
+        target_size: int = 500,
+        min_price_band: int = 10000,
+        max_depth: int = 8,
+        logger: Optional[Callable[[str], Any]] = None
+    ):
+        self.fetch = fetch
+        self.target_size = target_size
+        self.min_price_band = min_price_band
+        self.max_depth = max_depth
+        self.log = logger or (lambda message: None)
+        self.probes = 0
+
+    def count(self, url: str) -> Optional[int]:
+        self.probes += 1
+        try:
+            return result_count(self.fetch(url))
+        except Exception as e:
+            self.log(f"Could not count results of {url}: {e}")
+            return None
+
+    def plan(self, url: str, bounds: Optional[Dict[str, Iterable[int]]] = None) -> List[Shard]:
+        """Shards covering the search ``url``; ``bounds`` fill in missing price/bedroom ranges."""
+        filters = parse_filters(url)
+        for name, value in (bounds or {}).items():
+            if getattr(filters, name, False) is None:
+                low, high = value
+                filters = replace(filters, **{name: (int(low), int(high))})
+        if filters != parse_filters(url):
+            url = with_filters(url, filters)
+        return self._plan(url, filters, 0)
+
+    def _plan(self, url: str, filters: SearchFilters, depth: int) -> List[Shard]:
+        count = self.count(url)
+        shard = Shard(url, filters, count)
+        if count is None or count <= self.target_size:
+            return [shard]
+        if depth >= self.max_depth:
+            self.log(f"Shard {shard.label} still has {count} results after {depth} splits")
+            return [shard]
+
+        halves = None
+        if filters.price:
+            halves = [replace(filters, price=half) for half in _split(filters.price, self.min_price_band) or ()]
+        if not halves and filters.bedrooms:
+            halves = [replace(filters, bedrooms=half) for half in _split(filters.bedrooms, 1) or ()]
+        if not halves:
+            self.log(f"Shard {shard.label} has {count} results but can't be split further")
+            return [shard]
+
+        self.log(f"{shard.label}: {count} results, splitting")
+        return [s for half in halves for s in self._plan(with_filters(url, half), half, depth + 1)]
+
+
+def merge_shards(
+    name: str,
+    paths: List[str],
+    use_perplexity: bool = False,
+    complete: bool = True,
+    timestamp: Optional[str] = None
+) -> Dict[str, Any]:
+    """Merge the JSON Lines exports of a search's shards into the search's exports.
+
+    Listings found by more than one shard are kept once (the latest scrape).
+    Writes the configured export sinks as ExportPipeline would, and, with
+    change detection enabled, one changeset for the whole search; an
+    incomplete run (a shard failed) doesn't report disappeared listings.
+    Returns counts and the paths written.
+    """
+    from propertypal_scraper import settings
+    from propertypal_scraper.exporters import (
+        CsvSink, JsonLinesSink, JsonLinesWriter, ParquetPartitionWriter, ParquetSink, RatingsSink, iter_records
+    )
+
+    search = slugify(name)
+    timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+    records: Dict[str, Dict[str, Any]] = {}
+    read = 0
+    for path in paths:
+        for record in iter_records(path):
+            read += 1
+            key = record.get('property_id') or record.get('url')
+            if key not in records or (record.get('scraped_at') or '') >= (records[key].get('scraped_at') or ''):
+                records[key] = record
+
+    sinks = []
+    if 'json' in settings.EXPORT_SINKS:
+        sinks.append(JsonLinesSink(JsonLinesWriter(
+            f'data/raw/properties_{search}_{timestamp}.jsonl',
+            compression=settings.JSON_EXPORT_COMPRESSION,
+            fields=settings.JSON_EXPORT_FIELDS,
+            exclude=settings.JSON_EXPORT_EXCLUDE_FIELDS
+        )))
+    if 'csv' in settings.EXPORT_SINKS:
+        sinks.append(CsvSink(f'data/processed/properties_{search}_{timestamp}.csv'))
+    if 'ratings' in settings.EXPORT_SINKS and use_perplexity:
+        sinks.append(RatingsSink(f'data/ratings/perplexity_ratings_{search}_{timestamp}.json'))
+    if 'parquet' in settings.EXPORT_SINKS and settings.PARQUET_EXPORT_ENABLED:
+        try:
+            sinks.append(ParquetSink(ParquetPartitionWriter(
+                settings.PARQUET_EXPORT_DIR, search=search, name=f'properties_{timestamp}',
+                batch_size=settings.PARQUET_BATCH_SIZE, compression=settings.PARQUET_COMPRESSION
+            )))
+        except ImportError:
+            pass
+
+    merged = list(records.values())
+    for start in range(0, len(merged), settings.EXPORT_BATCH_SIZE):
+        batch = merged[start:start + settings.EXPORT_BATCH_SIZE]
+        for sink in sinks:
+            sink.write_batch(batch)
+    for sink in sinks:
+        sink.close()
+
+    result = {
+        'read': read,
+        'merged': len(merged),
+        'duplicates': read - len(merged),
+        'paths': [path for sink in sinks for path in sink.paths],
+    }
+    if settings.CHANGESET_ENABLED:
+        result['changeset'] = _merge_changeset(search, merged, complete, timestamp)
+    return result
+
+
+def _merge_changeset(search: str, records: List[Dict[str, Any]], complete: bool, timestamp: str) -> str:
+    from propertypal_scraper import settings
+    from propertypal_scraper.diff import ChangeDetector, FingerprintStore
+    from propertypal_scraper.exporters import JsonLinesWriter
+
+    detector = ChangeDetector(FingerprintStore(
+        os.path.join(settings.CHANGESET_STATE_DIR, f'{search}.json'), fields=settings.CHANGESET_FIELDS
+    ))
+    writer = JsonLinesWriter(os.path.join(settings.CHANGESET_DIR, f'{search}_{timestamp}.jsonl'))
+    detected_at = datetime.now().isoformat()
+    events = [event for record in records for event in detector.compare(record)]
+    if complete:
+        events += detector.disappeared()
+    for event in events:
+        writer.write(dict(event, search=search, detected_at=detected_at))
+    detector.save(complete=complete)
+    writer.close()
+    return writer.path
+
+
+def main():
+    from propertypal_scraper import settings
+
+    parser = argparse.ArgumentParser(description="Show how a search would be split into shards")
+    parser.add_argument('search', help="Search name from urls.json, or a search URL")
+    parser.add_argument('--urls', default='urls.json', help="Search list")
+    parser.add_argument('--target', type=int, default=settings.SHARD_TARGET_SIZE, help="Maximum results per shard")
+    args = parser.parse_args()
+
+    search = {'name': args.search, 'url': args.search}
+    if not args.search.startswith('http'):
+        with open(args.urls, 'r', encoding='utf-8') as f:
+            searches = json.load(f).get('searches', [])
+        search = next((s for s in searches if s['name'] == args.search or slugify(s['name']) == slugify(args.search)), None)
+        if search is None:
+            parser.error(f"no search named {args.search!r} in {args.urls}")
+
+    planner = ShardPlanner(
+        flaresolverr_fetch(settings.FLARESOLVERR_URL),
+        target_size=args.target,
+        min_price_band=settings.SHARD_MIN_PRICE_BAND,
+        max_depth=settings.SHARD_MAX_DEPTH,
+        logger=print
+    )
+    shards = planner.plan(search['url'], search.get('shard'))
+    for i, shard in enumerate(shards, 1):
+        count = '?' if shard.count is None else shard.count
+        print(f"{i:>3}. {shard.label:<32} {count:>6}  {shard.url}")
+    print(f"{len(shards)} shards, {planner.probes} pages fetched")
+
+
+if __name__ == "__main__":
+    main()
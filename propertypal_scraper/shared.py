@@ -0,0 +1,62 @@
+"""Resources kept warm across crawls run in one process.
+
+Normally every crawl opens its own geocoding service, FlareSolverr session
+and dedup index and closes them when it finishes. The scheduler daemon runs
+many crawls in one process, so it turns sharing on: the first crawl creates
+each resource, later crawls reuse it, and the daemon closes everything when
+it stops.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_enabled = False
+_resources: Dict[Hashable, Tuple[Any, Optional[Callable[[Any], None]]]] = {}
+_lock = threading.Lock()
+_key_locks: Dict[Hashable, threading.Lock] = {}
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def acquire(key: Hashable, factory: Callable[[], Any], close: Optional[Callable[[Any], None]] = None) -> Any:
+    """``factory()``, or the resource an earlier crawl created for ``key`` while sharing is on.
+
+    ``close`` is called on the resource by close_all(). A factory returning
+    None is not cached, so the next crawl tries again. Safe to call from
+    worker threads: crawls asking for the same key wait for one factory call.
+    """
+    if not _enabled:
+        return factory()
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        if key not in _resources:
+            resource = factory()
+            if resource is None:
+                return None
+            _resources[key] = (resource, close)
+        return _resources[key][0]
+
+
+def release(key: Hashable, resource: Any, close: Callable[[Any], None]) -> None:
+    """End of a crawl: close ``resource`` unless it is shared under ``key``."""
+    if resource is None:
+        return
+    if _enabled and key in _resources and _resources[key][0] is resource:
+        return
+    close(resource)
+
+
+def close_all() -> None:
+    """Close every shared resource (daemon shutdown)."""
+    while _resources:
+        _, (resource, close) = _resources.popitem()
+        if close:
+            close(resource)
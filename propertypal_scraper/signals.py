@@ -0,0 +1,13 @@
+"""Custom signals sent by the spider for pipelines and extensions to hook into."""
+
+# Sent from search result pages for each listing card with a visible address.
+# Arguments: spider, property_id, address
+card_address_found = object()
+
+# Sent by ExportPipeline after a job checkpoint (export offsets plus finished
+# pages) has been committed. Arguments: spider, checkpoint
+job_checkpoint = object()
+
+# Sent by FrontierMiddleware when a page of a distributed crawl yielded no
+# items, so nothing else will finish it. Arguments: spider, response
+frontier_page_done = object()
@@ -0,0 +1,665 @@
+"""Local PropertyPal and FlareSolverr simulator for end-to-end load tests.
+
+One HTTP server plays both parts:
+
+- POST /v1 is a fake FlareSolverr (sessions.create, sessions.destroy,
+  request.get). Each solve holds one of ``--slots`` browser slots for
+  ``--latency`` +/- ``--jitter`` seconds. A ``--challenge-rate`` fraction of
+  requests meet a Cloudflare challenge, which adds ``--challenge-latency``. A
+  ``--error-rate`` fraction fail the way FlareSolverr does (HTTP 500,
+  ``status: error``)
+- GET on any other path is the site itself, rendered from a synthetic
+  catalogue of ``--listings`` listings in PropertyPal's markup. Search pages
+  take both URL styles, with pagination in the same style and the result
+  count in the heading (what the shard planner reads):
+
+      /property-for-sale/belfast/bedrooms-2-6/price-100000-140000/sort-dateHigh[/page-N]
+      /search?sta=forSale&term=belfast&min=100000&max=140000&minbeds=2&maxbeds=6[&page=N]
+
+  Requests that don't go through the fake FlareSolverr get a 403 challenge
+  page, as Cloudflare would give them, unless the server is started with
+  ``--open``
+- GET /_sim/stats returns request, error and challenge counts and solve
+  latency percentiles
+
+The catalogue is the same for the same ``--seed`` and ``--listings``.
+FlareSolverr renders pages by path whatever their host, so start crawls at
+the simulator's own URL: a failed solve then falls through to the simulator,
+not to the real site.
+
+Usage:
+    python -m propertypal_scraper.simulator serve --port 8192 --listings 2000 --latency 1.5
+    python -m propertypal_scraper.simulator bench --listings 200 --latency 0.2 --error-rate 0.02
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from propertypal_scraper.utils import slugify
+
+PAGE_SIZE = 20
+
+# Town, postcode districts, streets
+TOWNS = [
+    ('Belfast', ['BT1', 'BT4', 'BT5', 'BT6', 'BT7', 'BT9', 'BT12', 'BT14', 'BT15'],
+     ['Ormeau Road', 'Lisburn Road', 'Cregagh Road', 'Antrim Road', 'Castlereagh Street', 'Donegall Avenue']),
+    ('Lisburn', ['BT27', 'BT28'], ['Hillsborough Road', 'Belfast Road', 'Antrim Street']),
+    ('Bangor', ['BT19', 'BT20'], ['Abbey Street', 'Seacliff Road', 'Clandeboye Road']),
+    ('Newry', ['BT34', 'BT35'], ['Canal Street', 'Armagh Road', 'Dublin Road']),
+    ('Derry', ['BT47', 'BT48'], ['Strand Road', 'Culmore Road', 'Northland Road']),
+]
+TYPES = ['Terrace House', 'Semi-detached House', 'Detached House', 'Apartment', 'Townhouse', 'Bungalow']
+HEATING = ['Gas', 'Oil', 'Economy 7', 'Air Source Heat Pump']
+EPC = ['B81/B84', 'C72/C78', 'C69/B82', 'D61/C74', 'E50/C70']
+FEATURES = [
+    'Double glazing throughout', 'Gas fired central heating', 'Enclosed rear garden', 'Off-street parking',
+    'Close to local amenities', 'Recently refurbished kitchen', 'Modern bathroom suite', 'Chain free',
+    'Within walking distance of the city centre', 'Excellent transport links',
+]
+ROOMS = ['Entrance Hall', 'Lounge', 'Kitchen / Dining', 'Bedroom 1', 'Bedroom 2', 'Bathroom', 'Utility Room']
+
+CHALLENGE_PAGE = (
+    '<!DOCTYPE html><html><head><title>Just a moment...</title></head>'
+    '<body><h1>Checking if the site connection is secure</h1>'
+    '<p>www.propertypal.com needs to review the security of your connection before proceeding.</p></body></html>'
+)
+
+
+@dataclass(frozen=True)
+class Listing:
+    property_id: int
+    street: str
+    town: str
+    postcode: str
+    price: Optional[int]
+    bedrooms: int
+    bathrooms: int
+    receptions: int
+    property_type: str
+
+    @property
+    def path(self) -> str:
+        return f"/{slugify(f'{self.street} {self.town}')}/{self.property_id}"
+
+    @property
+    def address(self) -> str:
+        return f"{self.street}, {self.town}, {self.postcode}"
+
+
+def build_catalogue(listings: int, seed: int = 1) -> List[Listing]:
+    """``listings`` synthetic listings, newest (highest id) first."""
+    rng = random.Random(seed)
+    catalogue = []
+    for i in range(listings):
+        town, districts, streets = TOWNS[min(int(rng.paretovariate(1.2)) - 1, len(TOWNS) - 1)]
+        bedrooms = rng.choices([1, 2, 3, 4, 5, 6], weights=[8, 25, 35, 20, 8, 4])[0]
+        # Roughly lognormal around £180k, more per bedroom; a few price on application
+        price = None
+        if rng.random() > 0.03:
+            price = int(rng.lognormvariate(11.6 + 0.12 * bedrooms, 0.35)) // 500 * 500
+        catalogue.append(Listing(
+            property_id=1000000 + listings - i,
+            street=f"{rng.randint(1, 180)} {rng.choice(streets)}",
+            town=town,
+            postcode=f"{rng.choice(districts)} {rng.randint(1, 9)}{rng.choice('ABDEFGHJLNPQRSTUWXYZ')}"
+                     f"{rng.choice('ABDEFGHJLNPQRSTUWXYZ')}",
+            price=price,
+            bedrooms=bedrooms,
+            bathrooms=max(1, bedrooms // 2 + rng.randint(0, 1)),
+            receptions=rng.randint(1, 3),
+            property_type=rng.choice(TYPES),
+        ))
+    return catalogue
+
+
+@dataclass
+class SearchQuery:
+    location: Optional[str] = None
+    price: Tuple[Optional[int], Optional[int]] = (None, None)
+    bedrooms: Tuple[Optional[int], Optional[int]] = (None, None)
+    sort: str = 'dateHigh'
+    page: int = 1
+    query_style: bool = False
+
+
+def parse_search(url: str) -> Optional[SearchQuery]:
+    """Search parameters of a path- or query-style search URL; None for other pages."""
+    parts = urlsplit(url)
+    if parts.path.rstrip('/') == '/search':
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+
+        def number(name):
+            value = params.get(name, '')
+            return int(value) if value.isdigit() else None
+
+        return SearchQuery(
+            location=params.get('term'),
+            price=(number('min'), number('max')),
+            bedrooms=(number('minbeds'), number('maxbeds')),
+            sort=params.get('sort', 'dateHigh'),
+            page=number('page') or 1,
+            query_style=True,
+        )
+
+    segments = [s for s in parts.path.split('/') if s]
+    if not segments or segments[0] != 'property-for-sale':
+        return None
+    query = SearchQuery()
+    for segment in segments[1:]:
+        ranged = re.fullmatch(r'(bedrooms|price)-(\d+)-(\d+)', segment)
+        if ranged:
+            setattr(query, ranged.group(1), (int(ranged.group(2)), int(ranged.group(3))))
+        elif segment.startswith('sort-'):
+            query.sort = segment[len('sort-'):]
+        elif re.fullmatch(r'page-\d+', segment):
+            query.page = int(segment[len('page-'):])
+        else:
+            query.location = segment
+    return query
+
+
+class SimulatedSite:
+    """Renders search and detail pages of the catalogue."""
+
+    def __init__(self, catalogue: List[Listing]):
+        self.catalogue = catalogue
+        self.by_id = {listing.property_id: listing for listing in catalogue}
+
+    def matches(self, listing: Listing, query: SearchQuery) -> bool:
+        location = (query.location or '').replace('-', ' ').lower()
+        if location and location != 'northern ireland' and not (
+            location == listing.town.lower() or listing.postcode.lower().startswith(location)
+        ):
+            return False
+        low, high = query.price
+        if low is not None or high is not None:
+            # A price filter leaves out listings without a price
+            if listing.price is None:
+                return False
+            if (low is not None and listing.price < low) or (high is not None and listing.price > high):
+                return False
+        low, high = query.bedrooms
+        return (low is None or listing.bedrooms >= low) and (high is None or listing.bedrooms <= high)
+
+    def search(self, query: SearchQuery) -> List[Listing]:
+        results = [listing for listing in self.catalogue if self.matches(listing, query)]
+        if query.sort == 'priceAsc':
+            results.sort(key=lambda listing: (listing.price is None, listing.price or 0))
+        elif query.sort in ('priceDesc', 'priceHigh'):
+            results.sort(key=lambda listing: -(listing.price or 0))
+        return results
+
+    def render(self, url: str) -> Tuple[int, str]:
+        """(status, html) of ``url``."""
+        query = parse_search(url)
+        if query is not None:
+            return 200, self.render_search(url, query)
+        match = re.search(r'/(\d+)/?$', urlsplit(url).path)
+        listing = self.by_id.get(int(match.group(1))) if match else None
+        if listing is None:
+            return 404, '<html><body><h1>Page not found</h1></body></html>'
+        return 200, self.render_listing(listing)
+
+    def render_search(self, url: str, query: SearchQuery) -> str:
+        results = self.search(query)
+        pages = max(1, -(-len(results) // PAGE_SIZE))
+        shown = results[(query.page - 1) * PAGE_SIZE:query.page * PAGE_SIZE]
+        parts = urlsplit(url)
+
+        def page_url(page):
+            if query.query_style:
+                params = re.sub(r'&?page=\d+', '', parts.query).lstrip('&')
+                return f"{parts.path}?{params}{'&' if params else ''}page={page}"
+            path = re.sub(r'/page-\d+', '', parts.path.rstrip('/'))
+            return path if page == 1 else f"{path}/page-{page}"
+
+        where = (query.location or 'Northern Ireland').replace('-', ' ').title()
+        cards = ''.join(
+            f'<li class="pp-property-box"><a href="{listing.path}">'
+            f'<h2 class="pp-property-box-address">{escape(listing.address)}</h2></a>'
+            f'<p class="pp-property-box-price">{self._price(listing)}</p>'
+            f'<p>{listing.bedrooms} Bed {listing.property_type}</p></li>'
+            for listing in shown
+        )
+        nav = ''.join(f'<a href="{escape(page_url(page))}">{page}</a>' for page in range(1, pages + 1))
+        return (
+            f'<!DOCTYPE html><html><head><title>Property for sale in {where}</title></head><body>'
+            f'<h1>{len(results):,} Properties for sale in {escape(where)}</h1>'
+            f'<ul class="pp-property-list">{cards}</ul><nav class="pp-pagination">{nav}</nav></body></html>'
+        )
+
+    def render_listing(self, listing: Listing) -> str:
+        rng = random.Random(listing.property_id)
+        size = rng.randint(45, 40 + 35 * listing.bedrooms)
+        features = rng.sample(FEATURES, 5)
+        rooms = ''.join(
+            f'<dl><dt>{room}</dt><dd>{rng.randint(3, 6)}.{rng.randint(0, 9)}m x '
+            f'{rng.randint(2, 5)}.{rng.randint(0, 9)}m</dd></dl>'
+            for room in ROOMS[:3 + listing.bedrooms]
+        )
+        mortgage = f'£{int((listing.price or 150000) * 0.9 * 0.0055):,} per month'
+        summary = ''.join(
+            f'<div><p><span>{label}</span></p><p><span>{value}</span></p></div>'
+            for label, value in [
+                ('Size', f'{size} sq m ({size * 10.764:.1f} sq ft)'),
+                ('Tenure', rng.choice(['Freehold', 'Leasehold'])),
+                ('Heating', rng.choice(HEATING)),
+                ('Rates', f'£{rng.randint(700, 2400):,} pa*'),
+            ]
+        )
+        description = ' '.join(
+            rng.choice(['A well presented', 'A deceptively spacious', 'An attractive', 'A much loved'])
+            + f' {listing.bedrooms} bedroom {listing.property_type.lower()} on {listing.street}.'
+            for _ in range(3)
+        )
+        return (
+            f'<!DOCTYPE html><html><head><title>{escape(listing.address)}</title></head><body>'
+            f'<h1 class="sc-558be35d-0">{escape(listing.street)}</h1>'
+            f'<p class="sc-558be35d-5 dhUdB">{listing.town}, {listing.postcode}</p>'
+            f'<p class="sc-558be35d-5 fmPVlC">{listing.bedrooms} Bed {listing.property_type}</p>'
+            f'<strong class="pp-property-price-bold">{self._price(listing)}</strong>'
+            f'<div class="pp-property-summary">'
+            f'<span class="pp-summary-icon-beds"></span><p class="sc-558be35d-5">{listing.bedrooms} Bedrooms</p>'
+            f'<span class="pp-summary-icon-receptions"></span><p class="sc-558be35d-5">{listing.receptions} Receptions</p>'
+            f'<span class="pp-summary-icon-baths"></span><p class="sc-558be35d-5">{listing.bathrooms} Bathrooms</p>'
+            f'{summary}'
+            f'<div><p>Energy Rating</p><p><button>{rng.choice(EPC)}</button></p></div>'
+            f'<div><p>Typical Mortgage</p><p><button>{mortgage}</button></p></div>'
+            f'</div>'
+            f'<div class="pp-property-description"><p>{escape(description)}</p>'
+            f'<ul>{"".join(f"<li>{feature}</li>" for feature in features)}</ul>{rooms}</div>'
+            f'<h2>Directions</h2><p>Travelling along {escape(listing.street.split(" ", 1)[1])}, '
+            f'the property is on the left.</p></body></html>'
+        )
+
+    @staticmethod
+    def _price(listing: Listing) -> str:
+        return f'Offers around £{listing.price:,}' if listing.price else 'Price on application'
+
+
+class FakeFlareSolverr:
+    """Solve latency, challenges and errors of a FlareSolverr instance (see module docstring)."""
+
+    def __init__(self, site: SimulatedSite, slots: int = 1, latency: float = 1.0, jitter: float = 0.0,
+                 challenge_rate: float = 0.0, challenge_latency: float = 5.0, error_rate: float = 0.0,
+                 seed: int = 1):
+        self.site = site
+        self.slots = threading.Semaphore(slots)
+        self.latency = latency
+        self.jitter = jitter
+        self.challenge_rate = challenge_rate
+        self.challenge_latency = challenge_latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.sessions = set()
+        self.stats = {'requests': 0, 'solved': 0, 'errors': 0, 'challenges': 0, 'direct': 0}
+        self.solve_seconds: List[float] = []
+
+    def handle(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        cmd = payload.get('cmd')
+        if cmd == 'sessions.create':
+            session = payload.get('session') or str(uuid.uuid4())
+            with self.lock:
+                self.sessions.add(session)
+            return 200, {'status': 'ok', 'message': 'Session created successfully.', 'session': session}
+        if cmd == 'sessions.destroy':
+            with self.lock:
+                self.sessions.discard(payload.get('session'))
+            return 200, {'status': 'ok', 'message': 'The session has been removed.'}
+        if cmd == 'sessions.list':
+            with self.lock:
+                return 200, {'status': 'ok', 'sessions': sorted(self.sessions)}
+        if cmd == 'request.get':
+            return self.solve(payload.get('url', ''))
+        return 500, {'status': 'error', 'message': f'Error: Request parameter \'cmd\' = \'{cmd}\' is invalid.'}
+
+    def solve(self, url: str) -> Tuple[int, Dict[str, Any]]:
+        started = time.time()
+        with self.lock:
+            self.stats['requests'] += 1
+            delay = max(0.0, self.rng.uniform(self.latency - self.jitter, self.latency + self.jitter))
+            challenged = self.rng.random() < self.challenge_rate
+            failed = self.rng.random() < self.error_rate
+        if challenged:
+            delay += self.challenge_latency
+        with self.slots:
+            time.sleep(delay)
+            status, html = self.site.render(url)
+        elapsed = time.time() - started
+
+        with self.lock:
+            self.solve_seconds.append(elapsed)
+            self.stats['challenges'] += challenged
+            self.stats['errors' if failed else 'solved'] += 1
+        if failed:
+            return 500, {'status': 'error', 'message': f'Error: Error solving the challenge. Timeout after {elapsed:.1f} seconds.'}
+        return 200, {
+            'status': 'ok',
+            'message': 'Challenge solved!' if challenged else 'Challenge not detected!',
+            'solution': {
+                'url': url, 'status': status, 'headers': {}, 'response': html, 'cookies': [],
+                'userAgent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36',
+            },
+            'startTimestamp': int(started * 1000),
+            'endTimestamp': int(time.time() * 1000),
+            'version': 'simulator',
+        }
+
+    def report(self) -> Dict[str, Any]:
+        with self.lock:
+            seconds = sorted(self.solve_seconds)
+            return dict(self.stats, solve_ms={
+                f'p{q}': round(percentile(seconds, q / 100) * 1000, 1) for q in (50, 90, 99)
+            })
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted ``values`` (0 if empty)."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(q * len(values) + 0.5)) - 1))]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/_sim/stats':
+            self._send(200, json.dumps(self.server.flaresolverr.report()), 'application/json')
+            return
+        with self.server.flaresolverr.lock:
+            self.server.flaresolverr.stats['direct'] += 1
+        if not self.server.open_site:
+            self._send(403, CHALLENGE_PAGE)
+            return
+        status, html = self.server.site.render(self.path)
+        self._send(status, html)
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/v1':
+            self._send(404, '{"status": "error", "message": "Not found"}', 'application/json')
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self._send(400, '{"status": "error", "message": "Invalid JSON"}', 'application/json')
+            return
+        status, body = self.server.flaresolverr.handle(payload)
+        self._send(status, json.dumps(body), 'application/json')
+
+    def _send(self, status: int, body: str, content_type: str = 'text/html; charset=utf-8'):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SimulatorServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, site: SimulatedSite, flaresolverr: FakeFlareSolverr, open_site: bool = False):
+        super().__init__(address, _Handler)
+        self.site = site
+        self.flaresolverr = flaresolverr
+        self.open_site = open_site
+
+
+def build_server(args) -> SimulatorServer:
+    site = SimulatedSite(build_catalogue(args.listings, args.seed))
+    flaresolverr = FakeFlareSolverr(
+        site, slots=args.slots, latency=args.latency, jitter=args.jitter, challenge_rate=args.challenge_rate,
+        challenge_latency=args.challenge_latency, error_rate=args.error_rate, seed=args.seed
+    )
+    return SimulatorServer((args.host, args.port), site, flaresolverr, open_site=args.open)
+
+
+# Benchmark
+
+class LatencyRecorder:
+    """Downloader middleware (first in line) recording page and item latency for ``bench``.
+
+    Page latency runs from the request entering the downloader middlewares
+    to its response coming back (FlareSolverr's solve included); item
+    latency until the item has left the item pipelines. Sets bench/* stats.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.page_seconds: List[float] = []
+        self.item_seconds: List[float] = []
+        self.first_request = None
+        self.last_item = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        from scrapy import signals
+
+        recorder = cls(crawler)
+        crawler.signals.connect(recorder.response_received, signal=signals.response_received)
+        crawler.signals.connect(recorder.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(recorder.spider_closed, signal=signals.spider_closed)
+        return recorder
+
+    def process_request(self, request, spider):
+        now = time.perf_counter()
+        request.meta.setdefault('bench_started', now)
+        if self.first_request is None:
+            self.first_request = now
+
+    def response_received(self, response, request, spider):
+        started = request.meta.get('bench_started')
+        if started is not None:
+            self.page_seconds.append(time.perf_counter() - started)
+
+    def item_scraped(self, item, response, spider):
+        self.last_item = time.perf_counter()
+        started = response.meta.get('bench_started') if response is not None else None
+        if started is not None:
+            self.item_seconds.append(self.last_item - started)
+
+    def spider_closed(self, spider):
+        stats = self.crawler.stats
+        if self.first_request is not None and self.last_item is not None:
+            stats.set_value('bench/seconds', round(self.last_item - self.first_request, 3))
+        for name, values in (('page', sorted(self.page_seconds)), ('item', sorted(self.item_seconds))):
+            for q in (50, 90, 99):
+                stats.set_value(f'bench/{name}_ms_p{q}', round(percentile(values, q / 100) * 1000, 1))
+            stats.set_value(f'bench/{name}_ms_max', round(values[-1] * 1000, 1) if values else 0.0)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _simulator_args(args) -> List[str]:
+    return [
+        '--listings', str(args.listings), '--seed', str(args.seed), '--slots', str(args.slots),
+        '--latency', str(args.latency), '--jitter', str(args.jitter),
+        '--challenge-rate', str(args.challenge_rate), '--challenge-latency', str(args.challenge_latency),
+        '--error-rate', str(args.error_rate),
+    ] + (['--open'] if args.open else [])
+
+
+def bench(args) -> Dict[str, Any]:
+    """Run the real spider and pipelines against a simulator subprocess; returns the report."""
+    import requests
+
+    port = _free_port()
+    base = f'http://127.0.0.1:{port}'
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'propertypal_scraper.simulator', 'serve', '--host', '127.0.0.1',
+         '--port', str(port)] + _simulator_args(args),
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    workdir = tempfile.mkdtemp(prefix='propertypal-bench-')
+    cwd = os.getcwd()
+    try:
+        for _ in range(100):
+            try:
+                requests.get(f'{base}/_sim/stats', timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.1)
+
+        if args.style == 'query':
+            url = f'{base}/search?sta=forSale&term={args.location}&min={args.min_price}&max={args.max_price}'
+        else:
+            url = f'{base}/property-for-sale/{args.location}/price-{args.min_price}-{args.max_price}/sort-dateHigh'
+
+        # Outputs and state go to a scratch directory; no geocoding or ratings; per-stage timing on
+        os.environ.update({
+            'SCRAPY_SETTINGS_MODULE': 'propertypal_scraper.settings',
+            'FLARESOLVERR_URL': f'{base}/v1',
+            'DESTINATION': '',
+            'PIPELINE_PROFILING': 'true',
+        })
+        os.chdir(workdir)
+        from scrapy.crawler import CrawlerProcess
+        from scrapy.utils.project import get_project_settings
+
+        settings = get_project_settings()
+        downloader_middlewares = dict(settings.getdict('DOWNLOADER_MIDDLEWARES'))
+        downloader_middlewares.update({
+            'propertypal_scraper.simulator.LatencyRecorder': 1,
+            # Simulator URLs are on 127.0.0.1, not propertypal.com
+            'scrapy.downloadermiddlewares.offsite.OffsiteMiddleware': None,
+        })
+        settings.setdict({
+            'DOWNLOADER_MIDDLEWARES': downloader_middlewares,
+            'DOWNLOAD_DELAY': args.delay,
+            'CONCURRENT_REQUESTS': args.concurrency,
+            'LOG_LEVEL': 'INFO' if args.verbose else 'WARNING',
+        }, priority='cmdline')
+        if args.limit:
+            settings.set('CLOSESPIDER_ITEMCOUNT', args.limit, priority='cmdline')
+
+        process = CrawlerProcess(settings)
+        crawler = process.create_crawler('property_spider')
+        process.crawl(crawler, url=url, search='Benchmark', use_perplexity='false')
+        process.start()
+        stats = crawler.stats.get_stats()
+        simulator = requests.get(f'{base}/_sim/stats', timeout=5).json()
+    finally:
+        os.chdir(cwd)
+        server.terminate()
+        server.wait()
+        if args.keep:
+            print(f"Outputs kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    items = stats.get('item_scraped_count', 0)
+    seconds = stats.get('bench/seconds') or 0.0
+    return {
+        'url': url,
+        'items': items,
+        'pages': stats.get('response_received_count', 0),
+        'seconds': seconds,
+        'items_per_second': round(items / seconds, 2) if seconds else 0.0,
+        'page_ms': {key.split('_')[-1]: value for key, value in stats.items() if key.startswith('bench/page_ms')},
+        'item_ms': {key.split('_')[-1]: value for key, value in stats.items() if key.startswith('bench/item_ms')},
+        'responses': {
+            key.rsplit('/', 1)[-1]: value for key, value in stats.items()
+            if key.startswith('downloader/response_status_count/')
+        },
+        'pipeline_wall_seconds': {
+            key.split('/')[1]: value for key, value in stats.items()
+            if key.startswith('pipeline/') and key.endswith('/wall_seconds')
+        },
+        'simulator': simulator,
+        'finish_reason': stats.get('finish_reason'),
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    def ms(values):
+        return ', '.join(f"{name} {value:.0f} ms" for name, value in values.items())
+
+    simulator = report['simulator']
+    print(f"Search:      {report['url']}")
+    print(f"Items:       {report['items']} in {report['seconds']:.1f}s = {report['items_per_second']:.2f} items/s "
+          f"({report['pages']} pages, {report['finish_reason']})")
+    print(f"Page latency: {ms(report['page_ms'])}")
+    print(f"Item latency: {ms(report['item_ms'])}")
+    print(f"Responses:   {', '.join(f'{status}: {count}' for status, count in sorted(report['responses'].items()))}")
+    print(f"FlareSolverr: {simulator['requests']} solves, {simulator['challenges']} challenges, "
+          f"{simulator['errors']} errors, {simulator['direct']} direct requests; solve {ms(simulator['solve_ms'])}")
+    stages = sorted(report['pipeline_wall_seconds'].items(), key=lambda stage: -stage[1])
+    print(f"Pipelines:   {', '.join(f'{name} {seconds:.2f}s' for name, seconds in stages)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local PropertyPal + FlareSolverr simulator")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help="Run the simulator")
+    run = commands.add_parser('bench', help="Crawl the simulator with the real spider and report throughput")
+    for command in (serve, run):
+        command.add_argument('--listings', type=int, default=500, help="Listings in the catalogue")
+        command.add_argument('--seed', type=int, default=1, help="Catalogue and randomness seed")
+        command.add_argument('--slots', type=int, default=1, help="Requests FlareSolverr solves at once")
+        command.add_argument('--latency', type=float, default=1.0, help="Seconds per solve")
+        command.add_argument('--jitter', type=float, default=0.0, help="+/- seconds around --latency")
+        command.add_argument('--challenge-rate', type=float, default=0.0, help="Fraction of solves meeting a challenge")
+        command.add_argument('--challenge-latency', type=float, default=5.0, help="Extra seconds per challenge")
+        command.add_argument('--error-rate', type=float, default=0.0, help="Fraction of solves that fail")
+        command.add_argument('--open', action='store_true', help="Serve pages to direct requests too (no 403)")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8192)
+    run.add_argument('--style', choices=['path', 'query'], default='path', help="Search URL style")
+    run.add_argument('--location', default='belfast', help="Town, postcode district or northern-ireland")
+    run.add_argument('--min-price', type=int, default=0)
+    run.add_argument('--max-price', type=int, default=10000000)
+    run.add_argument('--concurrency', type=int, default=4, help="CONCURRENT_REQUESTS")
+    run.add_argument('--delay', type=float, default=0.0, help="DOWNLOAD_DELAY")
+    run.add_argument('--limit', type=int, help="Stop after this many items")
+    run.add_argument('--json', help="Also write the report to this file")
+    run.add_argument('--keep', action='store_true', help="Keep the crawl's outputs")
+    run.add_argument('--verbose', action='store_true', help="Show the crawl log")
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        server = build_server(args)
+        print(f"Simulating {args.listings} listings on http://{args.host}:{args.port} "
+              f"(FlareSolverr at http://{args.host}:{args.port}/v1)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    report = bench(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,21 @@
 import scrapy
-from propertypal_scraper.items import PropertyListing
+from propertypal_scraper.checkpoint import JobCheckpoint
+from propertypal_scraper.items import PropertyListing, PropertyRecord
+from propertypal_scraper.signals import card_address_found
+from propertypal_scraper.utils import slugify, search_name_from_url
 import re
 
 
 class PropertySpider(scrapy.Spider):
     name = "property_spider"
     allowed_domains = ["propertypal.com"]
-    def __init__(self, url=None, use_perplexity='false', *args, **kwargs):
+    def __init__(self, url=None, use_perplexity='false', search=None, job=None, shard=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # Resumable job: the checkpoint remembers the search it was started with
+        self.checkpoint = JobCheckpoint.for_job(job) if job else None
+        if self.checkpoint:
+            url, search = self._job_search(url, search)
+
         # Set start_urls from parameter or use default
         if url:
             self.start_urls = [url]
@@ -18,8 +26,33 @@ class PropertySpider(scrapy.Spider):
             ]
         # Convert string to boolean
         self.use_perplexity = use_perplexity.lower() in ('true', '1', 'yes', 'on')
+        # Search name (from urls.json) used to partition outputs per search
+        self.search_name = search or search_name_from_url(self.start_urls[0])
+        self.search_slug = slugify(self.search_name)
+        # Part of a sharded search (see sharding.py): exports are named after the shard
+        self.shard = shard
+        self.logger.info(f"Search: {self.search_name}" + (f" (shard {shard})" if shard else ''))
         self.logger.info(f"Starting URL: {self.start_urls[0]}")
         self.logger.info(f"Perplexity rating enabled: {self.use_perplexity}")
+        if self.checkpoint:
+            self.checkpoint.set('url', self.start_urls[0])
+            self.checkpoint.set('search', self.search_name)
+            self.logger.info(f"Job: {self.checkpoint.job} ({self.checkpoint.path})")
+
+    def _job_search(self, url, search):
+        """URL and search name of the job; a restarted job keeps its original ones."""
+        job_url, job_search = self.checkpoint.get('url'), self.checkpoint.get('search')
+        if job_url is None:
+            return url, search
+        if url and url != job_url:
+            self.logger.warning(f"Job '{self.checkpoint.job}' was started for {job_url}; ignoring url={url}")
+        return job_url, job_search
+
+    def closed(self, reason):
+        if self.checkpoint:
+            done, pending = self.checkpoint.counts()
+            self.logger.info(f"Job '{self.checkpoint.job}' {reason}: {done} pages done, {pending} pending")
+            self.checkpoint.close()
 
     def parse(self, response):
         """Parse search results page"""
@@ -35,6 +68,9 @@ class PropertySpider(scrapy.Spider):
 
         self.logger.info(f"Found {len(property_links)} property links")
 
+        # Let the geocoder start on card addresses while detail pages download
+        self.announce_card_addresses(response)
+
         for link in property_links:
             yield response.follow(link, callback=self.parse_property)
 
@@ -76,6 +112,33 @@ class PropertySpider(scrapy.Spider):
         else:
             self.logger.info("No pagination found")
 
+    def announce_card_addresses(self, response):
+        """Send the address shown on each search result card as a signal"""
+        cards = (
+            response.css('li.pp-property-box') or
+            response.css('li[class*="property-box"]')
+        )
+
+        for card in cards:
+            link = card.css('a::attr(href)').get()
+            if not link:
+                continue
+
+            address_parts = (
+                card.css('[class*="address"] ::text').getall() or
+                card.css('h2 ::text').getall()
+            )
+            address = ' '.join(part.strip() for part in address_parts if part.strip())
+            if not address:
+                continue
+
+            self.crawler.signals.send_catch_log(
+                signal=card_address_found,
+                spider=self,
+                property_id=link.rstrip('/').split('/')[-1],
+                address=address
+            )
+
     def parse_property(self, response):
         """Parse individual property detail page"""
         self.logger.info(f"Parsing property: {response.url}")
@@ -185,30 +248,35 @@ class PropertySpider(scrapy.Spider):
         rates = rates_elem.strip() if rates_elem else None
 
         # Extract description
-        description_html = response.css('.pp-property-description').get()
         description = response.css('.pp-property-description *::text').getall()
         description_text = ' '.join([text.strip() for text in description if text.strip()])
 
-        # Extract additional info (bullet points)
-        additional_info_items = response.css('.pp-property-description ul li::text').getall()
-        additional_info = '\n'.join([f"• {item.strip()}" for item in additional_info_items if item.strip()])
-
-        # Extract features
+        # Extract features (bullet points)
         features = response.css('.pp-property-description ul li::text').getall()
         features_clean = [feat.strip() for feat in features if feat.strip()]
 
+        # Fields in SPIDER_SKIP_FIELDS aren't extracted (memory-bounded crawls)
+        skip_fields = self.settings.getlist('SPIDER_SKIP_FIELDS')
+
+        # Additional info: the same bullet points, as one string
+        additional_info = None
+        if 'additional_info' not in skip_fields:
+            additional_info = '\n'.join([f"• {feat}" for feat in features_clean])
+
         # Extract room details (from description sections)
         room_details = []
-        room_sections = response.css('.pp-property-description dl')
-        for section in room_sections:
-            room_name = section.css('dt::text').get()
-            room_desc = section.css('dd::text').get()
-            if room_name:
-                room_details.append(f"{room_name.strip()}: {room_desc.strip() if room_desc else ''}")
+        if 'room_details' not in skip_fields:
+            for section in response.css('.pp-property-description dl'):
+                room_name = section.css('dt::text').get()
+                room_desc = section.css('dd::text').get()
+                if room_name:
+                    room_details.append(f"{room_name.strip()}: {room_desc.strip() if room_desc else ''}")
 
         # Extract directions
-        directions_section = response.xpath('//h2[contains(text(), "Directions")]/following-sibling::p//text()').getall()
-        directions = ' '.join([d.strip() for d in directions_section if d.strip()])
+        directions = None
+        if 'directions' not in skip_fields:
+            directions_section = response.xpath('//h2[contains(text(), "Directions")]/following-sibling::p//text()').getall()
+            directions = ' '.join([d.strip() for d in directions_section if d.strip()])
 
         # Create PropertyListing item
         property_data = {
@@ -234,9 +302,13 @@ class PropertySpider(scrapy.Spider):
         }
 
         try:
-            # Validate with Pydantic model
-            listing = PropertyListing(**property_data)
-            yield listing.model_dump()
+            if self.settings.get('PROPERTY_VALIDATION') == 'full':
+                # Validate with Pydantic model
+                listing = PropertyListing(**property_data)
+                yield listing.model_dump()
+            else:
+                # Fast path: slotted record, converted once and updated in place by the pipelines
+                yield PropertyRecord.from_raw(property_data)
         except Exception as e:
             self.logger.error(f"Failed to create PropertyListing for {response.url}: {e}")
             self.logger.error(f"Data: {property_data}")
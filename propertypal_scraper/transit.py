@@ -0,0 +1,369 @@
+"""Public-transport commute times from a local GTFS timetable.
+
+The feed is loaded once from disk (zip or unpacked directory) for a single
+service date: the services calendar.txt runs on that weekday within their
+date range, plus and minus the exceptions calendar_dates.txt lists for the
+date. For each destination a reverse earliest-arrival profile is
+computed: the latest time you can leave every stop and still arrive by the
+configured arrival time. A property's commute is then the best walk to a nearby
+stop plus that stop's latest departure, so the whole run shares one scan.
+"""
+
+import csv
+import io
+import logging
+import math
+import os
+import zipfile
+from array import array
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from propertypal_scraper.routing import GridIndex, haversine_m
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+# Straight-line distance understates walking distance to and from stops
+WALK_DETOUR_FACTOR = 1.25
+
+NEG_INF = -(2 ** 62)
+
+
+def next_service_date(weekday: str, today: Optional[date] = None) -> date:
+    """Today if it is ``weekday``, else the next date that is."""
+    today = today or date.today()
+    return today + timedelta(days=(WEEKDAYS.index(weekday.lower()) - today.weekday()) % 7)
+
+
+def parse_gtfs_time(value: str) -> int:
+    """Parse a GTFS ``HH:MM:SS`` time (hours may exceed 24) into seconds."""
+    h, m, s = value.strip().split(':')
+    return int(h) * 3600 + int(m) * 60 + int(s)
+
+
+def parse_clock_time(value: str) -> int:
+    """Parse ``HH:MM`` or ``HH:MM:SS`` into seconds after midnight."""
+    parts = [int(p) for p in value.strip().split(':')]
+    while len(parts) < 3:
+        parts.append(0)
+    return parts[0] * 3600 + parts[1] * 60 + parts[2]
+
+
+class _FeedReader:
+    """Read GTFS tables from a zip archive or an unpacked directory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._zip = zipfile.ZipFile(path) if zipfile.is_zipfile(path) else None
+
+    def has(self, name: str) -> bool:
+        if self._zip:
+            return any(n.rsplit('/', 1)[-1] == name for n in self._zip.namelist())
+        return os.path.exists(os.path.join(self.path, name))
+
+    @contextmanager
+    def rows(self, name: str) -> Iterator[Tuple[Dict[str, int], Iterator[List[str]]]]:
+        """Yield ``(column_index, row_iterator)`` for a table."""
+        if self._zip:
+            member = next(n for n in self._zip.namelist() if n.rsplit('/', 1)[-1] == name)
+            raw = self._zip.open(member)
+            f = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+        else:
+            f = open(os.path.join(self.path, name), encoding='utf-8-sig', newline='')
+        try:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            yield {col.strip(): i for i, col in enumerate(header)}, reader
+        finally:
+            f.close()
+
+    def close(self) -> None:
+        if self._zip:
+            self._zip.close()
+
+
+class TransitNetwork:
+    """Timetable for one service date, stored as a flat connection list.
+
+    Connections (one vehicle hop between consecutive stops) are sorted by
+    departure time descending, which is the order the reverse scan needs.
+    Footpaths are stored by the stop they lead to: ``footpaths[t]`` lists
+    ``(s, seconds)`` for every walk from ``s`` to ``t``.
+    """
+
+    def __init__(
+        self,
+        stop_lats: array,
+        stop_lons: array,
+        connections: Tuple[array, array, array, array, array],
+        footpaths: List[List[Tuple[int, int]]],
+        trip_count: int
+    ):
+        self.stop_lats = stop_lats
+        self.stop_lons = stop_lons
+        self.dep_stop, self.dep_time, self.arr_stop, self.arr_time, self.trip = connections
+        self.footpaths = footpaths
+        self.trip_count = trip_count
+        self.stop_index = GridIndex(stop_lats, stop_lons)
+
+    @property
+    def stop_count(self) -> int:
+        return len(self.stop_lats)
+
+    @property
+    def connection_count(self) -> int:
+        return len(self.dep_time)
+
+    @classmethod
+    def from_gtfs(
+        cls,
+        path: str,
+        weekday: str = 'tuesday',
+        service_date: Optional[date] = None,
+        window: Optional[Tuple[int, int]] = None,
+        transfer_radius_m: float = 250.0,
+        walking_speed_kmh: float = 4.8
+    ) -> 'TransitNetwork':
+        """Load a GTFS feed for ``service_date``.
+
+        Args:
+            path: GTFS zip file or directory
+            weekday: Service day to load (monday..sunday) when no
+                ``service_date`` is given; its next date is used
+            service_date: Service date to load
+            window: Optional ``(start, end)`` seconds; connections departing
+                outside it are skipped to keep the scan small
+            transfer_radius_m: Stops closer than this get a walking transfer
+            walking_speed_kmh: Walking speed used for transfers
+        """
+        weekday = weekday.lower()
+        if weekday not in WEEKDAYS:
+            raise ValueError(f"Unknown weekday: {weekday}")
+        if service_date is None:
+            service_date = next_service_date(weekday)
+        weekday = WEEKDAYS[service_date.weekday()]
+        day = service_date.strftime('%Y%m%d')
+
+        feed = _FeedReader(path)
+        try:
+            # Stops
+            stop_ids: Dict[str, int] = {}
+            stop_lats = array('d')
+            stop_lons = array('d')
+            with feed.rows('stops.txt') as (cols, rows):
+                id_i, lat_i, lon_i = cols['stop_id'], cols['stop_lat'], cols['stop_lon']
+                for row in rows:
+                    if not row or not row[lat_i] or not row[lon_i]:
+                        continue
+                    stop_ids[row[id_i]] = len(stop_lats)
+                    stop_lats.append(float(row[lat_i]))
+                    stop_lons.append(float(row[lon_i]))
+
+            # Services running on the date; None loads every trip of a feed without a calendar
+            services = None
+            if feed.has('calendar.txt'):
+                services = set()
+                with feed.rows('calendar.txt') as (cols, rows):
+                    sid_i, day_i = cols['service_id'], cols[weekday]
+                    start_i, end_i = cols['start_date'], cols['end_date']
+                    for row in rows:
+                        if row and row[day_i].strip() == '1' and row[start_i].strip() <= day <= row[end_i].strip():
+                            services.add(row[sid_i])
+            if feed.has('calendar_dates.txt'):
+                services = services if services is not None else set()
+                with feed.rows('calendar_dates.txt') as (cols, rows):
+                    sid_i, date_i, type_i = cols['service_id'], cols['date'], cols['exception_type']
+                    for row in rows:
+                        if not row or row[date_i].strip() != day:
+                            continue
+                        # 1: service added for the date, 2: service removed
+                        if row[type_i].strip() == '1':
+                            services.add(row[sid_i])
+                        elif row[type_i].strip() == '2':
+                            services.discard(row[sid_i])
+            if services is not None and not services:
+                logger.warning(f"No GTFS services run on {service_date.isoformat()} in {path}")
+
+            # Trips of those services
+            trip_ids: Dict[str, int] = {}
+            with feed.rows('trips.txt') as (cols, rows):
+                tid_i, sid_i = cols['trip_id'], cols['service_id']
+                for row in rows:
+                    if row and (services is None or row[sid_i] in services):
+                        trip_ids[row[tid_i]] = len(trip_ids)
+
+            # Stop times -> consecutive-stop connections
+            trip_stops: Dict[int, List[Tuple[int, int, int, int]]] = {}
+            with feed.rows('stop_times.txt') as (cols, rows):
+                tid_i, sid_i = cols['trip_id'], cols['stop_id']
+                arr_i, dep_i, seq_i = cols['arrival_time'], cols['departure_time'], cols['stop_sequence']
+                for row in rows:
+                    if not row:
+                        continue
+                    trip = trip_ids.get(row[tid_i])
+                    stop = stop_ids.get(row[sid_i])
+                    if trip is None or stop is None or not row[dep_i] or not row[arr_i]:
+                        continue
+                    trip_stops.setdefault(trip, []).append(
+                        (int(row[seq_i]), stop, parse_gtfs_time(row[arr_i]), parse_gtfs_time(row[dep_i]))
+                    )
+
+            raw_connections = []
+            for trip, stops in trip_stops.items():
+                stops.sort()
+                for (seq, u, _, dep), (_, v, arr, _) in zip(stops, stops[1:]):
+                    if window and not (window[0] <= dep <= window[1]):
+                        continue
+                    raw_connections.append((dep, arr, seq, u, v, trip))
+            del trip_stops
+
+            raw_connections.sort(reverse=True)
+            connections = (
+                array('l', (c[3] for c in raw_connections)),
+                array('l', (c[0] for c in raw_connections)),
+                array('l', (c[4] for c in raw_connections)),
+                array('l', (c[1] for c in raw_connections)),
+                array('l', (c[5] for c in raw_connections)),
+            )
+            del raw_connections
+
+            footpaths = cls._build_footpaths(
+                feed, stop_ids, stop_lats, stop_lons, transfer_radius_m, walking_speed_kmh
+            )
+        finally:
+            feed.close()
+
+        network = cls(stop_lats, stop_lons, connections, footpaths, len(trip_ids))
+        logger.info(
+            f"Loaded GTFS feed {path} for {weekday} {service_date.isoformat()}: {network.stop_count} stops, "
+            f"{network.trip_count} trips, {network.connection_count} connections"
+        )
+        return network
+
+    @staticmethod
+    def _build_footpaths(feed, stop_ids, stop_lats, stop_lons, radius_m, walking_speed_kmh):
+        """Walking transfers between nearby stops, plus any from transfers.txt, indexed by target stop."""
+        speed_ms = walking_speed_kmh / 3.6
+        index = GridIndex(stop_lats, stop_lons)
+        footpaths: List[List[Tuple[int, int]]] = [[] for _ in range(len(stop_lats))]
+
+        for s in range(len(stop_lats)):
+            for t, d in index.within(stop_lats[s], stop_lons[s], radius_m):
+                if t != s:
+                    footpaths[s].append((t, int(d * WALK_DETOUR_FACTOR / speed_ms)))
+
+        if feed.has('transfers.txt'):
+            with feed.rows('transfers.txt') as (cols, rows):
+                from_i, to_i = cols['from_stop_id'], cols['to_stop_id']
+                time_i = cols.get('min_transfer_time')
+                type_i = cols.get('transfer_type')
+                for row in rows:
+                    if not row:
+                        continue
+                    # 3: transfers between these stops are not possible
+                    if type_i is not None and row[type_i].strip() == '3':
+                        continue
+                    s, t = stop_ids.get(row[from_i]), stop_ids.get(row[to_i])
+                    if s is None or t is None or s == t:
+                        continue
+                    seconds = int(row[time_i]) if time_i is not None and row[time_i] else 0
+                    footpaths[t].append((s, seconds))
+        return footpaths
+
+
+class CommuteProfile:
+    """Latest departure from every stop that still reaches a destination on time.
+
+    Built with a single reverse connection scan (the scan-based sibling of
+    RAPTOR): connections are visited latest-first, and a connection is usable if
+    its trip is already known to reach the destination or its arrival stop can
+    still make it from there.
+    """
+
+    def __init__(
+        self,
+        network: TransitNetwork,
+        destination: Tuple[float, float],
+        arrival_time: int,
+        max_walk_m: float = 800.0,
+        walking_speed_kmh: float = 4.8,
+        min_transfer_seconds: int = 120
+    ):
+        self.network = network
+        self.destination = destination
+        self.arrival_time = arrival_time
+        self.max_walk_m = max_walk_m
+        self.walk_speed_ms = walking_speed_kmh / 3.6
+        self.min_transfer_seconds = min_transfer_seconds
+        self.latest = self._scan()
+
+    def _walk_seconds(self, distance_m: float) -> int:
+        return int(distance_m * WALK_DETOUR_FACTOR / self.walk_speed_ms)
+
+    def _scan(self) -> array:
+        net = self.network
+        slack = self.min_transfer_seconds
+
+        # Latest arrival at each stop that still makes it by walking to the destination
+        final_walk = array('q', [NEG_INF]) * net.stop_count
+        for s, d in net.stop_index.within(self.destination[0], self.destination[1], self.max_walk_m):
+            final_walk[s] = self.arrival_time - self._walk_seconds(d)
+
+        # Latest departure from each stop when changing vehicles there
+        latest = array('q', [NEG_INF]) * net.stop_count
+        trip_ok = bytearray(net.trip_count)
+
+        dep_stop, dep_time, arr_stop, arr_time, trips = (
+            net.dep_stop, net.dep_time, net.arr_stop, net.arr_time, net.trip
+        )
+        footpaths = net.footpaths
+
+        for c in range(net.connection_count):
+            trip = trips[c]
+            v = arr_stop[c]
+            if not trip_ok[trip]:
+                arrive = arr_time[c]
+                if arrive > final_walk[v] and arrive + slack > latest[v]:
+                    continue
+                trip_ok[trip] = 1
+
+            u = dep_stop[c]
+            dep = dep_time[c]
+            if dep > latest[u]:
+                latest[u] = dep
+                # Walking to u from w first
+                for w, walk in footpaths[u]:
+                    if dep - walk > latest[w]:
+                        latest[w] = dep - walk
+
+        # A stop within walking distance of the destination can always walk
+        for s in range(net.stop_count):
+            if final_walk[s] > latest[s]:
+                latest[s] = final_walk[s]
+        return latest
+
+    def commute_seconds(self, coords: Tuple[float, float]) -> Optional[int]:
+        """Door-to-door travel time from ``coords`` arriving by the arrival time."""
+        best = None
+
+        direct_m = haversine_m(coords[0], coords[1], self.destination[0], self.destination[1])
+        if direct_m <= self.max_walk_m:
+            best = self._walk_seconds(direct_m)
+
+        for s, d in self.network.stop_index.within(coords[0], coords[1], self.max_walk_m):
+            if self.latest[s] == NEG_INF:
+                continue
+            leave_home = self.latest[s] - self._walk_seconds(d)
+            total = self.arrival_time - leave_home
+            if best is None or total < best:
+                best = total
+        return best
+
+    def commute_minutes(self, coords: Tuple[float, float]) -> Optional[float]:
+        seconds = self.commute_seconds(coords)
+        if seconds is None or math.isinf(seconds):
+            return None
+        return round(seconds / 60, 1)
@@ -0,0 +1,118 @@
+"""Small helpers shared across the scraper."""
+
+import re
+from typing import Any, Optional, Tuple
+from urllib.parse import urlparse
+
+SQ_FT_PER_SQ_M = 10.7639
+
+_NUMBER_RE = re.compile(r'-?\d[\d,]*(?:\.\d+)?')
+_SQ_M_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*(?:sq\.?\s*m|m2|m²|square\s*met)', re.IGNORECASE)
+_SQ_FT_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*(?:sq\.?\s*ft|ft2|ft²|square\s*f)', re.IGNORECASE)
+_MONTHLY_RE = re.compile(r'\b(?:pm|pcm|per\s+month|monthly|/\s*month)\b', re.IGNORECASE)
+_ANNUAL_RE = re.compile(r'\b(?:pa|p\.a\.|per\s+annum|per\s+year|yearly|annual(?:ly)?|/\s*year)\b', re.IGNORECASE)
+_EPC_RE = re.compile(r'\b([A-G])\s*(\d{1,3})?(?:\s*/\s*([A-G])\s*(\d{1,3})?)?\b')
+_POSTCODE_RE = re.compile(r'\b([A-Z]{1,2}\d[A-Z\d]?)(?:\s*(\d[A-Z]{2}))?\b', re.IGNORECASE)
+
+
+def slugify(value: str, max_length: int = 80) -> str:
+    """Lowercase, filesystem-safe slug: 'Belfast 2-6 bed £100k' -> 'belfast-2-6-bed-100k'."""
+    slug = re.sub(r'[^a-z0-9]+', '-', value.lower()).strip('-')
+    return slug[:max_length].rstrip('-') or 'search'
+
+
+def search_name_from_url(url: str) -> str:
+    """Derive a readable search name from a PropertyPal search URL."""
+    parsed = urlparse(url)
+    path = parsed.path.replace('/property-for-sale/', '').strip('/')
+    return slugify(f"{path} {parsed.query}" if parsed.query else path)
+
+
+def to_int(value: Any) -> Optional[int]:
+    """First number in ``value`` as an int ('£125,000' -> 125000), or None."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = _NUMBER_RE.search(str(value))
+    return int(float(match.group().replace(',', ''))) if match else None
+
+
+def to_float(value: Any) -> Optional[float]:
+    """First number in ``value`` as a float, or None."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER_RE.search(str(value))
+    return float(match.group().replace(',', '')) if match else None
+
+
+def parse_size_sqm(value: Any) -> Optional[float]:
+    """Floor area in square metres from '60 sq m (645.8 sq ft)' or '646 sq ft'."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value)
+    match = _SQ_M_RE.search(text)
+    if match:
+        return float(match.group(1).replace(',', ''))
+    match = _SQ_FT_RE.search(text)
+    if match:
+        return round(float(match.group(1).replace(',', '')) / SQ_FT_PER_SQ_M, 1)
+    return None
+
+
+def parse_annual_amount(value: Any) -> Optional[float]:
+    """Yearly amount from '£863.37 pa'; monthly figures are multiplied by 12."""
+    amount = to_float(value)
+    if amount is None or isinstance(value, (int, float)):
+        return amount
+    if _MONTHLY_RE.search(str(value)):
+        return round(amount * 12, 2)
+    return amount
+
+
+def parse_monthly_amount(value: Any) -> Optional[float]:
+    """Monthly amount from '£460.69 per month'; yearly figures are divided by 12."""
+    amount = to_float(value)
+    if amount is None or isinstance(value, (int, float)):
+        return amount
+    if _ANNUAL_RE.search(str(value)) and not _MONTHLY_RE.search(str(value)):
+        return round(amount / 12, 2)
+    return amount
+
+
+def parse_epc(value: Any) -> Tuple[Optional[str], Optional[int], Optional[str], Optional[int]]:
+    """EPC bands and scores from 'F28/F37' -> ('F', 28, 'F', 37).
+
+    Missing parts are None: 'C' -> ('C', None, None, None).
+    """
+    if not value:
+        return None, None, None, None
+    match = _EPC_RE.search(str(value).upper())
+    if not match:
+        return None, None, None, None
+    band, score, potential_band, potential_score = match.groups()
+    return (
+        band,
+        int(score) if score else None,
+        potential_band,
+        int(potential_score) if potential_score else None,
+    )
+
+
+def parse_postcode(value: Any) -> Tuple[Optional[str], Optional[str]]:
+    """UK postcode in an address as (district, full postcode).
+
+    'Lisburn Road, Belfast, BT9 6AA' -> ('BT9', 'BT9 6AA'); 'Belfast BT9' -> ('BT9', None).
+    The last postcode-like token wins, since addresses end with the postcode.
+    """
+    if not value:
+        return None, None
+    matches = [m for m in _POSTCODE_RE.finditer(str(value)) if any(c.isdigit() for c in m.group(1))]
+    if not matches:
+        return None, None
+    district, inward = matches[-1].group(1).upper(), matches[-1].group(2)
+    return district, f'{district} {inward.upper()}' if inward else None
@@ -3,11 +3,25 @@
 Interactive CLI for running PropertyPal scraper with multiple search URLs.
 """
 import json
+import os
+import re
+import signal
 import sys
 import subprocess
+import time
+from datetime import datetime
 from pathlib import Path
 import questionary
 
+from propertypal_scraper.utils import slugify
+
+PROJECT_DIR = Path(__file__).parent
+LOG_DIR = PROJECT_DIR / "data" / "logs"
+
+# LogStats line, written every LOGSTATS_INTERVAL seconds by each crawl
+_LOGSTATS_RE = re.compile(r'Crawled (\d+) pages .*?scraped (\d+) items')
+_ITEM_COUNT_RE = re.compile(r"'item_scraped_count': (\d+)")
+
 
 def load_searches():
     """Load search configurations from urls.json."""
@@ -26,11 +40,19 @@ def load_searches():
         sys.exit(1)
 
 
-def run_scrapy(url, use_perplexity, limit=None):
-    """Run Scrapy spider with the given URL and perplexity setting.
+def search_job(job, name):
+    """Job id of one search within a ``--job`` run (a job checkpoints a single search)."""
+    return f"{job}-{slugify(name)}" if job else None
+
+
+def scrapy_command(url, use_perplexity, limit=None, name=None, settings=None, job=None, shard=None):
+    """Build the ``scrapy crawl`` command for one search.
 
     ``limit`` caps the number of scraped items per search (handy for dev runs).
-    It maps to Scrapy's built-in CLOSESPIDER_ITEMCOUNT setting.
+    It maps to Scrapy's built-in CLOSESPIDER_ITEMCOUNT setting. ``settings``
+    adds further ``-s NAME=VALUE`` overrides. ``job`` makes the crawl
+    resumable: running it again with the same job id continues where it
+    stopped. ``shard`` marks the crawl as one shard of a sharded search.
     """
     perplexity_arg = 'true' if use_perplexity else 'false'
 
@@ -39,39 +61,271 @@ def run_scrapy(url, use_perplexity, limit=None):
         '-a', f'url={url}',
         '-a', f'use_perplexity={perplexity_arg}'
     ]
+    if name:
+        cmd += ['-a', f'search={name}']
+    if job:
+        cmd += ['-a', f'job={job}']
+    if shard:
+        cmd += ['-a', f'shard={shard}']
     if limit is not None:
         cmd += ['-s', f'CLOSESPIDER_ITEMCOUNT={limit}']
+    for key, value in (settings or {}).items():
+        cmd += ['-s', f'{key}={value}']
+    return cmd
+
 
-    result = subprocess.run(cmd, cwd=Path(__file__).parent)
+def run_scrapy(url, use_perplexity, limit=None, name=None, job=None):
+    """Run Scrapy spider with the given URL and perplexity setting."""
+    cmd = scrapy_command(url, use_perplexity, limit=limit, name=name, job=job)
+    result = subprocess.run(cmd, cwd=PROJECT_DIR)
     return result.returncode == 0
 
 
-def parse_limit(argv):
-    """Pull --limit N out of argv. Returns int or None. Exits on bad input."""
+class SearchRun:
+    """One search running as a ``scrapy crawl`` subprocess with its own log file.
+
+    Progress (pages, items, errors) is read incrementally from the log.
+    ``env`` adds environment variables (settings.py reads its options from
+    the environment).
+    """
+
+    def __init__(self, search, log_file, env=None):
+        self.search = search
+        self.name = search['name']
+        self.log_file = log_file
+        self.env = env
+        self.process = None
+        self.offset = 0
+        self.pages = 0
+        self.items = 0
+        self.errors = 0
+        self.started = None
+        self.finished = None
+
+    @property
+    def status(self):
+        if self.process is None:
+            return 'queued'
+        if self.process.poll() is None:
+            return 'running'
+        return 'done' if self.process.returncode == 0 else 'failed'
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def start(self, use_perplexity, limit, job=None):
+        cmd = scrapy_command(
+            self.search['url'], use_perplexity, limit=limit, name=self.search.get('search', self.name),
+            settings={'LOG_FILE': self.log_file, 'LOG_LEVEL': 'INFO', 'LOGSTATS_INTERVAL': 5},
+            job=search_job(job, self.name), shard=self.search.get('shard')
+        )
+        self.started = time.monotonic()
+        self.process = subprocess.Popen(
+            cmd, cwd=PROJECT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True, env={**os.environ, **self.env} if self.env else None
+        )
+
+    def poll(self):
+        """Read new log lines; returns True once the process has exited."""
+        try:
+            with open(self.log_file, 'rb') as f:
+                f.seek(self.offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            chunk = b''
+        # Leave a partial last line for the next poll
+        chunk = chunk[:chunk.rfind(b'\n') + 1]
+        self.offset += len(chunk)
+
+        for line in chunk.decode('utf-8', errors='replace').splitlines():
+            if ' ERROR: ' in line:
+                self.errors += 1
+            stats = _LOGSTATS_RE.search(line)
+            if stats:
+                self.pages, self.items = int(stats.group(1)), int(stats.group(2))
+                continue
+            count = _ITEM_COUNT_RE.search(line)
+            if count:
+                self.items = int(count.group(1))
+
+        if self.process is not None and self.process.poll() is not None and self.finished is None:
+            self.finished = time.monotonic()
+        return self.finished is not None
+
+    def stop(self):
+        """Ask the crawl to shut down cleanly (like Ctrl-C)."""
+        if self.status == 'running':
+            self.process.send_signal(signal.SIGINT)
+
+
+def format_progress(runs):
+    """Progress table: one row per search plus a total row."""
+    width = max(len(run.name) for run in runs)
+    lines = [f"{'Search':<{width}}  {'Status':<8} {'Pages':>6} {'Items':>6} {'Errors':>6} {'Time':>7}"]
+    for run in runs:
+        lines.append(
+            f"{run.name:<{width}}  {run.status:<8} {run.pages:>6} {run.items:>6} {run.errors:>6} "
+            f"{run.elapsed:>6.0f}s"
+        )
+    lines.append(
+        f"{'Total':<{width}}  {'':<8} {sum(r.pages for r in runs):>6} {sum(r.items for r in runs):>6} "
+        f"{sum(r.errors for r in runs):>6}"
+    )
+    return lines
+
+
+def run_parallel(searches, use_perplexity, limit, workers, poll_interval=1.0, job=None, env=None):
+    """Run ``searches`` with at most ``workers`` crawls at a time.
+
+    Each crawl logs to data/logs/<search>_<timestamp>.log. Returns the runs.
+    """
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    runs = [
+        SearchRun(search, str(LOG_DIR / f"{slugify(search['name'])}_{timestamp}.log"), env=env)
+        for search in searches
+    ]
+    queue = list(runs)
+    active = []
+    interactive = sys.stdout.isatty()
+    drawn = 0
+    last_status = {}
+
+    try:
+        while queue or active:
+            while queue and len(active) < workers:
+                run = queue.pop(0)
+                run.start(use_perplexity, limit, job)
+                active.append(run)
+
+            active = [run for run in active if not run.poll()]
+
+            if interactive:
+                lines = format_progress(runs)
+                if drawn:
+                    sys.stdout.write(f"\033[{drawn}F")
+                sys.stdout.write(''.join(f"\033[2K{line}\n" for line in lines))
+                sys.stdout.flush()
+                drawn = len(lines)
+            else:
+                for run in runs:
+                    if last_status.get(run.name) != run.status and run.status != 'queued':
+                        print(f"[{run.status}] {run.name} ({run.items} items, {run.errors} errors)")
+                        last_status[run.name] = run.status
+
+            if queue or active:
+                time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        print("\nInterrupted, stopping running searches...")
+        for run in active:
+            run.stop()
+        for run in active:
+            run.process.wait()
+            run.poll()
+
+    return runs
+
+
+# Shards only write JSON Lines, unprojected; merge_shards() writes the real
+# exports and the search's changeset
+SHARD_ENV = {
+    'EXPORT_SINKS': 'json',
+    'JSON_EXPORT_COMPRESSION': 'none',
+    'JSON_EXPORT_FIELDS': '',
+    'JSON_EXPORT_EXCLUDE_FIELDS': '',
+    'CHANGESET_ENABLED': 'false',
+}
+
+
+def run_sharded(searches, use_perplexity, limit, workers):
+    """Split each search into shards, crawl all shards in parallel, merge each search's shards.
+
+    Returns ``(runs, merged)``: the shard runs and the merge result per search name.
+    """
+    from propertypal_scraper import settings
+    from propertypal_scraper.sharding import ShardPlanner, flaresolverr_fetch, merge_shards
+
+    planner = ShardPlanner(
+        flaresolverr_fetch(settings.FLARESOLVERR_URL),
+        target_size=settings.SHARD_TARGET_SIZE,
+        min_price_band=settings.SHARD_MIN_PRICE_BAND,
+        max_depth=settings.SHARD_MAX_DEPTH,
+        logger=lambda message: print(f"  {message}")
+    )
+    run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+    shard_searches = []
+    for search in searches:
+        print(f"Planning shards: {search['name']}")
+        shards = planner.plan(search['url'], search.get('shard'))
+        for i, shard in enumerate(shards, 1):
+            count = '?' if shard.count is None else shard.count
+            print(f"  [{i}/{len(shards)}] {shard.label}: {count} results")
+            shard_searches.append({
+                'name': f"{search['name']} [{i}/{len(shards)}]",
+                'url': shard.url,
+                'search': search['name'],
+                'shard': f"{run_id}-{i}",
+            })
+    print(f"{len(shard_searches)} shards, {planner.probes} pages fetched while planning\n")
+
+    runs = run_parallel(shard_searches, use_perplexity, limit, workers, env=SHARD_ENV)
+
+    merged = {}
+    for search in searches:
+        search_runs = [run for run in runs if run.search['search'] == search['name']]
+        paths = sorted(
+            path for run in search_runs
+            for path in (PROJECT_DIR / 'data' / 'raw').glob(
+                f"properties_{slugify(search['name'])}_*_shard-{run.search['shard']}.jsonl"
+            )
+        )
+        complete = all(run.status == 'done' for run in search_runs)
+        merged[search['name']] = merge_shards(search['name'], [str(p) for p in paths], use_perplexity, complete)
+        if complete:
+            for path in paths:
+                path.unlink()
+    return runs, merged
+
+
+def parse_int_option(argv, option):
+    """Pull ``option N`` or ``option=N`` out of argv. Returns int or None. Exits on bad input."""
+    for i, a in enumerate(argv):
+        if a == option and i + 1 < len(argv):
+            value = argv[i + 1]
+        elif a.startswith(f'{option}='):
+            value = a.split('=', 1)[1]
+        else:
+            continue
+        try:
+            n = int(value)
+        except ValueError:
+            print(f"Error: {option} expects an integer, got {value!r}")
+            sys.exit(2)
+        if n < 1:
+            print(f"Error: {option} must be >= 1")
+            sys.exit(2)
+        return n
+    return None
+
+
+def parse_option(argv, option):
+    """Pull ``option VALUE`` or ``option=VALUE`` out of argv. Returns str or None."""
     for i, a in enumerate(argv):
-        if a == '--limit' and i + 1 < len(argv):
-            try:
-                n = int(argv[i + 1])
-            except ValueError:
-                print(f"Error: --limit expects an integer, got {argv[i + 1]!r}")
-                sys.exit(2)
-            if n < 1:
-                print("Error: --limit must be >= 1")
-                sys.exit(2)
-            return n
-        if a.startswith('--limit='):
-            try:
-                n = int(a.split('=', 1)[1])
-            except ValueError:
-                print(f"Error: --limit expects an integer, got {a!r}")
-                sys.exit(2)
-            if n < 1:
-                print("Error: --limit must be >= 1")
-                sys.exit(2)
-            return n
+        if a == option and i + 1 < len(argv):
+            return argv[i + 1]
+        if a.startswith(f'{option}='):
+            return a.split('=', 1)[1]
     return None
 
 
+def parse_limit(argv):
+    """Pull --limit N out of argv. Returns int or None. Exits on bad input."""
+    return parse_int_option(argv, '--limit')
+
+
 def main():
     """Main interactive CLI."""
     # Load searches
@@ -87,6 +341,26 @@ def main():
     limit = parse_limit(sys.argv)
     if limit is not None:
         print(f"(Item cap per search: {limit})")
+    parallel = parse_int_option(sys.argv, '--parallel') or 1
+    job = parse_option(sys.argv, '--job')
+    if job:
+        print(f"(Resumable job: {job}; run again with --job {job} to continue)")
+    shard = '--shard' in sys.argv
+    if shard and job:
+        print("Error: --shard can't be combined with --job")
+        sys.exit(2)
+
+    # Long-running scheduler: re-runs every search on its urls.json cadence
+    if '--daemon' in sys.argv:
+        from propertypal_scraper import settings
+        from propertypal_scraper.daemon import Scheduler
+
+        print(f"Starting scheduler daemon ({parallel} at a time, Ctrl-C to stop)")
+        Scheduler(
+            str(PROJECT_DIR / "urls.json"), settings.DAEMON_STATE_FILE,
+            max_concurrent=parallel, limit=limit, tick_seconds=settings.DAEMON_TICK_SECONDS
+        ).run()
+        return
 
     # Check for --all flag
     if '--all' in sys.argv:
@@ -119,6 +393,46 @@ def main():
 
     # Run selected searches
     total = len(selected_searches)
+    if shard:
+        print(f"\nSharding {total} search{'es' if total > 1 else ''}, {parallel} crawls at a time (logs in {LOG_DIR})...\n")
+        runs, merged = run_sharded(selected_searches, use_perplexity, limit, parallel)
+
+        print("=" * 60)
+        for run in runs:
+            print(f"{run.status:<8} {run.name}: {run.items} items, {run.pages} pages, "
+                  f"{run.errors} errors in {run.elapsed:.0f}s -> {run.log_file}")
+        for name, result in merged.items():
+            print(f"Merged {name}: {result['merged']} listings ({result['duplicates']} duplicates across shards)")
+            for path in result['paths'] + ([result['changeset']] if 'changeset' in result else []):
+                print(f"  {path}")
+        failed = sum(run.status != 'done' for run in runs)
+        print(f"Results: {len(runs) - failed} shards successful, {failed} failed")
+
+        if failed == 0:
+            print("✓ All searches completed successfully!")
+        else:
+            sys.exit(1)
+        return
+
+    if parallel > 1 and total > 1:
+        print(f"\nRunning {total} searches, {min(parallel, total)} at a time (logs in {LOG_DIR})...\n")
+        runs = run_parallel(selected_searches, use_perplexity, limit, parallel, job=job)
+
+        print("=" * 60)
+        for run in runs:
+            print(f"{run.status:<8} {run.name}: {run.items} items, {run.pages} pages, "
+                  f"{run.errors} errors in {run.elapsed:.0f}s -> {run.log_file}")
+        successful = sum(run.status == 'done' for run in runs)
+        failed = total - successful
+        print(f"Results: {successful} successful, {failed} failed, "
+              f"{sum(run.items for run in runs)} items")
+
+        if failed == 0:
+            print("✓ All searches completed successfully!")
+        else:
+            sys.exit(1)
+        return
+
     print(f"\nRunning {total} search{'es' if total > 1 else ''}...\n")
 
     successful = 0
@@ -129,7 +443,9 @@ def main():
         print(f"URL: {search['url']}")
         print("-" * 60)
 
-        success = run_scrapy(search['url'], use_perplexity, limit=limit)
+        success = run_scrapy(
+            search['url'], use_perplexity, limit=limit, name=search['name'], job=search_job(job, search['name'])
+        )
 
         if success:
             successful += 1
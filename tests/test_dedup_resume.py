@@ -0,0 +1,77 @@
+"""Persistent dedup across a restarted resumable job (run with ``python -m unittest discover tests``)."""
+
+import logging
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from scrapy.exceptions import DropItem
+
+from propertypal_scraper import settings
+from propertypal_scraper.checkpoint import JobCheckpoint
+from propertypal_scraper.dedup import DedupIndex
+from propertypal_scraper.pipelines import DuplicateFilterPipeline
+
+
+class Spider:
+    search_slug = 'belfast'
+    logger = logging.getLogger('test')
+
+    def __init__(self, checkpoint):
+        self.checkpoint = checkpoint
+
+
+def listing(property_id):
+    return {'property_id': property_id, 'url': f'https://www.propertypal.com/x/{property_id}', 'price': 100000}
+
+
+class ResumeDedupTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.checkpoint_path = os.path.join(self.tmp.name, 'jobs', 'job', 'checkpoint.db')
+        patches = {
+            'DEDUP_POLICY': 'drop',
+            'DEDUP_INDEX_FILE': os.path.join(self.tmp.name, 'dedup.db'),
+            'MEMORY_BOUNDED': False,
+        }
+        for name, value in patches.items():
+            patcher = mock.patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_job(self, property_ids, exported=()):
+        """One run of the job; returns the listings that passed. ``exported`` pages reach a checkpoint."""
+        checkpoint = JobCheckpoint(self.checkpoint_path, 'job')
+        spider = Spider(checkpoint)
+        pipeline = DuplicateFilterPipeline()
+        pipeline.open_spider(spider)
+        passed = []
+        for property_id in property_ids:
+            checkpoint.add(f'page-{property_id}', listing(property_id)['url'], 'parse_property')
+            try:
+                pipeline.process_item(listing(property_id), spider)
+            except DropItem:
+                continue
+            passed.append(property_id)
+        checkpoint.commit([(f'page-{property_id}', property_id) for property_id in exported])
+        pipeline.close_spider(spider)
+        checkpoint.close()
+        return passed
+
+    def test_restart_reemits_only_listings_lost_since_the_last_checkpoint(self):
+        index = DedupIndex(settings.DEDUP_INDEX_FILE)
+        index.insert('1', 0, 'other-search')
+        index.close()
+
+        # Dies after indexing 2 and 3, with only 2 checkpointed
+        self.assertEqual(self.run_job(['1', '2', '3'], exported=['2']), ['2', '3'])
+        # 3's export was truncated away, so it is new again; 2 is in the exports already
+        self.assertEqual(self.run_job(['1', '2', '3'], exported=['3']), ['3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
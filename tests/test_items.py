@@ -0,0 +1,47 @@
+"""PropertyRecord stays in step with PropertyListing (run with ``python -m unittest discover tests``)."""
+
+import dataclasses
+import unittest
+
+from propertypal_scraper.items import PropertyListing, PropertyRecord
+
+RAW = {
+    'property_id': '123',
+    'url': 'https://www.propertypal.com/x/123',
+    'location': '1 Main Street, Belfast',
+    'property_type': '3 Bed Semi-detached House',
+    'price': 'Offers around £150,000',
+    'bedrooms': '3 Bedrooms',
+    'size': '100 sq m (1076.4 sq ft)',
+    'rates': '£1,200 pa*',
+    'energy_rating': 'D60/B85',
+    'typical_mortgage': '£700 per month',
+}
+
+
+class PropertyRecordParityTest(unittest.TestCase):
+    def test_same_fields(self):
+        record_fields = {f.name for f in dataclasses.fields(PropertyRecord)}
+        self.assertEqual(record_fields, set(PropertyListing.model_fields))
+
+    def test_same_types_and_defaults(self):
+        for f in dataclasses.fields(PropertyRecord):
+            model_field = PropertyListing.model_fields[f.name]
+            with self.subTest(field=f.name):
+                self.assertEqual(f.type, model_field.annotation)
+                self.assertEqual(f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING,
+                                 model_field.is_required())
+                if f.default is not dataclasses.MISSING:
+                    self.assertEqual(f.default, model_field.default)
+
+    def test_same_values(self):
+        listing = PropertyListing(**RAW).model_dump()
+        record = dataclasses.asdict(PropertyRecord.from_raw(RAW))
+        # Set at build time
+        listing.pop('scraped_at')
+        record.pop('scraped_at')
+        self.assertEqual(record, listing)
+
+
+if __name__ == '__main__':
+    unittest.main()
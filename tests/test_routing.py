@@ -0,0 +1,53 @@
+"""Walking graph built from an OSM extract (run with ``python -m unittest discover tests``)."""
+
+import os
+import tempfile
+import unittest
+
+from propertypal_scraper.routing import WalkingGraph
+
+EXTRACT = """<?xml version="1.0" encoding="UTF-8"?>
+<osm version="0.6">
+  <node id="1" lat="54.5900" lon="-5.9300"/>
+  <node id="2" lat="54.5910" lon="-5.9300"/>
+  <node id="3" lat="54.5920" lon="-5.9300"/>
+  <node id="4" lat="54.5930" lon="-5.9300"/>
+  <node id="5" lat="54.5920" lon="-5.9290"/>
+  <node id="6" lat="54.6000" lon="-5.9000"/>
+  <way id="10"><nd ref="1"/><nd ref="2"/><nd ref="3"/><tag k="highway" v="residential"/></way>
+  <way id="11"><nd ref="3"/><nd ref="4"/><tag k="highway" v="motorway"/></way>
+  <way id="12"><nd ref="3"/><nd ref="5"/><nd ref="99"/><tag k="highway" v="footway"/></way>
+  <way id="13"><nd ref="6"/><tag k="building" v="yes"/></way>
+</osm>
+"""
+
+
+class FromOsmTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'extract.osm')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(EXTRACT)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_keeps_only_nodes_of_walkable_ways(self):
+        graph = WalkingGraph.from_osm(self.path)
+        # 1, 2, 3 (residential) and 5 (footway); 4 is motorway only, 6 on no way, 99 outside the extract
+        self.assertEqual(graph.node_count, 4)
+        self.assertEqual(graph.edge_count, 6)
+        self.assertEqual(sorted(zip(graph.lats, graph.lons)), [
+            (54.59, -5.93), (54.591, -5.93), (54.592, -5.93), (54.592, -5.929)
+        ])
+
+    def test_distances_follow_the_ways(self):
+        graph = WalkingGraph.from_osm(self.path)
+        start, _ = graph.snap(54.5900, -5.9300, 10)
+        end, _ = graph.snap(54.5920, -5.9290, 10)
+        # About 222 m north, then about 64 m east
+        self.assertAlmostEqual(graph.shortest_distances(start)[end], 286.8, delta=1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+"""Range splitting of the shard planner (run with ``python -m unittest discover tests``)."""
+
+import unittest
+
+from propertypal_scraper.sharding import _split
+
+
+class SplitTest(unittest.TestCase):
+    def test_two_bedroom_values_split(self):
+        self.assertEqual(_split((2, 3), 1), ((2, 2), (3, 3)))
+
+    def test_single_value_does_not_split(self):
+        self.assertIsNone(_split((3, 3), 1))
+
+    def test_cut_is_rounded_to_the_step(self):
+        self.assertEqual(_split((0, 100000), 10000), ((0, 50000), (50001, 100000)))
+
+    def test_narrow_band_splits_once_at_one_step(self):
+        self.assertEqual(_split((0, 15000), 10000), ((0, 9999), (10000, 15000)))
+        self.assertIsNone(_split((0, 9999), 10000))
+
+    def test_halves_cover_the_range(self):
+        for value, step in [((0, 10000), 10000), ((100000, 125000), 10000), ((1, 7), 1), ((5, 6), 1)]:
+            with self.subTest(value=value, step=step):
+                (low, cut), (after, high) = _split(value, step)
+                self.assertEqual((low, high), value)
+                self.assertEqual(after, cut + 1)
+                self.assertLessEqual(low, cut)
+                self.assertLess(cut, high)
+
+
+if __name__ == '__main__':
+    unittest.main()
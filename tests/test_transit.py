@@ -0,0 +1,66 @@
+"""Commute profile over a tiny GTFS feed (run with ``python -m unittest discover tests``)."""
+
+import os
+import tempfile
+import unittest
+
+from propertypal_scraper.transit import NEG_INF, CommuteProfile, TransitNetwork, parse_clock_time
+
+# Stops about 1.1 km apart, so only transfers.txt connects them on foot
+STOPS = {
+    'A': (54.60, -5.93),
+    'B': (54.61, -5.93),
+    'C': (54.62, -5.93),
+    'D': (54.63, -5.93),
+    'E': (54.64, -5.93),
+}
+
+FEED = {
+    'stops.txt': ['stop_id,stop_lat,stop_lon'] + [f'{stop},{lat},{lon}' for stop, (lat, lon) in STOPS.items()],
+    'trips.txt': ['route_id,service_id,trip_id', 'R1,S1,T1'],
+    'stop_times.txt': [
+        'trip_id,arrival_time,departure_time,stop_id,stop_sequence',
+        'T1,08:00:00,08:00:00,B,1',
+        'T1,08:20:00,08:20:00,D,2',
+    ],
+    # A -> B only (asymmetric), B -> E only, C -> B not possible
+    'transfers.txt': [
+        'from_stop_id,to_stop_id,transfer_type,min_transfer_time',
+        'A,B,2,120',
+        'B,E,2,60',
+        'C,B,3,',
+    ],
+}
+
+
+class CommuteProfileFootpathTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        for name, lines in FEED.items():
+            with open(os.path.join(self.tmp.name, name), 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+        self.network = TransitNetwork.from_gtfs(self.tmp.name, transfer_radius_m=250.0)
+        self.stop = {stop: i for i, stop in enumerate(STOPS)}
+        self.profile = CommuteProfile(self.network, STOPS['D'], parse_clock_time('09:00'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def latest(self, stop):
+        return self.profile.latest[self.stop[stop]]
+
+    def test_walks_to_the_boarding_stop(self):
+        self.assertEqual(self.latest('B'), parse_clock_time('08:00'))
+        # A -> B is listed, so A can walk to B and catch T1
+        self.assertEqual(self.latest('A'), parse_clock_time('08:00') - 120)
+
+    def test_transfers_are_one_way(self):
+        # Only B -> E is listed: E can't walk to B
+        self.assertEqual(self.latest('E'), NEG_INF)
+
+    def test_impossible_transfers_are_skipped(self):
+        self.assertEqual(self.latest('C'), NEG_INF)
+
+
+if __name__ == '__main__':
+    unittest.main()
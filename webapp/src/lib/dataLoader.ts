@@ -2,6 +2,47 @@ import fs from 'fs';
 import path from 'path';
 import { Property } from '@/types/property';
 
+// Bundle format version this loader understands (see propertypal_scraper/bundle.py)
+const BUNDLE_VERSION = 1;
+const BUNDLE_DIR = path.join(process.cwd(), 'public', 'bundles');
+
+interface BundleManifest {
+  version: number;
+  default: string;
+  datasets: {
+    [dataset: string]: {
+      version: number;
+      index: string;
+      bundle: string;
+      count: number;
+      data_timestamp: string;
+      generated_at: string;
+    };
+  };
+}
+
+interface BundleIndex {
+  version: number;
+  dataset: string;
+  generated_at: string;
+  data_timestamp: string;
+  count: number;
+  columns: string[];
+  bundle: string;
+  bytes: number;
+  page_size: number;
+  header_bytes: number;
+  // [byte offset, byte length, rows]
+  pages: [number, number, number][];
+}
+
+export interface PropertyPage {
+  properties: Property[];
+  page: number;
+  pageCount: number;
+  total: number;
+}
+
 interface RawPropertyData {
   property_id: string;
   url: string;
@@ -30,6 +71,51 @@ interface GeocodingCache {
   };
 }
 
+function readJson<T>(filePath: string): T | null {
+  try {
+    return JSON.parse(fs.readFileSync(filePath, 'utf-8')) as T;
+  } catch {
+    return null;
+  }
+}
+
+function loadBundleIndex(dataset?: string): BundleIndex | null {
+  const manifest = readJson<BundleManifest>(path.join(BUNDLE_DIR, 'manifest.json'));
+  if (!manifest) return null;
+
+  const name = dataset ?? process.env.DATASET ?? manifest.default;
+  const entry = manifest.datasets[name];
+  if (!entry || entry.version !== BUNDLE_VERSION) return null;
+
+  const index = readJson<BundleIndex>(path.join(BUNDLE_DIR, entry.index));
+  return index && index.version === BUNDLE_VERSION ? index : null;
+}
+
+function rowToProperty(columns: string[], row: unknown[]): Property {
+  const property: Record<string, unknown> = {};
+  columns.forEach((column, i) => {
+    // Optional fields stay undefined rather than null, as in the scraped data
+    if (row[i] !== null) property[column] = row[i];
+  });
+  property.perplexity_rating ??= null;
+  property.perplexity_analysis ??= null;
+  property.calculated_monthly_payment ??= null;
+  property.distance_to_destination ??= null;
+  return property as unknown as Property;
+}
+
+function parseRows(index: BundleIndex, text: string): Property[] {
+  return text
+    .split('\n')
+    .filter((line) => line.length > 0)
+    .map((line) => rowToProperty(index.columns, JSON.parse(line)));
+}
+
+function loadBundle(index: BundleIndex): Property[] {
+  const text = fs.readFileSync(path.join(BUNDLE_DIR, index.bundle), 'utf-8');
+  return parseRows(index, text.slice(text.indexOf('\n') + 1));
+}
+
 function computeMortgage(price: number): number {
   const principal = price - 15000;
   if (principal <= 0) return 0;
@@ -47,7 +133,8 @@ function loadGeocodingCache(): GeocodingCache {
   }
 }
 
-export async function loadProperties(): Promise<Property[]> {
+// Fallback when no bundle has been built: join demo-data.json with the geocoding cache
+function loadDemoData(): Property[] {
   const filePath = path.join(process.cwd(), 'public', 'demo-data.json');
   const rawData: RawPropertyData[] = JSON.parse(fs.readFileSync(filePath, 'utf-8'));
 
@@ -86,6 +173,35 @@ export async function loadProperties(): Promise<Property[]> {
   });
 }
 
-export function getLatestDataTimestamp(): string {
-  return '20260220_083859';
+export async function loadProperties(dataset?: string): Promise<Property[]> {
+  const index = loadBundleIndex(dataset);
+  return index ? loadBundle(index) : loadDemoData();
+}
+
+// Read one page of a bundle using its byte range from the index
+export async function loadPropertiesPage(page: number, dataset?: string): Promise<PropertyPage> {
+  const index = loadBundleIndex(dataset);
+  if (!index) {
+    const all = loadDemoData();
+    return { properties: all, page: 0, pageCount: 1, total: all.length };
+  }
+
+  const pageCount = index.pages.length;
+  if (page < 0 || page >= pageCount) {
+    return { properties: [], page, pageCount, total: index.count };
+  }
+
+  const [offset, length] = index.pages[page];
+  const buffer = Buffer.alloc(length);
+  const fd = fs.openSync(path.join(BUNDLE_DIR, index.bundle), 'r');
+  try {
+    fs.readSync(fd, buffer, 0, length, offset);
+  } finally {
+    fs.closeSync(fd);
+  }
+  return { properties: parseRows(index, buffer.toString('utf-8')), page, pageCount, total: index.count };
+}
+
+export function getLatestDataTimestamp(dataset?: string): string {
+  return loadBundleIndex(dataset)?.data_timestamp ?? '20260220_083859';
 }
@@ -23,6 +23,10 @@ export interface Property {
   lng?: number;
   receptions?: number;
   rates?: string;
+  price_per_sqm?: number;
+  rates_annual?: number;
+  epc_score?: number;
+  epc_potential_score?: number;
 }
 
 export interface PropertyWithPriority extends Property {